@@ -7,12 +7,16 @@
 # ///
 import atexit
 import functools
-import io
+import hashlib
+import heapq
+import itertools
 import os
+import queue
 import re
 import threading
 import time
 import sys
+import weakref
 from collections import OrderedDict, deque
 from collections.abc import MutableMapping
 RESOURCE_LIB_AVAILABLE = True
@@ -36,6 +40,9 @@ DEFAULTS_INDICATOR_KEY = '#_defaults_#'
 
 COMPRESSED_FILE_EXTENSIONS = ['gz','gzip','bz2','bzip2','xz','lzma','zst','zstd']
 
+# hardMapToFile encodes and writes the rewritten file in chunks of about this many bytes
+WRITE_CHUNK_SIZE = 1024 * 1024
+
 def _isCompressedFile(fileName):
 	return fileName.rpartition('.')[2].lower() in COMPRESSED_FILE_EXTENSIONS
 
@@ -519,6 +526,59 @@ def _processLine(line,taskDic,correctColumnNum,strict = True,delimiter = ...,def
 	# 	__teePrintOrNot(f"Key {lineCache[0]} added",teeLogger=teeLogger)
 	return correctColumnNum, lineCache
 
+def _processLineKeyOnly(line,taskDic,correctColumnNum,strict = True,delimiter = ...,defaults = ...,
+						offset = -1):
+	"""
+	Index-only counterpart of _processLine, used when storeOffset is True.
+
+	Only the key field is unsanitized; value columns are counted and checked for emptiness
+	without being split into a list. Defaults lines are handed to _processLine unchanged.
+	Column-count, tombstone and defaults semantics are the same as _processLine.
+
+	Parameters:
+	line (str): The line of text to process.
+	taskDic (dict): The dictionary to update with the offset of the line.
+	correctColumnNum (int): The expected number of columns in the line.
+	strict (bool, optional): Whether to strictly enforce the correct number of columns. Defaults to True.
+	defaults (list, optional): The default values to use for missing columns. Defaults to [].
+	offset (int, optional): The offset of the line in the file. Defaults to -1.
+
+	Returns:
+	int: The updated correctColumnNum.
+	"""
+	if defaults is ...:
+		defaults = []
+	delimiter = get_delimiter(delimiter)
+	line = line.strip('\x00').rstrip('\r\n')
+	if not line:
+		return correctColumnNum
+	if line.startswith('#'):
+		if line.startswith(DEFAULTS_INDICATOR_KEY):
+			correctColumnNum, _ = _processLine(line,taskDic,correctColumnNum,strict = strict,delimiter = delimiter,
+				defaults = defaults,storeOffset = True,offset = offset)
+		return correctColumnNum
+	key, sep, rest = line.partition(delimiter)
+	key = _unsanitize(key,delimiter)
+	if not key:
+		return correctColumnNum
+	columnNum = rest.count(delimiter) + 2 if sep else 1
+	if correctColumnNum == -1:
+		if defaults and len(defaults) > 1:
+			correctColumnNum = len(defaults)
+		else:
+			correctColumnNum = columnNum
+	# unsanitized values are rstripped, so whitespace-only values count as empty
+	if columnNum == 1 or not rest.replace(delimiter,'').strip():
+		if correctColumnNum == 1:
+			taskDic[key] = offset
+		elif key in taskDic:
+			del taskDic[key]
+		return correctColumnNum
+	if columnNum != correctColumnNum and strict and not any(defaults[1:]):
+		return correctColumnNum
+	taskDic[key] = offset
+	return correctColumnNum
+
 def _read_last_valid_line_forward(fileName, taskDic, correctColumnNum, verbose=False, teeLogger=None,
 								  strict=False, encoding='utf8', delimiter=...,
 								  defaults=None, storeOffset=False):
@@ -877,6 +937,10 @@ def readTabularFile(fileName,teeLogger = None,header = '',createIfNotExist = Fal
 			# if lineCache:
 			# 	taskDic[lineCache[0]] = lineCache
 			return lineCache
+		if storeOffset:
+			for line in file:
+				correctColumnNum = _processLineKeyOnly(line.decode(encoding=encoding,errors='replace'),taskDic,correctColumnNum,strict = strict,delimiter=delimiter,defaults = defaults,offset=file.tell()-len(line))
+			return taskDic
 		for line in file:
 			correctColumnNum, _ = _processLine(line.decode(encoding=encoding,errors='replace'),taskDic,correctColumnNum,strict = strict,delimiter=delimiter,defaults = defaults,storeOffset=storeOffset,offset=file.tell()-len(line))
 	return taskDic
@@ -1039,6 +1103,156 @@ def clearTabularFile(fileName,teeLogger = None,header = '',verifyHeader = False,
 	if verbose:
 		__teePrintOrNot(f"Cleared {fileName}",teeLogger=teeLogger)
 
+def _prefixFingerprint(fileName,size = -1,window = 4096):
+	"""
+	Fingerprint the already-read prefix of a file, for incremental reloads.
+
+	The prefix ends at the last newline in the first size bytes (the whole file if size is -1),
+	so a partially written last line is left out and read again once it is complete.
+
+	Parameters:
+	- fileName (str): The path of the file.
+	- size (int, optional): The number of leading bytes to consider. Defaults to -1 (the whole file).
+	- window (int, optional): The number of bytes hashed at each end of the prefix. Defaults to 4096.
+
+	Returns:
+	- tuple: (prefixSize, fingerprint), or (-1, None) if the file cannot be read or is shorter than size.
+	"""
+	try:
+		with open(fileName,'rb') as file:
+			fileSize = os.fstat(file.fileno()).st_size
+			if size < 0:
+				size = fileSize
+			elif fileSize < size:
+				return -1, None
+			while size > 0:
+				start = max(0,size - window)
+				file.seek(start)
+				chunk = file.read(size - start)
+				if chunk.endswith(b'\n'):
+					break
+				size = start + chunk.rfind(b'\n') + 1
+			file.seek(0)
+			head = file.read(min(size,window))
+			file.seek(max(0,size - window))
+			tail = file.read(size - max(0,size - window))
+			return size, (os.fstat(file.fileno()).st_ino, hashlib.blake2b(head + tail,digest_size=16).hexdigest())
+	except OSError:
+		return -1, None
+
+def _parseFsyncPolicy(fsync):
+	"""
+	Parse a durability policy string.
+
+	Parameters:
+	- fsync (str): 'always', 'interval:<ms>', 'bytes:<n>' or 'never'. The spec's #_write_ack_# values are
+	  accepted too: 'disk' means 'always' and 'memory' means 'interval:1000'.
+
+	Returns:
+	- tuple: (mode, limit) where limit is the interval in seconds or the byte threshold, else 0.
+
+	Raises:
+	- ValueError: If fsync is not a recognized policy.
+	"""
+	text = str(fsync).strip().lower()
+	text = {'disk':'always','memory':'interval:1000'}.get(text,text)
+	mode, _, arg = text.partition(':')
+	try:
+		if mode in ('always','never') and not arg:
+			limit = 0
+		elif mode == 'interval':
+			limit = float(arg) / 1000
+		elif mode == 'bytes':
+			limit = int(arg)
+		else:
+			raise ValueError
+		if limit < 0:
+			raise ValueError
+	except ValueError:
+		raise ValueError(f"Unknown fsync policy {fsync!r}") from None
+	return mode, limit
+
+def _syncFileDescriptor(fd,datasync = True):
+	# fdatasync skips metadata not needed to read the data back (such as mtime)
+	if datasync and hasattr(os,'fdatasync'):
+		os.fdatasync(fd)
+	else:
+		os.fsync(fd)
+
+def _syncDirectory(dirName):
+	# Make a rename in dirName durable; directories cannot be opened for syncing on Windows
+	if os.name != 'posix':
+		return
+	fd = os.open(dirName,os.O_RDONLY)
+	try:
+		os.fsync(fd)
+	finally:
+		os.close(fd)
+
+def _lockFileObj(file):
+	if os.name == 'posix':
+		fcntl.lockf(file, fcntl.LOCK_EX)
+	elif os.name == 'nt':
+		# For Windows, locking the entire file, avoiding locking an empty file
+		#lock_length = max(1, os.path.getsize(self._fileName))
+		lock_length = 2147483647
+		msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, lock_length)
+
+def _unlockFileObj(file):
+	if os.name == 'posix':
+		fcntl.lockf(file, fcntl.LOCK_UN)
+	elif os.name == 'nt':
+		# Unlocking the entire file; for Windows, ensure not unlocking an empty file
+		#unlock_length = max(1, os.path.getsize(os.path.realpath(file.name)))
+		unlock_length = 2147483647
+		try:
+			msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, unlock_length)
+		except Exception:
+			pass
+
+def _replacedSinceOpen(file,fileName):
+	# True if fileName no longer names the file that file was opened on
+	try:
+		return os.fstat(file.fileno()).st_ino != os.stat(fileName).st_ino
+	except OSError:
+		return False
+
+def _queuedLineSize(line):
+	# Approximate size of a queued line: its text plus a separator per field
+	return sum(map(len,line)) + len(line)
+
+def _encodeLines(lines,encoding):
+	# One encode for a whole batch of joined lines, each terminated by a newline
+	if not lines:
+		return b''
+	lines.append('')
+	return '\n'.join(lines).encode(encoding=encoding,errors='replace')
+
+def _coalesceLines(lines):
+	'''
+	Fold the queued lines of each key into the slot of its first queued line.
+	Reads are last-wins per key and a key keeps the position it first appeared at,
+	so a later line only needs its value written in the earlier line's place.
+	Deletion lines are never merged or skipped over, since a delete followed by a re-add
+	moves the key to the end; a line after a deletion starts a new slot.
+	Lines keyed with '#' (such as the defaults line) are barriers that no line moves across.
+	'''
+	kept = []
+	slots = {}
+	for line in lines:
+		key = line[0]
+		if key.startswith('#'):
+			slots.clear()
+		elif not any(line[1:]):
+			slots.pop(key,None)
+		elif key in slots:
+			kept[slots[key]] = line
+			continue
+		else:
+			slots[key] = len(kept)
+		kept.append(line)
+	return kept
+
 def getFileUpdateTimeNs(fileName):
 	# return 0 if the file does not exist
 	if not os.path.isfile(fileName):
@@ -1146,6 +1360,171 @@ def getListView(tsvzDic,header = [],delimiter = ...):
 			return [header] + values
 
 # create a tsv class that functions like a ordered dictionary but will update the file when modified
+class AppendWorkerPool:
+	"""
+	A small pool of threads that commits the append queues of many TSVZed instances.
+
+	A TSVZed opened with writer_pool set registers here instead of starting its own append thread.
+	Queued lines are committed after max_batch_delay, or at once when max_batch_size lines are queued.
+	Due instances are served oldest first, and one pass commits at most max_batch_size lines of an
+	instance before queueing it behind the others, so a busy file cannot starve the rest.
+	All instances taken in one pass are committed before any of them is synced.
+	A single atexit hook stops every registered instance and then the threads.
+
+	Parameters
+	----------
+	workers : int, default=2
+		Number of worker threads, started on first use.
+	max_files_per_pass : int, default=64
+		Most due instances one thread takes per pass.
+	"""
+	def __init__(self,workers = 2,max_files_per_pass = 64):
+		if workers < 1:
+			raise ValueError('workers must be at least 1')
+		self.workers = workers
+		self.max_files_per_pass = max_files_per_pass
+		self.stores = weakref.WeakValueDictionary()
+		self.due = {}
+		self.busy = set()
+		self.heap = []
+		self.sequence = itertools.count()
+		# reentrant: a collected TSVZed stops itself (and unregisters) from whichever thread collects it
+		self.condition = threading.Condition()
+		self.threads = []
+		self.stopping = False
+		atexit.register(self.shutdown)
+
+	def __len__(self):
+		return len(self.stores)
+
+	def register(self,store):
+		key = id(store)
+		with self.condition:
+			self.stores[key] = store
+			self.due.pop(key,None)
+		delay = store._nextPassDelay()
+		if delay is not None:
+			self.schedule(store,delay)
+
+	def unregister(self,store):
+		# wait out a pass that is committing this store
+		key = id(store)
+		with self.condition:
+			while key in self.busy:
+				self.condition.wait()
+			self.stores.pop(key,None)
+			self.due.pop(key,None)
+
+	def schedule(self,store,delay):
+		'''
+		Commit store within delay seconds; an earlier request wins.
+		'''
+		key = id(store)
+		when = time.monotonic() + delay
+		with self.condition:
+			if key not in self.stores:
+				return
+			due = self.due.get(key)
+			if due is not None and due <= when:
+				return
+			self.due[key] = when
+			if key in self.busy:
+				return  # queued again when its current pass ends
+			heapq.heappush(self.heap,(when,next(self.sequence),key))
+			if self.heap[0][2] == key:
+				self.condition.notify()
+			while len(self.threads) < self.workers and not self.stopping:
+				thread = threading.Thread(target=self._work,daemon=True,name=f'TSVZ-append-{len(self.threads)}')
+				self.threads.append(thread)
+				thread.start()
+
+	def shutdown(self):
+		'''
+		Stop every registered TSVZed, then the worker threads. Threads restart when a file is scheduled again.
+		'''
+		for store in list(self.stores.values()):
+			store.stopAppendThread()
+		with self.condition:
+			self.stopping = True
+			self.condition.notify_all()
+			threads, self.threads = self.threads, []
+		for thread in threads:
+			if thread is not threading.current_thread():
+				thread.join()
+		with self.condition:
+			self.stopping = False
+
+	def _work(self):
+		while True:
+			stores = self._take()
+			if stores is None:
+				return
+			try:
+				self._run(stores)
+			finally:
+				self._finish(stores)
+
+	def _take(self):
+		with self.condition:
+			while True:
+				if self.stopping:
+					return None
+				now = time.monotonic()
+				if self.heap and self.heap[0][0] <= now:
+					break
+				self.condition.wait(self.heap[0][0] - now if self.heap else None)
+			stores = []
+			while self.heap and self.heap[0][0] <= now and len(stores) < self.max_files_per_pass:
+				when, _, key = heapq.heappop(self.heap)
+				store = self.stores.get(key)
+				if store is None or key in self.busy or self.due.get(key) != when:
+					continue  # stopped, or superseded by an earlier request
+				del self.due[key]
+				self.busy.add(key)
+				stores.append(store)
+			if self.heap and self.heap[0][0] <= now:
+				self.condition.notify()  # let an idle thread take the rest
+			return stores
+
+	def _run(self,stores):
+		for store in stores:
+			store._poolPass()
+		for store in stores:
+			if store._syncDue():
+				store.syncFile()
+
+	def _finish(self,stores):
+		now = time.monotonic()
+		with self.condition:
+			for store in stores:
+				key = id(store)
+				self.busy.discard(key)
+				if key not in self.stores:
+					continue
+				when = self.due.get(key)
+				delay = store._nextPassDelay()
+				if delay is not None and (when is None or now + delay < when):
+					when = now + delay
+				if when is None:
+					continue
+				self.due[key] = when
+				heapq.heappush(self.heap,(when,next(self.sequence),key))
+			self.condition.notify_all()
+
+_sharedAppendWorkerPool = None
+_sharedAppendWorkerPoolLock = threading.Lock()
+
+def getSharedAppendWorkerPool(workers = 2):
+	'''
+	Return the process-wide AppendWorkerPool, creating it with workers threads on first use.
+	TSVZed instances opened with writer_pool = True register here.
+	'''
+	global _sharedAppendWorkerPool
+	with _sharedAppendWorkerPoolLock:
+		if _sharedAppendWorkerPool is None:
+			_sharedAppendWorkerPool = AppendWorkerPool(workers = workers)
+		return _sharedAppendWorkerPool
+
 class TSVZed(OrderedDict):
 	"""
 	A thread-safe, file-backed ordered dictionary for managing TSV (Tab-Separated Values) files.
@@ -1165,13 +1544,15 @@ class TSVZed(OrderedDict):
 	verifyHeader : bool, default=True
 		If True, verifies that the file header matches the provided header.
 	rewrite_on_load : bool, default=True
-		If True, rewrites the entire file when loading to ensure consistency.
+		If True, rewrites the entire file when loading if it is due for compaction (see compact_ratio).
 	rewrite_on_exit : bool, default=False
 		If True, rewrites the entire file when closing/exiting.
 	rewrite_interval : float, default=0
-		Minimum time interval (in seconds) between full file rewrites. 0 means do not rewrite.
+		Minimum time interval (in seconds) between full file rewrites. 0 means do not rewrite. A rewrite
+		only happens once the file is also due for compaction (see compact_ratio).
 	append_check_delay : float, default=0.01
-		Time delay (in seconds) between checks of the append queue by the worker thread.
+		Default for max_batch_delay and external_check_interval. The worker thread sleeps until lines are
+		queued (or periodic work is due) rather than polling at this interval.
 	monitor_external_changes : bool, default=True
 		If True, monitors and detects external file modifications.
 	verbose : bool, default=False
@@ -1186,6 +1567,44 @@ class TSVZed(OrderedDict):
 		If True, enforces strict validation of column counts and raises errors on mismatch.
 	correctColumnNum : int, default=-1
 		Expected number of columns. -1 means auto-detect from header or first record.
+	fsync : str, default='always'
+		When appended lines are synced to disk: 'always' (every commit), 'interval:<ms>' (at most once per
+		interval; the worker syncs leftovers), 'bytes:<n>' (once n bytes are unsynced) or 'never' (left to the OS).
+		Full rewrites are always synced.
+	datasync : bool, default=True
+		If True, use os.fdatasync where available instead of os.fsync.
+	max_batch_delay : float, optional
+		Longest (in seconds) a queued line waits for more lines before the batch is committed.
+		Defaults to append_check_delay.
+	max_batch_size : int, default=4096
+		Number of queued lines that triggers a commit at once.
+	external_check_interval : float, optional
+		Seconds between external change checks while idle, when monitor_external_changes is True.
+		Defaults to append_check_delay. None of the periodic checks run when monitoring is off, so an
+		idle store then uses no CPU.
+	writer_pool : AppendWorkerPool or bool, optional
+		If given, queued lines are committed by this pool (True: getSharedAppendWorkerPool()) instead
+		of an append thread of this instance's own.
+	max_pending_rows : int, optional
+		Most lines the append queue may hold. None for no limit.
+	max_pending_bytes : int, optional
+		Most text (see appendQueueBytes) the append queue may hold. None for no limit.
+	backpressure : str, default='block'
+		What a change does when the append queue is full: 'block' waits for the worker to make room,
+		'raise' raises queue.Full and leaves the data unchanged, and 'sync' queues the line and commits
+		the whole queue in the caller's thread. A line is always admitted to an empty queue.
+	coalesce : bool, default=False
+		If True, each commit writes only the last queued line (or tombstone) of each key.
+		coalescedLines counts the lines left out.
+	atomic_rewrite : bool, default=False
+		If True, rewrites go through atomicMapToFile() instead of the in-place mapToFile(): the data is
+		streamed into a sibling temp file, synced and renamed over the original, so a crash never leaves
+		a torn file. Compressed files are rewritten the same way.
+	compact_ratio : float, default=0.5
+		The file is due for compaction once more than this share of it is dead (superseded lines and
+		tombstones, see fileBytes and liveBytes). None makes every rewrite due, as before.
+	compact_min_bytes : int, default=64*1024*1024
+		Files smaller than this (by fileBytes) are never due for compaction.
 	Attributes
 	----------
 	version : str
@@ -1197,7 +1616,15 @@ class TSVZed(OrderedDict):
 	memoryOnly : bool
 		If True, changes are kept in memory only and not written to disk.
 	appendQueue : deque
-		Queue of lines waiting to be appended to the file.
+		Queue of lines waiting to be appended to the file. Its length is the current queue depth.
+	appendQueueBytes : int
+		Approximate text size of the queued lines, as limited by max_pending_bytes.
+	skippedWrites : int
+		Number of assignments skipped because the key already held the same value.
+	fileBytes : int
+		Approximate text size of every line in the file: replayed, appended or rewritten.
+	liveBytes : int
+		Approximate text size of the latest line of each live key. fileBytes - liveBytes is dead.
 	writeLock : threading.Lock
 		Lock for ensuring thread-safe file operations.
 	shutdownEvent : threading.Event
@@ -1216,6 +1643,8 @@ class TSVZed(OrderedDict):
 		Synchronize in-memory data to the file using in-place updates.
 	hardMapToFile()
 		Completely rewrite the file from scratch with current data.
+	atomicMapToFile()
+		Rewrite the file into a temp file and atomically replace the original with it.
 	clear()
 		Clear all data from memory and optionally the file.
 	clear_file()
@@ -1267,7 +1696,12 @@ class TSVZed(OrderedDict):
 
 	def __init__ (self,fileName,teeLogger = None,header = '',createIfNotExist = True,verifyHeader = True,rewrite_on_load = True,
 				  rewrite_on_exit = False,rewrite_interval = 0, append_check_delay = 0.01,monitor_external_changes = True,
-				  verbose = False,encoding = 'utf8',delimiter = ...,defaults = None,strict = False,correctColumnNum = -1):
+				  verbose = False,encoding = 'utf8',delimiter = ...,defaults = None,strict = False,correctColumnNum = -1,
+				  fsync = 'always',datasync = True,max_batch_delay = None,max_batch_size = 4096,external_check_interval = None,
+				  writer_pool = None,max_pending_rows = None,max_pending_bytes = None,backpressure = 'block',
+				  coalesce = False,atomic_rewrite = False,compact_ratio = 0.5,compact_min_bytes = 64*1024*1024):
+		if backpressure not in ('block','raise','sync'):
+			raise ValueError(f"Unknown backpressure policy {backpressure!r}")
 		super().__init__()
 		self.version = version
 		self.strict = strict
@@ -1292,18 +1726,50 @@ class TSVZed(OrderedDict):
 			append_check_delay = 0.00001
 			self.__teePrintOrNot('append_check_delay cannot be less than 0, setting it to 0.00001','error')
 		self.append_check_delay = append_check_delay
+		self.max_batch_delay = append_check_delay if max_batch_delay is None else max_batch_delay
+		self.max_batch_size = max_batch_size
+		self.external_check_interval = append_check_delay if external_check_interval is None else external_check_interval
 		self.appendQueue = deque()
+		self.appendQueueBytes = 0
+		self.appendQueueRoom = threading.Condition(threading.Lock())
+		self.blockedProducers = 0
+		self.max_pending_rows = max_pending_rows
+		self.max_pending_bytes = max_pending_bytes
+		self.backpressure = backpressure
+		self.coalesce = coalesce
+		self.atomic_rewrite = atomic_rewrite
+		self.compact_ratio = compact_ratio
+		self.compact_min_bytes = compact_min_bytes
+		self.fileBytes = 0
+		self.liveBytes = 0
+		self.coalescedLines = 0
+		self.skippedWrites = 0
+		self.appendCondition = threading.Condition(threading.Lock())
+		self.workerIdle = False
+		self.workerFilling = False
 		self.dirty = False
 		self.deSynced = False
 		self.memoryOnly = False
 		self.encoding = encoding
+		self.fsyncMode, self.fsyncLimit = _parseFsyncPolicy(fsync)
+		self.datasync = datasync
+		self.deferSync = False
+		self.unsyncedBytes = 0
+		self.lastSyncTime = time.monotonic()
+		self.replayedSize = -1
+		self.replayedFingerprint = None
 		self.writeLock = threading.Lock()
 		self.shutdownEvent = threading.Event()
 		#self.appendEvent = threading.Event()
 		self.appendThread  = threading.Thread(target=self._appendWorker,daemon=True)
-		self.appendThread.start()
+		self.appendPool = getSharedAppendWorkerPool() if writer_pool is True else writer_pool or None
+		if self.appendPool is None:
+			self.appendThread.start()
 		self.load()
-		atexit.register(self.stopAppendThread)
+		if self.appendPool is None:
+			atexit.register(self.stopAppendThread)
+		else:
+			self.appendPool.register(self)  # the pool's atexit hook stops this instance
 
 	def setDefaults(self,defaults):
 		if not defaults:
@@ -1326,7 +1792,7 @@ class TSVZed(OrderedDict):
 
 	def load(self):
 		self.reload()
-		if self.rewrite_on_load:
+		if self.rewrite_on_load and self._compactionDue():
 			self.rewrite(force = True,reloadInternalFromFile = False)
 		return self
 
@@ -1337,10 +1803,18 @@ class TSVZed(OrderedDict):
 		if self.verbose:
 			self.__teePrintOrNot(f"Loading {self._fileName}")
 		super().clear()
+		self.fileBytes = 0
+		self.liveBytes = 0
+		sizeBefore = os.path.getsize(self._fileName) if os.path.isfile(self._fileName) else -1
 		readTabularFile(self._fileName, teeLogger = self.teeLogger, header = self.header,
 					createIfNotExist = self.createIfNotExist, verifyHeader = self.verifyHeader,
 					verbose = self.verbose, taskDic = self,encoding = self.encoding if self.encoding else None,
 					strict = self.strict, delimiter = self.delimiter, defaults=self.defaults)
+		# Only trust the replayed size if nothing was appended while reading
+		if sizeBefore >= 0 and os.path.getsize(self._fileName) == sizeBefore:
+			self.markReplayed(sizeBefore)
+		else:
+			self.replayedSize, self.replayedFingerprint = -1, None
 		if self.verbose:
 			self.__teePrintOrNot(f"Loaded {len(self)} records from {self._fileName}")
 		if self.header and any(self.header) and self.verifyHeader:
@@ -1359,6 +1833,48 @@ class TSVZed(OrderedDict):
 		self.memoryOnly = mo
 		return self
 
+	def markReplayed(self,size = -1):
+		'''
+		Record that the in-memory state reflects the file up to size bytes (the whole file if -1),
+		along with a fingerprint of that prefix, so later appends can be replayed by tailReload.
+		'''
+		self.replayedSize, self.replayedFingerprint = _prefixFingerprint(self._fileName,size)
+		return self
+
+	def tailReload(self):
+		'''
+		Replay only the lines appended to the file since it was last read.
+
+		Returns:
+		- bool: True if the appended lines were applied. False if a full reload is needed instead:
+		  the file is compressed, shrank, or the already-read prefix no longer matches its fingerprint.
+		'''
+		if self.replayedSize < 0 or self._fileName.rpartition('.')[2] in COMPRESSED_FILE_EXTENSIONS:
+			return False
+		if _prefixFingerprint(self._fileName,self.replayedSize) != (self.replayedSize,self.replayedFingerprint):
+			return False
+		try:
+			with open(self._fileName,'rb') as file:
+				file.seek(self.replayedSize)
+				data = file.read()
+		except OSError:
+			return False
+		end = data.rfind(b'\n') + 1
+		if self.verbose:
+			self.__teePrintOrNot(f"Replaying {end} appended bytes of {self._fileName}")
+		mo = self.memoryOnly
+		self.memoryOnly = True
+		try:
+			for line in data[:end].split(b'\n')[:-1]:
+				self.correctColumnNum, _ = _processLine(line.decode(self.encoding,errors='replace'),self,self.correctColumnNum,
+											strict = self.strict,delimiter = self.delimiter,defaults = self.defaults)
+		finally:
+			self.memoryOnly = mo
+		self.markReplayed(self.replayedSize + end)
+		self.externalFileUpdateTime = getFileUpdateTimeNs(self._fileName)
+		self.lastUpdateTime = self.externalFileUpdateTime
+		return True
+
 	def __setitem__(self,key,value):
 		key = str(key).rstrip()
 		if not key:
@@ -1402,21 +1918,31 @@ class TSVZed(OrderedDict):
 			if self.verbose:
 				self.__teePrintOrNot(f"Defaults set to {value}")
 			if not self.memoryOnly:
-				self.appendQueue.append(value)
+				self._queueAppend(value)
 				self.lastUpdateTime = get_time_ns()
 				if self.verbose:
 					self.__teePrintOrNot(f"Appending Defaults {key} to the appendQueue")
 			return
 		if self.verbose:
 			self.__teePrintOrNot(f"Setting {key} to {value}")
-		if key in self:
-			if self[key] == value:
+		old = self.get(key)
+		if old is not None:
+			if old == value:
+				if not self.memoryOnly:
+					self.skippedWrites += 1
+				elif not key.startswith('#'):
+					# replaying a repeated line: it is in the file, but dead
+					self.fileBytes += _queuedLineSize(value)
 				if self.verbose:
 					self.__teePrintOrNot(f"Key {key} already exists with the same value")
 				return
 			self.dirty = True
+		if self.backpressure == 'raise' and not self.memoryOnly and not key.startswith('#'):
+			self._checkAppendRoom(value)
 		# update the dictionary, 
 		super().__setitem__(key,value)
+		if not key.startswith('#'):
+			self._countLine(value,old,live = True)
 		if self.memoryOnly:
 			if self.verbose:
 				self.__teePrintOrNot(f"Key {key} updated in memory only")
@@ -1427,12 +1953,8 @@ class TSVZed(OrderedDict):
 			return
 		if self.verbose:
 			self.__teePrintOrNot(f"Appending {key} to the appendQueue")
-		self.appendQueue.append(value)
+		self._queueAppend(value)
 		self.lastUpdateTime = get_time_ns()
-		# if not self.appendThread.is_alive():
-		#     self.commitAppendToFile()
-		# else:
-		#     self.appendEvent.set()
 
 	def __getitem__(self, key):
 		return super().__getitem__(str(key).rstrip())
@@ -1451,10 +1973,16 @@ class TSVZed(OrderedDict):
 			return
 		# delete the key from the dictionary and update the file
 		if key not in self:
+			if self.memoryOnly and not key.startswith('#'):
+				self._countLine(self._tombstone(key),None)
 			if self.verbose:
 				self.__teePrintOrNot(f"Key {key} not found")
 			return
-		super().__delitem__(key)
+		if self.backpressure == 'raise' and not self.memoryOnly and not key.startswith('#'):
+			self._checkAppendRoom(self._tombstone(key))
+		old = super().pop(key)
+		if not key.startswith('#'):
+			self._countLine(self._tombstone(key),old)
 		if self.memoryOnly or key.startswith('#'):
 			if self.verbose:
 				self.__teePrintOrNot(f"Key {key} deleted in memory")
@@ -1472,21 +2000,100 @@ class TSVZed(OrderedDict):
 		# resurrecting the deleted key. The key has already been removed from
 		# the mapping by the caller, so self[key] must not be accessed.
 		self.dirty = True
-		if self.correctColumnNum > 1:
-			emptyLine = [key]+['']*(self.correctColumnNum-1)
-		else:
-			emptyLine = [key]
+		emptyLine = self._tombstone(key)
 		if self.verbose:
 			self.__teePrintOrNot(f"Appending {emptyLine} to the appendQueue")
-		self.appendQueue.append(emptyLine)
+		self._queueAppend(emptyLine)
 		return self
 
+	def _tombstone(self,key):
+		if self.correctColumnNum > 1:
+			return [key]+['']*(self.correctColumnNum-1)
+		return [key]
+
+	def _countLine(self,line,old,live = False):
+		# Dead-byte accounting: every line written or replayed adds to fileBytes, but only the
+		# latest line of a live key counts towards liveBytes. Sizes are _queuedLineSize() text.
+		size = _queuedLineSize(line)
+		self.fileBytes += size
+		if old is not None:
+			self.liveBytes -= _queuedLineSize(old)
+		if live:
+			self.liveBytes += size
+
+	def _compactionDue(self):
+		# True once dead lines make up more than compact_ratio of a file of at least compact_min_bytes
+		if self.compact_ratio is None:
+			return True
+		if self.fileBytes <= 0 or self.fileBytes < self.compact_min_bytes:
+			return False
+		return (self.fileBytes - self.liveBytes) / self.fileBytes > self.compact_ratio
+
+	def _hasAppendRoom(self,size):
+		return ((self.max_pending_rows is None or len(self.appendQueue) < self.max_pending_rows)
+				and (self.max_pending_bytes is None or self.appendQueueBytes + size <= self.max_pending_bytes))
+
+	def _checkAppendRoom(self,line):
+		# backpressure = 'raise': refuse a change before it touches the data
+		with self.appendQueueRoom:
+			if self.appendQueue and not self._hasAppendRoom(_queuedLineSize(line)):
+				raise queue.Full(f"{len(self.appendQueue)} lines ({self.appendQueueBytes} bytes) pending for {self._fileName}")
+
+	def _releaseAppendRoom(self,size):
+		with self.appendQueueRoom:
+			self.appendQueueBytes = max(0,self.appendQueueBytes - size)
+			self.appendQueueRoom.notify_all()
+
+	def _commitSoon(self):
+		# a producer is blocked on a full queue: ask for an immediate commit
+		if self.appendPool is not None:
+			self.appendPool.schedule(self,0)
+		else:
+			with self.appendCondition:
+				self.appendCondition.notify()
+
+	def _queueAppend(self,line):
+		size = _queuedLineSize(line)
+		commitNow = False
+		with self.appendQueueRoom:
+			if self.appendQueue and not self._hasAppendRoom(size):
+				if self.backpressure == 'block':
+					self.blockedProducers += 1
+					try:
+						self._commitSoon()
+						while self.appendQueue and not self._hasAppendRoom(size) and not self.shutdownEvent.is_set():
+							self.appendQueueRoom.wait()
+					finally:
+						self.blockedProducers -= 1
+				else:
+					# 'sync', or a 'raise' that lost the last free slot to another thread
+					commitNow = True
+			self.appendQueue.append(line)
+			self.appendQueueBytes += size
+		if commitNow:
+			self.commitAppendToFile()
+			return
+		if self.appendPool is not None:
+			if len(self.appendQueue) >= self.max_batch_size:
+				self.appendPool.schedule(self,0)
+			else:
+				due = self.appendPool.due.get(id(self))
+				if due is None or due > time.monotonic() + self.max_batch_delay:
+					self.appendPool.schedule(self,self.max_batch_delay)
+			return
+		# The worker sets its flags before re-checking the queue and sleeping,
+		# so checking them after appending never misses a wakeup.
+		if self.workerIdle or (self.workerFilling and len(self.appendQueue) >= self.max_batch_size):
+			with self.appendCondition:
+				self.appendCondition.notify()
+
 	def getListView(self):
 		return getListView(self,header=self.header,delimiter=self.delimiter)
 
 	def clear(self):
 		# clear the dictionary and update the file
 		super().clear()
+		self.liveBytes = 0
 		if self.verbose:
 			self.__teePrintOrNot(f"Clearing {self._fileName}")
 		if self.memoryOnly:
@@ -1512,6 +2119,8 @@ class TSVZed(OrderedDict):
 				if self.verbose:
 					self.__teePrintOrNot(f"File {self._fileName} cleared empty")
 					self.__teePrintOrNot(f"File {self._fileName} size: {os.path.getsize(self._fileName)}")
+			self.markReplayed()
+			self.fileBytes = self.liveBytes
 			self.dirty = False
 			self.deSynced = False
 		except Exception as e:
@@ -1545,6 +2154,7 @@ rewrite_on_exit:{self.rewrite_on_exit}
 rewrite_interval:{self.rewrite_interval}
 append_check_delay:{self.append_check_delay}
 appendQueueLength:{len(self.appendQueue)}
+appendQueueBytes:{self.appendQueueBytes}
 appendThreadAlive:{self.appendThread.is_alive()}
 dirty:{self.dirty}
 deSynced:{self.deSynced}
@@ -1559,6 +2169,8 @@ memoryOnly:{self.memoryOnly}
 
 	def popitem(self, last=True):
 		key, value = super().popitem(last)
+		if not key.startswith('#'):
+			self._countLine(self._tombstone(key),value)
 		if not self.memoryOnly:
 			self.__appendEmptyLine(key)
 		self.lastUpdateTime = get_time_ns()
@@ -1578,6 +2190,8 @@ memoryOnly:{self.memoryOnly}
 				raise KeyError(key)
 			return default
 		value = super().pop(key)
+		if not key.startswith('#'):
+			self._countLine(self._tombstone(key),value)
 		if not self.memoryOnly:
 			self.__appendEmptyLine(key)
 		self.lastUpdateTime = get_time_ns()
@@ -1633,6 +2247,8 @@ memoryOnly:{self.memoryOnly}
 				return False
 			if self.rewrite_interval == 0 or time.time() - os.path.getmtime(self._fileName) < self.rewrite_interval:
 				return False
+			if not self._compactionDue():
+				return False
 		try:
 
 			if reloadInternalFromFile is None:
@@ -1640,7 +2256,9 @@ memoryOnly:{self.memoryOnly}
 			if reloadInternalFromFile and self.externalFileUpdateTime < getFileUpdateTimeNs(self._fileName):
 				# this will be needed if more than 1 process is accessing the file
 				self.commitAppendToFile()
-				self.reload()
+				# the file is append-only between rewrites: replay just the new lines when possible
+				if not self.tailReload():
+					self.reload()
 			if self.memoryOnly:
 				if self.verbose:
 					self.__teePrintOrNot("Memory only mode. Map to file skipped.")
@@ -1648,7 +2266,10 @@ memoryOnly:{self.memoryOnly}
 			if self.dirty:
 				if self.verbose:
 					self.__teePrintOrNot(f"Rewriting {self._fileName}")
-				self.mapToFile()
+				if self.atomic_rewrite:
+					self.atomicMapToFile()
+				else:
+					self.mapToFile()
 				if self.verbose:
 					self.__teePrintOrNot(f"{len(self)} records rewrote to {self._fileName}")
 			if not self.appendThread.is_alive():
@@ -1669,26 +2290,13 @@ memoryOnly:{self.memoryOnly}
 			if (not self.monitor_external_changes) and self.externalFileUpdateTime < getFileUpdateTimeNs(self._fileName):
 				self.__teePrintOrNot(f"Warning: Overwriting external changes in {self._fileName}",'warning')
 			file = self.get_file_obj('wb')
-			buf = io.BufferedWriter(file, buffer_size=64*1024*1024)  # 64MB buffer
-			if self.header:
-				header = self.delimiter.join(_sanitize(self.header,delimiter=self.delimiter))
-				buf.write(header.encode(self.encoding,errors='replace') + b'\n')
-			# Persist the defaults line (right after the header) so it survives a
-			# full rewrite -- it is not a regular mapping key.
-			if self.defaults and len(self.defaults) > 1:
-				defaultsLine = self.delimiter.join(_sanitize(self.defaults,delimiter=self.delimiter))
-				buf.write(defaultsLine.encode(self.encoding,errors='replace') + b'\n')
-			for key in self:
-				# '#'-prefixed keys are in-memory only (comments / internal); never written.
-				if str(key).startswith('#'):
-					continue
-				segments = _sanitize(self[key],delimiter=self.delimiter)
-				buf.write(self.delimiter.join(segments).encode(encoding=self.encoding,errors='replace')+b'\n')
-			buf.flush()
+			self._writeAllLines(file)
 			self.release_file_obj(file)
 			if self.verbose:
 				self.__teePrintOrNot(f"{len(self)} records written to {self._fileName}")
 				self.__teePrintOrNot(f"File {self._fileName} size: {os.path.getsize(self._fileName)}")
+			self.markReplayed()
+			self.fileBytes = self.liveBytes
 			self.dirty = False
 			self.deSynced = False
 		except Exception as e:
@@ -1699,6 +2307,98 @@ memoryOnly:{self.memoryOnly}
 			self.deSynced = True
 		return self
 	
+	def _writeAllLines(self,file):
+		# Stream the header, the defaults line and every row into file, about WRITE_CHUNK_SIZE bytes per write
+		lines = []
+		if self.header:
+			lines.append(self.delimiter.join(_sanitize(self.header,delimiter=self.delimiter)))
+		# Persist the defaults line (right after the header) so it survives a
+		# full rewrite -- it is not a regular mapping key.
+		if self.defaults and len(self.defaults) > 1:
+			lines.append(self.delimiter.join(_sanitize(self.defaults,delimiter=self.delimiter)))
+		chunkSize = 0
+		for key in self:
+			# '#'-prefixed keys are in-memory only (comments / internal); never written.
+			if str(key).startswith('#'):
+				continue
+			line = self.delimiter.join(_sanitize(self[key],delimiter=self.delimiter))
+			lines.append(line)
+			chunkSize += len(line) + 1
+			if chunkSize >= WRITE_CHUNK_SIZE:
+				file.write(_encodeLines(lines,self.encoding))
+				lines.clear()
+				chunkSize = 0
+		if lines:
+			file.write(_encodeLines(lines,self.encoding))
+
+	def atomicMapToFile(self):
+		'''
+		Rewrite the file by streaming the current data into a sibling temp file, syncing it, and
+		os.replace()-ing it over the original while holding the file lock.
+		A crash leaves either the old file or the new one, never a torn mix of both.
+		Compressed files are written through their compressor the same way.
+		On failure the original file is left untouched and deSynced is set.
+		'''
+		mec = self.monitor_external_changes
+		self.monitor_external_changes = False
+		dirName, baseName = os.path.split(os.path.abspath(self._fileName))
+		root, ext = os.path.splitext(baseName)
+		# keep the extension so the temp file gets the same compression
+		tempFileName = os.path.join(dirName, f'.{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}')
+		lockFile = None
+		file = None
+		self.writeLock.acquire()
+		try:
+			if self.externalFileUpdateTime < getFileUpdateTimeNs(self._fileName):
+				self.__teePrintOrNot(f"Warning: Overwriting external changes in {self._fileName}",'warning')
+			# lock the original (through a raw handle, never written to) so other writers wait for the swap
+			lockFile = open(self._fileName,'ab')
+			_lockFileObj(lockFile)
+			file = openFileAsCompressed(tempFileName, mode='wb', encoding=self.encoding,teeLogger=self.teeLogger)
+			self._writeAllLines(file)
+			file.close()  # compressors write their trailer on close
+			fd = os.open(tempFileName,os.O_RDWR)
+			try:
+				_syncFileDescriptor(fd,datasync = self.datasync)
+			finally:
+				os.close(fd)
+			if os.name == 'nt':
+				# Windows cannot replace a file that is still open
+				_unlockFileObj(lockFile)
+				lockFile.close()
+			os.replace(tempFileName,self._fileName)
+			_syncDirectory(dirName)
+			self.unsyncedBytes = 0
+			if self.verbose:
+				self.__teePrintOrNot(f"{len(self)} records written to {self._fileName}")
+				self.__teePrintOrNot(f"File {self._fileName} size: {os.path.getsize(self._fileName)}")
+			self.markReplayed()
+			self.fileBytes = self.liveBytes
+			self.dirty = False
+			self.deSynced = False
+		except Exception as e:
+			self.__teePrintOrNot(f"Failed to write at atomicMapToFile() to {self._fileName}: {e}",'error')
+			import traceback
+			self.__teePrintOrNot(traceback.format_exc(),'error')
+			self.deSynced = True
+			try:
+				if file is not None:
+					file.close()
+				os.unlink(tempFileName)
+			except OSError:
+				pass
+		finally:
+			if lockFile is not None and not lockFile.closed:
+				try:
+					_unlockFileObj(lockFile)
+				except OSError:
+					pass
+				lockFile.close()
+			self.writeLock.release()
+		self.externalFileUpdateTime = getFileUpdateTimeNs(self._fileName)
+		self.monitor_external_changes = mec
+		return self
+
 	def mapToFile(self):
 		mec = self.monitor_external_changes
 		self.monitor_external_changes = False
@@ -1761,6 +2461,8 @@ memoryOnly:{self.memoryOnly}
 			if self.verbose:
 				self.__teePrintOrNot(f"{len(self)} records written to {self._fileName}")
 				self.__teePrintOrNot(f"File {self._fileName} size: {os.path.getsize(self._fileName)}")
+			self.markReplayed()
+			self.fileBytes = self.liveBytes
 			self.dirty = False
 			self.deSynced = False
 		except Exception as e:
@@ -1789,37 +2491,139 @@ memoryOnly:{self.memoryOnly}
 			self.externalFileUpdateTime = realExternalFileUpdateTime
 		return self
 
+	def _idleTimeout(self):
+		# How long the idle worker may sleep before periodic work is due; None waits for queued lines
+		timeouts = []
+		if self.monitor_external_changes:
+			timeouts.append(self.external_check_interval)
+		if self.deSynced:
+			timeouts.append(self.append_check_delay)
+		if self.dirty and self.rewrite_interval:
+			timeouts.append(self.rewrite_interval)
+		if self.unsyncedBytes and self.fsyncMode == 'interval':
+			timeouts.append(max(0.0,self.fsyncLimit - (time.monotonic() - self.lastSyncTime)))
+		return min(timeouts) if timeouts else None
+
+	def _waitForBatch(self):
+		with self.appendCondition:
+			self.workerIdle = True
+			while not self.appendQueue and not self.shutdownEvent.is_set():
+				timeout = self._idleTimeout()
+				if not self.appendCondition.wait(timeout) and timeout is not None:
+					break
+			self.workerIdle = False
+			if not self.appendQueue:
+				return
+			# give the batch up to max_batch_delay to fill before committing it
+			self.workerFilling = True
+			deadline = time.monotonic() + self.max_batch_delay
+			while len(self.appendQueue) < self.max_batch_size and not self.blockedProducers and not self.shutdownEvent.is_set():
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					break
+				self.appendCondition.wait(remaining)
+			self.workerFilling = False
+
+	def _nextPassDelay(self):
+		# Seconds until the append pool should visit this instance again, or None
+		if self.shutdownEvent.is_set():
+			return None
+		if self.appendQueue:
+			return 0 if self.blockedProducers or len(self.appendQueue) >= self.max_batch_size else self.max_batch_delay
+		return self._idleTimeout()
+
+	def _poolPass(self):
+		# One append pool visit; the pool syncs once every file of the pass is committed
+		if self.memoryOnly:
+			return
+		self.deferSync = True
+		try:
+			self.checkExternalChanges()
+			self.rewrite()
+			self.commitAppendToFile(maxLines = self.max_batch_size)
+		finally:
+			self.deferSync = False
+
 	def _appendWorker(self):
 		while not self.shutdownEvent.is_set():
+			self._waitForBatch()
 			if not self.memoryOnly:
 				self.checkExternalChanges()
 				self.rewrite()
 				self.commitAppendToFile()
-			time.sleep(self.append_check_delay)
-			# self.appendEvent.wait()
-			# self.appendEvent.clear()
+				if self._syncDue():
+					self.syncFile()
 		if self.verbose:
 			self.__teePrintOrNot(f"Append worker for {self._fileName} shut down")
 		self.commitAppendToFile()
+		if self.fsyncMode != 'never':
+			self.syncFile()
+
+	def _syncDue(self):
+		# Whether the appended but unsynced bytes should be synced now under the fsync policy
+		if not self.unsyncedBytes or self.fsyncMode == 'never':
+			return False
+		if self.fsyncMode == 'interval':
+			return time.monotonic() - self.lastSyncTime >= self.fsyncLimit
+		if self.fsyncMode == 'bytes':
+			return self.unsyncedBytes >= self.fsyncLimit
+		return True
+
+	def _syncFileObj(self,file):
+		_syncFileDescriptor(file.fileno(),datasync = self.datasync)
+		self.unsyncedBytes = 0
+		self.lastSyncTime = time.monotonic()
+
+	def syncFile(self):
+		'''
+		Force lines committed so far to disk, regardless of the fsync policy.
+		'''
+		if not self.unsyncedBytes:
+			return self
+		try:
+			with self.writeLock:
+				with open(self._fileName,'ab') as file:
+					self._syncFileObj(file)
+		except Exception as e:
+			self.__teePrintOrNot(f"Failed to sync {self._fileName}: {e}",'error')
+		return self
 
-	def commitAppendToFile(self):
+	def commitAppendToFile(self,maxLines = None):
+		'''
+		Write queued lines to the file: all of them, or at most maxLines.
+		'''
 		if self.appendQueue:
 			if self.memoryOnly:
 				self.appendQueue.clear()
+				self._releaseAppendRoom(self.appendQueueBytes)
 				if self.verbose:
 					self.__teePrintOrNot("Memory only mode. Append queue cleared.") 
 				return self
 			file = None
+			queuedSize = 0
 			try:
 				if self.verbose:
 					self.__teePrintOrNot(f"Commiting {len(self.appendQueue)} records to {self._fileName}")
 					self.__teePrintOrNot(f"Before size of {self._fileName}: {os.path.getsize(self._fileName)}")
 				file = self.get_file_obj('ab')
-				buf = io.BufferedWriter(file, buffer_size=64*1024*1024)  # 64MB buffer
-				while self.appendQueue:
-					line = _sanitize(self.appendQueue.popleft(),delimiter=self.delimiter)
-					buf.write(self.delimiter.join(line).encode(encoding=self.encoding,errors='replace')+b'\n')
-				buf.flush()
+				sizeBefore = file.tell()
+				lines = []
+				while self.appendQueue and (maxLines is None or len(lines) < maxLines):
+					line = self.appendQueue.popleft()
+					queuedSize += _queuedLineSize(line)
+					lines.append(line)
+				if self.coalesce:
+					keptLines = _coalesceLines(lines)
+					self.coalescedLines += len(lines) - len(keptLines)
+					lines = keptLines
+				# encode the whole batch at once and hand it to the file in one write
+				data = _encodeLines([self.delimiter.join(_sanitize(line,delimiter=self.delimiter)) for line in lines],self.encoding)
+				self.unsyncedBytes += len(data)
+				file.write(data)
+				if sizeBefore == self.replayedSize:
+					# nothing else was appended since the last read: our own lines need no replay
+					file.flush()
+					self.markReplayed()
 				self.release_file_obj(file)
 				if self.verbose:
 					self.__teePrintOrNot(f"Records commited to {self._fileName}")
@@ -1830,6 +2634,8 @@ memoryOnly:{self.memoryOnly}
 				import traceback
 				self.__teePrintOrNot(traceback.format_exc(),'error')
 				self.deSynced = True
+			finally:
+				self._releaseAppendRoom(queuedSize)
 		return self
 	
 	def stopAppendThread(self):
@@ -1839,9 +2645,18 @@ memoryOnly:{self.memoryOnly}
 				#     self.__teePrintOrNot(f"Append thread for {self._fileName} already stopped")
 				return
 			self.rewrite(force=self.rewrite_on_exit)  # Ensure any final sync operations are performed
-			# self.appendEvent.set()
 			self.shutdownEvent.set()  # Signal the append thread to shut down
-			self.appendThread.join()  # Wait for the append thread to complete 
+			with self.appendQueueRoom:
+				self.appendQueueRoom.notify_all()  # release producers blocked on a full queue
+			if self.appendPool is not None:
+				self.appendPool.unregister(self)
+				self.commitAppendToFile()
+				if self.fsyncMode != 'never':
+					self.syncFile()
+			else:
+				with self.appendCondition:
+					self.appendCondition.notify()
+				self.appendThread.join()  # Wait for the append thread to complete 
 			if self.verbose:
 				self.__teePrintOrNot(f"Append thread for {self._fileName} stopped")
 		except Exception as e:
@@ -1857,13 +2672,14 @@ memoryOnly:{self.memoryOnly}
 				self.encoding = 'utf8'
 			file = openFileAsCompressed(self._fileName, mode=modes, encoding=self.encoding,teeLogger=self.teeLogger)
 			# Lock the file after opening
-			if os.name == 'posix':
-				fcntl.lockf(file, fcntl.LOCK_EX)
-			elif os.name == 'nt':
-				# For Windows, locking the entire file, avoiding locking an empty file
-				#lock_length = max(1, os.path.getsize(self._fileName))
-				lock_length = 2147483647
-				msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, lock_length)
+			_lockFileObj(file)
+			# atomicMapToFile() (here or in another process) may have swapped in a new file while we
+			# waited for the lock; writing to the old one would lose the lines
+			while os.name == 'posix' and 'r' not in modes and _replacedSinceOpen(file,self._fileName):
+				_unlockFileObj(file)
+				file.close()
+				file = openFileAsCompressed(self._fileName, mode=modes, encoding=self.encoding,teeLogger=self.teeLogger)
+				_lockFileObj(file)
 			if self.verbose:
 				self.__teePrintOrNot(f"File {self._fileName} locked with mode {modes}")
 		except Exception as e:
@@ -1882,18 +2698,11 @@ memoryOnly:{self.memoryOnly}
 			return
 		try:
 			file.flush()  # Ensure the file is flushed before unlocking
-			os.fsync(file.fileno())  # Ensure the file is synced to disk before unlocking
+			# Full rewrites always sync; appends follow the fsync policy
+			if 'a' not in str(getattr(file,'mode','')) or (self._syncDue() and not self.deferSync):
+				self._syncFileObj(file)
 			if not file.closed:
-				if os.name == 'posix':
-					fcntl.lockf(file, fcntl.LOCK_UN)
-				elif os.name == 'nt':
-					# Unlocking the entire file; for Windows, ensure not unlocking an empty file
-					#unlock_length = max(1, os.path.getsize(os.path.realpath(file.name)))
-					unlock_length = 2147483647
-					try:
-						msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, unlock_length)
-					except Exception:
-						pass
+				_unlockFileObj(file)
 				file.close()  # Ensure file is closed after unlocking
 			if self.verbose:
 				self.__teePrintOrNot(f"File {file.name} unlocked / released")
@@ -1972,6 +2781,15 @@ class TSVZedLite(MutableMapping):
 		Pre-existing index dictionary mapping keys to file positions (default: ...).
 	fileObj : file object, optional
 		Pre-existing file object to use (default: ...).
+	write_buffer_size : int, optional
+		If set, appended rows are collected in a write buffer of this many bytes before being
+		written (65536 is a good size). Offsets come from a tracked tail position instead of
+		a seek / tell per write. 0 writes every row through (default: 0).
+	write_buffer_delay : float, optional
+		The buffer is also written on the first write after it has held rows for this many
+		seconds, and on flush(), reload(), switchFile() and close(). Nothing writes it between
+		writes, so call flush() when going idle. Rows still in the buffer are read from it
+		(default: 1).
 	Attributes
 	----------
 	version : str
@@ -1990,7 +2808,7 @@ class TSVZedLite(MutableMapping):
 	- The special key DEFAULTS_INDICATOR_KEY is used to store and retrieve default column values.
 	- Empty values in rows are automatically filled with defaults if available.
 	- The class implements the MutableMapping interface, providing dict-like operations.
-	- File operations are buffered and written immediately (append-only for updates).
+	- File operations are append-only for updates, and written through unless write_buffer_size is set.
 	- Deleted entries are marked by writing a row with only the key (empty values).
 	Examples
 	--------
@@ -2013,9 +2831,15 @@ class TSVZedLite(MutableMapping):
 	def __init__ (self,fileName,header = '',createIfNotExist = True,verifyHeader = True,
 					verbose = False,encoding = 'utf8',
 					delimiter = ...,defaults = None,strict = True,correctColumnNum = -1,
-					indexes = ..., fileObj = ...
+					indexes = ..., fileObj = ...,
+					write_buffer_size = 0, write_buffer_delay = 1
 					):
 		self.version = version
+		self.write_buffer_size = write_buffer_size
+		self.write_buffer_delay = write_buffer_delay
+		self.writeBuffer = bytearray()
+		self.writeBufferTime = 0
+		self.tailPosition = None
 		self.strict = strict
 		self._fileName = fileName
 		self.delimiter = get_delimiter(delimiter,file_name=fileName)
@@ -2080,15 +2904,30 @@ class TSVZedLite(MutableMapping):
 		return self.indexes.values()
 
 	def reload(self):
+		if not self.fileObj.closed:
+			self.flush()
+		self.tailPosition = None
 		self.indexes.clear()
 		return self.load()
 
+	def flush(self):
+		if self.writeBuffer:
+			if self.verbose:
+				eprint(f"Writing {len(self.writeBuffer)} buffered bytes at position {self.tailPosition - len(self.writeBuffer)}")
+			self.fileObj.seek(self.tailPosition - len(self.writeBuffer))
+			self.fileObj.write(self.writeBuffer)
+			self.writeBuffer.clear()
+		self.fileObj.flush()
+		return self
+
 	def getListView(self):
 		return getListView(self,header=self.header,delimiter=self.delimiter)
 
 	def clear_file(self):
 		if self.verbose:
 			eprint(f"Clearing {self._fileName}")
+		self.writeBuffer.clear()
+		self.tailPosition = 0
 		self.fileObj.seek(0)
 		self.fileObj.truncate()
 		if self.verbose:
@@ -2097,7 +2936,7 @@ class TSVZedLite(MutableMapping):
 			location = self.__writeValues(self.header)
 			if self.verbose:
 				eprint(f"Header {self.header} written to {self._fileName}")
-				eprint(f"At {location} size: {self.fileObj.tell()}")
+				eprint(f"At {location} size: {self.tailPosition}")
 		return self
 	
 	def switchFile(self,newFileName,createIfNotExist = ...,verifyHeader = ...):
@@ -2105,7 +2944,7 @@ class TSVZedLite(MutableMapping):
 			createIfNotExist = self.createIfNotExist
 		if verifyHeader is ...:
 			verifyHeader = self.verifyHeader
-		self.fileObj.close()
+		self.close()
 		self._fileName = newFileName
 		self.reload()
 		self.fileObj = open(self._fileName,'r+b')
@@ -2116,15 +2955,24 @@ class TSVZedLite(MutableMapping):
 	# Private methods for reading and writing values for TSVZedLite
 
 	def __writeValues(self,data):
-		self.fileObj.seek(0, os.SEEK_END)
-		write_at = self.fileObj.tell()
+		if self.tailPosition is None:
+			self.fileObj.seek(0, os.SEEK_END)
+			self.tailPosition = self.fileObj.tell()
+		write_at = self.tailPosition
 		if self.verbose:
 			eprint(f"Writing at position {write_at}")
 		data = _sanitize(data,delimiter=self.delimiter)
 		data = self.delimiter.join(data)
-		bytes = self.fileObj.write((data.encode(encoding=self.encoding,errors='replace') + b'\n'))
+		data = data.encode(encoding=self.encoding,errors='replace') + b'\n'
+		now = time.monotonic()
+		if not self.writeBuffer:
+			self.writeBufferTime = now
+		self.writeBuffer += data
+		self.tailPosition += len(data)
 		if self.verbose:
-			eprint(f"Wrote {bytes} bytes")
+			eprint(f"Buffered {len(data)} bytes")
+		if len(self.writeBuffer) >= self.write_buffer_size or now - self.writeBufferTime >= self.write_buffer_delay:
+			self.flush()
 		return write_at
 
 	def __mapDeleteToFile(self,key):
@@ -2149,8 +2997,15 @@ class TSVZedLite(MutableMapping):
 		self.__writeValues([key])
 
 	def __readValuesAtPos(self,pos,key = ...):
-		self.fileObj.seek(pos)
-		line = self.fileObj.readline().decode(self.encoding,errors='replace')
+		bufferStart = self.tailPosition - len(self.writeBuffer) if self.writeBuffer else None
+		if bufferStart is not None and pos >= bufferStart:
+			# not written yet, read from the write buffer
+			end = self.writeBuffer.find(b'\n', pos - bufferStart)
+			line = bytes(self.writeBuffer[pos - bufferStart:end + 1 if end >= 0 else len(self.writeBuffer)])
+		else:
+			self.fileObj.seek(pos)
+			line = self.fileObj.readline()
+		line = line.decode(self.encoding,errors='replace')
 		self.correctColumnNum, segments = _processLine(
 						line=line,
 						taskDic={},
@@ -2346,6 +3201,7 @@ file_descriptor:{self.fileObj.fileno()}
 		)
 	def copy(self):
 		'Return a shallow copy of the ordered dictionary.'
+		self.flush()
 		new = self.__class__(
 			self._fileName,
 			self.header,
@@ -2392,6 +3248,8 @@ file_descriptor:{self.fileObj.fileno()}
 		return self
 	
 	def close(self):
+		if not self.fileObj.closed:
+			self.flush()
 		self.fileObj.close()
 		return self
 
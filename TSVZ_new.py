@@ -4,8 +4,10 @@ TSVZ core library implementing tsvz-spec-v1.
 
 This module provides an append-only write-ahead log (WAL) for tabular
 key–value data. Compaction is performed by :func:`snapshot_part` (a
-simplified form of specification §19), which rewrites a part from live
-state rather than mutating historical records in place. Readers follow the
+simplified form of specification §19, for single-part stores) and by
+:func:`snapshot_parts` (the full §19 procedure, run in the background by
+:meth:`MultiPartStore.compact`), which write live state to a new file
+rather than mutating historical records in place. Readers follow the
 current specification only; legacy escaping and tombstone conventions are
 not accepted.
 
@@ -16,11 +18,14 @@ thin compatibility wrappers.
 
 Implemented
 -----------
-- §4 — commit boundary and torn-tail discard (:func:`committed_payload`)
+- §4 — commit boundary and torn-tail discard (:func:`committed_payload`,
+  :func:`iter_committed_blocks`)
 - §5 — delimiter inference from ``.tsv`` / ``.csv`` / ``.nsv`` / ``.psv``
   and the corresponding ``*z`` extensions
 - §6–§7 — single-part replay (:func:`process_record`, :func:`replay_bytes`,
-  :func:`replay_part`)
+  :func:`replay_stream`, :func:`replay_part`; uncompressed parts may be
+  replayed from a read-only ``mmap``, and large parts on several cores by
+  :func:`replay_part_parallel`)
 - §8 — empty-key ignore; §9 — lone-key tombstones; §10 — trailing-whitespace
   strip
 - §11 — ``#`` comments and header-as-comment
@@ -30,22 +35,35 @@ Implemented
 - §13 — field escaping (``<sep>``, ``<LF>``, ``<lt>``, ``<#>``)
 - §14 — defaults, fill-empty, and return-on-missing behaviour
 - §16 — transparent compression for ``.gz`` / ``.bz2`` / ``.xz`` / ``.zst``
-- Simplified §19 — :func:`snapshot_part` rewrites one part with a marker
-  preamble and live rows, discarding superseded values, tombstones, and
-  non-header comments
-- Stores — :class:`WalStore` (asynchronous append) and :class:`OffsetStore`
-  (key→byte-offset index)
+- §17 — multi-part stores: :func:`discover_parts` (hex-ordinal order,
+  ``.rotated`` parts excluded), cross-part replay by :func:`replay_parts`
+  (parts replayed on several cores) and ``read_store(multipart=True)``,
+  and :class:`MultiPartStore`, which writes to a fresh UUIDv7-ordinal
+  active part (:func:`new_part_ordinal`)
+- §18.4 — ``#_write_ack_#`` is read into :class:`ReaderState` and is the
+  default level of :class:`WriteAck` acknowledgements from
+  :meth:`WalStore.put`; a :class:`WalStore` syncs every flush unless a
+  relaxed :class:`DurabilityPolicy` is passed explicitly
+- Simplified §19 — :func:`snapshot_part` atomically replaces one part with
+  a marker preamble and live rows, discarding superseded values,
+  tombstones, and non-header comments
+- Full §19 — :meth:`MultiPartStore.compact` moves the writer to a fresh
+  active part and snapshots the immutable prefix in a worker process with
+  :func:`snapshot_parts`, into a part slotted between the prefix and the
+  active part, then applies the ``#_rotate_#`` action (:func:`rotate_parts`)
+- Stores — :class:`WalStore` (asynchronous append, flushed by a shared
+  :class:`FlushScheduler`; :meth:`WalStore.refresh` replays only the lines
+  other writers appended) and :class:`OffsetStore`
+  (key→byte-offset index with an optional bounded :class:`LRURowCache`
+  and a :class:`PartWatermark`-checked sidecar index for fast reopen)
 
 Not yet implemented
 -------------------
 - §15 integrity — ``#_checksum_<algo>_#`` is classified and ignored (no
   digest arming or verification); unrecognized markers are likewise skipped
   on the data path
-- ``#_rotate_#`` / ``#_write_ack_#`` — recognized as markers but treated as
-  no-ops in :func:`apply_marker`
-- §17 multi-part stores (``store.tsvz.<ordinal>``, cross-part replay)
-- Full §19 snapshot procedure (ordinal slotting, ``.rotated`` exclusion,
-  immutable prefix with an active writer)
+- §19.4 — absent trailing columns of rows written under an earlier
+  ``#_defaults_#`` are not baked into snapshots
 
 Examples:
 	>>> import os, tempfile
@@ -58,16 +76,30 @@ Examples:
 	{'alice': ['alice', 'Alice', '10']}
 	>>> os.unlink(path)
 """
+import array
 import atexit
+import bisect
 import contextlib
+import functools
+import gc
+import hashlib
+import heapq
 import io
+import itertools
+import json
+import mmap
+import multiprocessing
 import os
+import queue
 import re
+import struct
 import sys
 import threading
 import time
+import weakref
 from collections import OrderedDict, deque
 from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
 
 if os.name == 'nt':
 	import msvcrt
@@ -79,10 +111,23 @@ __version__ = '4.0.0'
 DEFAULT_DELIMITER = '\t'
 MARKER_DEFAULTS = '#_defaults_#'
 MAX_SPEC_VERSION = 1
+DEFAULT_BLOCK_SIZE = 1 << 20
+DEFAULT_WRITE_BUFFER = 1 << 16
+DEFAULT_COMPACT_MIN_BYTES = 64 << 20
+PARALLEL_MIN_CHUNK_SIZE = 1 << 23
+WATERMARK_WINDOW = 4096
+INDEX_FORMAT = 1
+CHECKPOINT_MAGIC = b'TSVZCKPT'
+CHECKPOINT_FORMAT = 1
+_CHECKPOINT_SEPARATORS = ('\x00', '\x1f', '\x1e', '\ufffe')
 
 COMPRESSION_EXTENSIONS = frozenset(
 	{'gz', 'gzip', 'bz2', 'bzip2', 'xz', 'lzma', 'zst', 'zstd'})
 STRICT_EXTENSIONS = frozenset({'.tsvz', '.csvz', '.nsvz', '.psvz'})
+FORMAT_EXTENSIONS = STRICT_EXTENSIONS | {'.tsv', '.csv', '.nsv', '.psv'}
+ROTATED_INFIX = '.rotated'
+ROTATE_ACTIONS = ('keep', 'rename', 'delete')
+_PART_SUFFIX_RE = re.compile(r'\.([0-9A-Fa-f]+)(\.rotated)?(?:\.([A-Za-z0-9]+))?', re.ASCII)
 
 MARKER_RE = re.compile(r'^#_[A-Za-z0-9_-]+_#$', re.ASCII)
 CHECKSUM_MARKER_RE = re.compile(r'^#_checksum_[A-Za-z0-9_-]+_#$', re.ASCII)
@@ -93,6 +138,7 @@ OFFICIAL_MARKERS = frozenset({
 })
 
 _TOMBSTONE = object()
+_MARKER_LINE_RE = re.compile(rb'^#_', re.MULTILINE)
 
 
 # ---------------------------------------------------------------------------
@@ -115,9 +161,17 @@ class ReaderState:
 			``defaults``.
 		return_on_missing (bool): If True, synthesize a defaults row for
 			absent keys instead of raising ``KeyError``.
+		write_ack (str | None): Advisory ``#_write_ack_#`` value
+			(``'memory'`` or ``'disk'``, §18.4), or ``None`` if the part has
+			not set one (the built-in default, ``memory``). It has no effect
+			on reconstructed data.
+		rotate (str): ``#_rotate_#`` action applied to the parts a snapshot
+			subsumes (§19.5): ``'keep'`` (the default), ``'rename'`` or
+			``'delete'``. It has no effect on reconstructed data.
 	"""
 
-	__slots__ = ('defaults', 'fill_empty', 'return_on_missing', 'strip_trailing', 'version')
+	__slots__ = ('defaults', 'fill_empty', 'return_on_missing', 'rotate', 'strip_trailing',
+				 'version', 'write_ack')
 
 	def __init__(self):
 		self.version = 1
@@ -125,6 +179,8 @@ class ReaderState:
 		self.strip_trailing = True
 		self.fill_empty = False
 		self.return_on_missing = True
+		self.write_ack = None
+		self.rotate = 'keep'
 
 	def copy(self):
 		"""Return a deep copy of this state (defaults list is independent).
@@ -146,6 +202,34 @@ class ReaderState:
 		s.strip_trailing = self.strip_trailing
 		s.fill_empty = self.fill_empty
 		s.return_on_missing = self.return_on_missing
+		s.write_ack = self.write_ack
+		s.rotate = self.rotate
+		return s
+
+	def as_dict(self):
+		"""Return a JSON-serializable snapshot of this state.
+
+		Returns:
+			dict: Field name → value.
+
+		Examples:
+			>>> ReaderState.from_dict(ReaderState().as_dict()).as_dict() == ReaderState().as_dict()
+			True
+		"""
+		return {name: getattr(self, name) for name in self.__slots__}
+
+	@classmethod
+	def from_dict(cls, data):
+		"""Rebuild a state from :meth:`as_dict` output; unknown keys are ignored.
+
+		Returns:
+			ReaderState: The restored state.
+		"""
+		s = cls()
+		for name in cls.__slots__:
+			if name in data:
+				setattr(s, name, data[name])
+		s.defaults = list(s.defaults)
 		return s
 
 
@@ -166,11 +250,109 @@ class StoreEntry:
 		self.row_defaults = list(row_defaults)
 		self.fill_empty = fill_empty
 
+	def __reduce__(self):
+		# Cheaper to pickle than the default slots state (parallel replay results).
+		return StoreEntry, (self.row, self.row_defaults, self.fill_empty)
+
 
 def _strip_field(raw, enabled):
 	return raw if not enabled else raw.rstrip(' \t')
 
 
+class FieldCodec:
+	"""Compiled §13 field codec for one delimiter.
+
+	Decoding is a single regex substitution over ``<...>`` sequences
+	(unrecognized names pass through unchanged); encoding is one
+	:meth:`str.translate` call. Both return the input untouched when it
+	cannot contain anything to rewrite. Obtain instances via
+	:func:`get_codec`, which caches one codec per delimiter.
+
+	Args:
+		delimiter: Field delimiter expanded from / escaped as ``<sep>``.
+
+	Examples:
+		>>> codec = get_codec('\\t')
+		>>> codec.decode_row(['k', 'a<sep>b', '<<sep>'])
+		['k', 'a\\tb', '<<sep>']
+		>>> codec.encode_row(['#k', 'a\\tb', '#v'])
+		['<#>k', 'a<sep>b', '#v']
+	"""
+
+	__slots__ = ('_encode_table', '_escape_key', '_needs_escape', '_repl', 'delimiter')
+
+	_ESCAPE_RE = re.compile(r'<([^>]*)>')
+
+	def __init__(self, delimiter):
+		self.delimiter = delimiter
+		names = {'sep': delimiter, 'LF': '\n', 'lt': '<', '#': '#'}
+		self._repl = lambda m: names.get(m.group(1), m.group(0))
+		# The delimiter wins if it collides with another escaped character.
+		self._encode_table = {ord('\n'): '<LF>', ord('<'): '<lt>', ord(delimiter): '<sep>'}
+		self._needs_escape = re.compile('[' + re.escape(delimiter + '\n<') + ']').search
+		self._escape_key = delimiter != '#'
+
+	def decode(self, raw):
+		"""Decode one escaped field (see :func:`decode_field`)."""
+		if '<' not in raw:
+			return raw
+		return self._ESCAPE_RE.sub(self._repl, raw)
+
+	def encode(self, value, is_key=False):
+		"""Encode one field for writing (see :func:`encode_field`)."""
+		value = '' if value is None else str(value)
+		if self._needs_escape(value):
+			value = value.translate(self._encode_table)
+		if is_key and self._escape_key and value[:1] == '#':
+			value = '<#>' + value[1:]
+		return value
+
+	def decode_row(self, fields):
+		"""Decode every field of a split row.
+
+		Returns:
+			list: Decoded fields.
+		"""
+		decode = self.decode
+		return [decode(f) for f in fields]
+
+	def encode_row(self, fields):
+		"""Encode a row, applying the key rule to field 0.
+
+		Returns:
+			list: Encoded fields, ready to be joined with the delimiter.
+		"""
+		encode = self.encode
+		out = [encode(f) for f in fields]
+		if out and self._escape_key and out[0][:1] == '#':
+			out[0] = '<#>' + out[0][1:]
+		return out
+
+	def encode_line(self, fields):
+		"""Encode a row of strings and join it, scanning the row for escapes once.
+
+		Returns:
+			str: Encoded line without a trailing newline.
+		"""
+		if self._needs_escape(''.join(fields)):
+			return self.delimiter.join(self.encode_row(fields))
+		line = self.delimiter.join(fields)
+		if self._escape_key and line[:1] == '#':
+			line = '<#>' + line[1:]
+		return line
+
+
+@functools.lru_cache(maxsize=None)
+def get_codec(delimiter):
+	"""Return the cached :class:`FieldCodec` for ``delimiter``.
+
+	Examples:
+		>>> get_codec('|') is get_codec('|')
+		True
+	"""
+	return FieldCodec(delimiter)
+
+
 def decode_field(raw, delimiter):
 	"""Decode a single escaped field according to specification §13.
 
@@ -197,30 +379,7 @@ def decode_field(raw, delimiter):
 		>>> decode_field('<future>', '\\t')
 		'<future>'
 	"""
-	out = []
-	i = 0
-	while i < len(raw):
-		if raw[i] == '<':
-			end = raw.find('>', i + 1)
-			if end == -1:
-				out.append(raw[i:])
-				break
-			name = raw[i + 1:end]
-			if name == 'sep':
-				out.append(delimiter)
-			elif name == 'LF':
-				out.append('\n')
-			elif name == 'lt':
-				out.append('<')
-			elif name == '#':
-				out.append('#')
-			else:
-				out.append(raw[i:end + 1])
-			i = end + 1
-		else:
-			out.append(raw[i])
-			i += 1
-	return ''.join(out)
+	return get_codec(delimiter).decode(raw)
 
 
 def encode_field(value, delimiter, *, is_key=False):
@@ -252,20 +411,7 @@ def encode_field(value, delimiter, *, is_key=False):
 		>>> encode_field(None, '\\t')
 		''
 	"""
-	value = '' if value is None else str(value)
-	out = []
-	for i, ch in enumerate(value):
-		if ch == delimiter:
-			out.append('<sep>')
-		elif ch == '\n':
-			out.append('<LF>')
-		elif ch == '<':
-			out.append('<lt>')
-		elif ch == '#' and is_key and i == 0:
-			out.append('<#>')
-		else:
-			out.append(ch)
-	return ''.join(out)
+	return get_codec(delimiter).encode(value, is_key)
 
 
 def _default_at(defaults, col_j):
@@ -343,9 +489,10 @@ def classify_record(f0_raw):
 def apply_marker(state, f0_raw, value_fields, delimiter):
 	"""Apply an official marker line to ``state`` (specification §12).
 
-	Unrecognized or no-op markers (``#_rotate_#``, ``#_write_ack_#``) leave
-	``state`` unchanged. Value fields are decoded without trailing-whitespace
-	stripping.
+	Unrecognized markers leave ``state`` unchanged. The advisory
+	``#_write_ack_#`` and ``#_rotate_#`` are recorded in ``state.write_ack``
+	and ``state.rotate`` for writers but do not affect decoding. Value fields are decoded without
+	trailing-whitespace stripping.
 
 	Args:
 		state: Reader state to update in place.
@@ -367,9 +514,15 @@ def apply_marker(state, f0_raw, value_fields, delimiter):
 		>>> apply_marker(st, '#_strip_trailing_whites_#', ['false'], '\\t')
 		>>> st.strip_trailing
 		False
+		>>> apply_marker(st, '#_write_ack_#', ['Disk'], '\\t')
+		>>> st.write_ack
+		'disk'
+		>>> apply_marker(st, '#_rotate_#', ['rename'], '\\t')
+		>>> st.rotate
+		'rename'
 	"""
 	kl = f0_raw.lower()
-	decoded = [decode_field(_strip_field(f, False), delimiter) for f in value_fields]
+	decoded = get_codec(delimiter).decode_row(value_fields)
 	if kl == '#_version_#':
 		if not decoded or decoded[0] == '':
 			state.version = 1
@@ -389,6 +542,12 @@ def apply_marker(state, f0_raw, value_fields, delimiter):
 	elif kl == '#_return_defaults_when_missing_#':
 		b = _parse_bool(decoded[0] if decoded else '')
 		state.return_on_missing = True if b is None else b
+	elif kl == '#_write_ack_#':
+		ack = decoded[0].strip().lower() if decoded else ''
+		state.write_ack = ack if ack in ('memory', 'disk') else None
+	elif kl == '#_rotate_#':
+		action = decoded[0].strip().lower() if decoded else ''
+		state.rotate = action if action in ROTATE_ACTIONS else 'keep'
 
 
 def committed_payload(data):
@@ -420,21 +579,27 @@ def committed_payload(data):
 	return b'' if last_nl == -1 else data[:last_nl + 1]
 
 
-def _resolve_value_columns(fields, state, delimiter):
+def _resolve_value_columns(fields, state, delimiter, escaped=True, padded=True):
 	"""Strip, decode, and optionally fill present-empty value cells.
 
 	Implements specification §§7.9 and 14.2. Absent trailing columns are not
 	padded; only cells that are present and empty are filled when
-	``state.fill_empty`` is True.
+	``state.fill_empty`` is True. Fields without ``<`` are taken verbatim
+	(they cannot contain an escape sequence).
 
 	Args:
 		fields: Raw delimiter-split fields with the key at index 0.
 		state: Current reader state controlling strip/fill behaviour.
 		delimiter: Field delimiter used when decoding.
+		escaped: If False, the caller has checked that no field contains
+			``<`` and decoding is skipped.
+		padded: If False, the caller has checked that no field ends in a
+			space or tab and stripping is skipped.
 
 	Returns:
-		tuple: ``(row, defaults_snapshot, fill_empty)`` where ``row`` is
-		``[key, value…]``.
+		tuple: ``(row, defaults, fill_empty)`` where ``row`` is
+		``[key, value…]`` and ``defaults`` is the state's current defaults
+		list (copied by :class:`StoreEntry`).
 
 	Examples:
 		>>> st = ReaderState(); st.defaults = ['n/a', '0']
@@ -449,14 +614,47 @@ def _resolve_value_columns(fields, state, delimiter):
 		>>> _resolve_value_columns(['k', 'a<sep>b'], st, '\\t')[0]
 		['k', 'a\\tb']
 	"""
-	key = decode_field(_strip_field(fields[0], state.strip_trailing), delimiter)
-	row = [key]
-	for j in range(1, len(fields)):
-		cell = decode_field(_strip_field(fields[j], state.strip_trailing), delimiter)
-		if cell == '' and state.fill_empty:
-			cell = _default_at(state.defaults, j)
-		row.append(cell)
-	return row, list(state.defaults), state.fill_empty
+	if state.strip_trailing and padded:
+		row = [c.rstrip(' \t') for c in fields]
+	else:
+		row = list(fields)
+	if escaped:
+		row = get_codec(delimiter).decode_row(row)
+	defaults = state.defaults
+	if state.fill_empty:
+		for j in range(1, len(row)):
+			if row[j] == '':
+				row[j] = _default_at(defaults, j)
+	return row, defaults, state.fill_empty
+
+
+def _apply_data_record(fields, state, store, delimiter, offset, store_offset,
+					   values_cache, escaped=True, padded=True):
+	"""Apply one data row or tombstone (§7.6–§7.9, §9) to ``store``."""
+	if len(fields) == 1:
+		key = _strip_field(fields[0], state.strip_trailing)
+		if escaped:
+			key = decode_field(key, delimiter)
+		if key == '':
+			return 'data', None
+		store.pop(key, None)
+		if values_cache is not None:
+			values_cache.pop(key, None)
+		return 'tombstone', key
+	row, row_defaults, fill_empty = _resolve_value_columns(
+		fields, state, delimiter, escaped, padded,
+	)
+	key = row[0]
+	if key == '':
+		return 'data', None
+	entry = StoreEntry(row, row_defaults, fill_empty)
+	if store_offset and offset is not None:
+		store[key] = offset
+	else:
+		store[key] = entry
+	if values_cache is not None:
+		values_cache[key] = list(row)
+	return 'data', entry
 
 
 def process_record(raw_line, state, store, delimiter, *, offset=None,
@@ -504,34 +702,162 @@ def process_record(raw_line, state, store, delimiter, *, offset=None,
 	if kind == 'marker':
 		apply_marker(state, f0, fields[1:], delimiter)
 		return kind, None
-	is_tombstone = len(fields) == 1
-	key = decode_field(_strip_field(f0, state.strip_trailing), delimiter)
-	if key == '':
-		return 'data', None
-	if is_tombstone:
-		store.pop(key, None)
-		if values_cache is not None:
-			values_cache.pop(key, None)
-		return 'tombstone', key
-	row, row_defaults, fill_empty = _resolve_value_columns(fields, state, delimiter)
-	entry = StoreEntry(row, row_defaults, fill_empty)
-	if store_offset and offset is not None:
-		store[key] = offset
-	else:
-		store[key] = entry
-	if values_cache is not None:
-		values_cache[key] = list(row)
-	return 'data', entry
+	return _apply_data_record(fields, state, store, delimiter, offset, store_offset, values_cache)
+
+
+def iter_committed_blocks(f, block_size=DEFAULT_BLOCK_SIZE):
+	"""Yield newline-terminated blocks of a part read from a binary stream.
+
+	``f`` is read in ``block_size`` chunks; the partial last line of each
+	chunk is carried over to the next one, so every yielded block ends with
+	``\\n``. Bytes after the final newline are never yielded (specification
+	§4 torn-tail discard).
+
+	Args:
+		f: Binary file-like object positioned at the start of the part.
+		block_size: Number of bytes requested per ``read`` call.
+
+	Yields:
+		tuple: ``(offset, block)`` where ``offset`` is the byte position of
+		``block`` within the stream.
+
+	Examples:
+		>>> list(iter_committed_blocks(io.BytesIO(b'a\\nbb\\ntorn'), block_size=3))
+		[(0, b'a\\n'), (2, b'bb\\n')]
+	"""
+	offset = 0
+	carry = []
+	while True:
+		chunk = f.read(block_size)
+		if not chunk:
+			return
+		last_nl = chunk.rfind(b'\n')
+		if last_nl == -1:
+			carry.append(chunk)
+			continue
+		head = chunk[:last_nl + 1]
+		if carry:
+			carry.append(head)
+			head = b''.join(carry)
+		carry = [chunk[last_nl + 1:]]
+		yield offset, head
+		offset += len(head)
+
+
+def _replay_lines(payload, end, state, store, delimiter, *, encoding='utf8',
+				  base=0, start=0, store_offset=False, values_cache=None,
+				  batch_size=DEFAULT_BLOCK_SIZE):
+	"""Replay each committed line of ``payload[start:end]`` into ``store``.
+
+	``base`` is the byte offset of ``payload`` within the part, so that
+	stored offsets stay absolute when a part is replayed block by block.
+
+	The range is walked in newline-aligned batches of about ``batch_size``
+	bytes (so a mapped part is never copied whole). Each batch is decoded
+	once and split in bulk; when offsets are needed the batch is split as
+	bytes instead and the running position is tracked. Lines not starting
+	with ``#`` cannot be comments or markers and skip
+	:func:`classify_record`; per-field decoding and stripping are skipped
+	for lines that contain no ``<`` or no whitespace before a delimiter.
+	Offset-only replays without a values cache go through
+	:func:`_index_lines` instead.
+	"""
+	if store_offset and values_cache is None:
+		_index_lines(
+			payload, end, state, store, delimiter, encoding=encoding, base=base,
+			start=start, batch_size=batch_size,
+		)
+		return
+	end = payload.rfind(b'\n', start, end) + 1
+	pos = start
+	space_pad = ' ' + delimiter
+	tab_pad = '\t' + delimiter
+	while pos < end:
+		stop = payload.find(b'\n', min(pos + batch_size, end) - 1, end) + 1
+		if store_offset:
+			offset = base + pos
+			lines = payload[pos:stop - 1].split(b'\n')
+		else:
+			offset = None
+			lines = payload[pos:stop - 1].decode(encoding, errors='replace').split('\n')
+		pos = stop
+		for line in lines:
+			if store_offset:
+				line_offset = offset
+				offset += len(line) + 1
+				line = line.decode(encoding, errors='replace')
+			else:
+				line_offset = None
+			if line.endswith('\r'):  # noqa: FURB188  # removesuffix needs 3.9+
+				line = line[:-1]
+			if not line:
+				continue
+			if line[0] == '#':
+				process_record(
+					line, state, store, delimiter, offset=line_offset,
+					store_offset=store_offset, values_cache=values_cache,
+				)
+			else:
+				_apply_data_record(
+					line.split(delimiter), state, store, delimiter, line_offset,
+					store_offset, values_cache, '<' in line,
+					line[-1] in ' \t' or space_pad in line or tab_pad in line,
+				)
+
+
+def _index_lines(payload, end, state, store, delimiter, *, encoding='utf8', base=0,
+				 start=0, batch_size=DEFAULT_BLOCK_SIZE):
+	"""Key→offset replay of ``payload[start:end]`` that never decodes value columns.
+
+	Data lines are partitioned once on the delimiter and only the key is
+	decoded; a line without a delimiter is a tombstone. Lines starting with
+	``#`` still go through :func:`process_record` so markers keep updating
+	``state``. Like the rest of the reader, this assumes an ASCII-compatible
+	encoding.
+	"""
+	decode = get_codec(delimiter).decode
+	sep = delimiter.encode(encoding)
+	end = payload.rfind(b'\n', start, end) + 1
+	pos = start
+	while pos < end:
+		stop = payload.find(b'\n', min(pos + batch_size, end) - 1, end) + 1
+		offset = base + pos
+		lines = payload[pos:stop - 1].split(b'\n')
+		pos = stop
+		for line in lines:
+			line_offset = offset
+			offset += len(line) + 1
+			if line.endswith(b'\r'):  # noqa: FURB188
+				line = line[:-1]
+			if line[:1] == b'#':
+				process_record(
+					line.decode(encoding, errors='replace'), state, store, delimiter,
+					offset=line_offset, store_offset=True,
+				)
+				continue
+			key, found, _ = line.partition(sep)
+			if state.strip_trailing:
+				key = key.rstrip(b' \t')
+			key = decode(key.decode(encoding, errors='replace'))
+			if not key:
+				continue
+			if found:
+				store[key] = line_offset
+			else:
+				store.pop(key, None)
 
 
 def replay_bytes(data, delimiter, *, encoding='utf8', store=None,
 				 store_offset=False, values_cache=None):
 	"""Replay committed bytes into a key→entry mapping (last write wins).
 
-	Only the committed payload is processed (see :func:`committed_payload`).
+	Only the committed payload is processed (see :func:`committed_payload`);
+	lines are walked in place, without copying the payload first. ``data``
+	may be any buffer with ``find``/``rfind`` and slicing, such as a
+	read-only :class:`mmap.mmap` of the part.
 
 	Args:
-		data: Raw part bytes.
+		data: Raw part bytes, or an ``mmap`` of an uncompressed part.
 		delimiter: Field delimiter.
 		encoding: Text encoding used to decode lines.
 		store: Optional existing mapping to update; a new
@@ -551,30 +877,70 @@ def replay_bytes(data, delimiter, *, encoding='utf8', store=None,
 	if store is None:
 		store = OrderedDict()
 	state = ReaderState()
-	payload = committed_payload(data)
-	pos = 0
-	while pos < len(payload):
-		nl = payload.find(b'\n', pos)
-		if nl == -1:
-			break
-		line = payload[pos:nl].decode(encoding, errors='replace')
-		if line.endswith('\r'):  # noqa: FURB188  # removesuffix needs 3.9+
-			line = line[:-1]
-		if line:
-			process_record(
-				line, state, store, delimiter,
-				offset=pos, store_offset=store_offset, values_cache=values_cache,
-			)
-		pos = nl + 1
+	if data:
+		_replay_lines(
+			data, data.rfind(b'\n') + 1, state, store, delimiter, encoding=encoding,
+			store_offset=store_offset, values_cache=values_cache,
+		)
+	return store, state
+
+
+def replay_stream(f, delimiter, *, encoding='utf8', store=None, store_offset=False,
+				  values_cache=None, block_size=DEFAULT_BLOCK_SIZE, state=None, base=0):
+	"""Replay a binary stream block by block (bounded-memory replay).
+
+	Equivalent to :func:`replay_bytes` over the whole stream, but only one
+	block (plus any line carried over from the previous block) is held in
+	memory at a time. The torn tail is discarded as in specification §4.
+
+	Args:
+		f: Binary file-like object positioned at the start of the part.
+		delimiter: Field delimiter.
+		encoding: Text encoding used to decode lines.
+		store: Optional existing mapping to update.
+		store_offset: If True, store byte offsets instead of entries.
+		values_cache: Optional key→row cache filled during replay.
+		block_size: Number of bytes read per block.
+		state: Reader state to resume from; a fresh :class:`ReaderState`
+			when ``None``.
+		base: Offset of the stream's current position within the part.
+
+	Returns:
+		tuple: ``(store, state)`` after replaying the stream.
+
+	Examples:
+		>>> store, _ = replay_stream(io.BytesIO(b'a\\t1\\nb\\t2\\na\\ntorn'), '\\t', block_size=4)
+		>>> [(k, v.row) for k, v in store.items()]
+		[('b', ['b', '2'])]
+	"""
+	if store is None:
+		store = OrderedDict()
+	if state is None:
+		state = ReaderState()
+	for offset, block in iter_committed_blocks(f, block_size):
+		_replay_lines(
+			block, len(block), state, store, delimiter, encoding=encoding,
+			base=base + offset, store_offset=store_offset, values_cache=values_cache,
+		)
 	return store, state
 
 
 def replay_part(path, delimiter, *, encoding='utf8', store=None,
-				store_offset=False, values_cache=None):
+				store_offset=False, values_cache=None, block_size=DEFAULT_BLOCK_SIZE,
+				use_mmap=False, state=None, start=0):
 	"""Replay a part file from disk into a key→entry mapping.
 
 	If ``path`` does not exist, returns an empty store paired with a fresh
-	:class:`ReaderState`. Otherwise delegates to :func:`replay_bytes`.
+	:class:`ReaderState`. Otherwise the part is streamed through
+	:func:`replay_stream`, so peak memory is the live state plus one block.
+	With ``use_mmap``, an uncompressed part is instead memory-mapped and
+	replayed in place by :func:`replay_bytes`: the page cache backs the data
+	and only individual line slices are copied. Compressed parts always use
+	the streaming path.
+
+	``state`` and ``start`` resume a replay that already covered the part up
+	to the line boundary ``start`` (for example from a :class:`PartWatermark`
+	and a saved index); only the bytes after it are read.
 
 	Args:
 		path: Filesystem path of the part.
@@ -583,21 +949,339 @@ def replay_part(path, delimiter, *, encoding='utf8', store=None,
 		store: Optional existing mapping to update.
 		store_offset: If True, store byte offsets instead of entries.
 		values_cache: Optional key→row cache filled during replay.
+		block_size: Number of (decompressed) bytes read per block.
+		use_mmap: If True, memory-map uncompressed parts instead of reading
+			them block by block.
+		state: Reader state in effect at ``start``; fresh when ``None``.
+		start: Byte offset (at a line boundary) to resume replay from.
 
 	Returns:
 		tuple: ``(store, state)`` after replaying the part.
 	"""
 	if store is None:
 		store = OrderedDict()
+	if state is None:
+		state = ReaderState()
 	try:
+		if use_mmap and not _is_compressed(path):
+			with _map_part(path) as view:
+				_replay_lines(
+					view, view.rfind(b'\n') + 1, state, store, delimiter, encoding=encoding,
+					start=start, store_offset=store_offset, values_cache=values_cache,
+				)
+				return store, state
 		with open_part(path, 'rb', encoding=encoding) as f:
-			data = f.read()
+			if start:
+				f.seek(start)
+			return replay_stream(
+				f, delimiter, encoding=encoding, store=store, store_offset=store_offset,
+				values_cache=values_cache, block_size=block_size, state=state, base=start,
+			)
+	except FileNotFoundError:
+		return store, state
+
+
+class _ChunkSink:
+	"""Local store for one parallel replay chunk.
+
+	Records every key tombstoned inside the chunk in ``dropped`` so the
+	chunk can later be merged over the preceding chunks' state.
+	"""
+
+	__slots__ = ('dropped', 'items')
+
+	def __init__(self):
+		self.items = OrderedDict()
+		self.dropped = set()
+
+	def __setitem__(self, key, value):
+		self.items[key] = value
+
+	def pop(self, key, default=None):
+		self.dropped.add(key)
+		return self.items.pop(key, default)
+
+
+def _replay_chunk(source, start, stop, state, delimiter, encoding, store_offset, want_values):
+	"""Process-pool worker: replay ``[start, stop)`` of a part from ``state``.
+
+	``source`` is either the path of an uncompressed part (mapped by the
+	worker) or the chunk's bytes when the part is compressed.
+	"""
+	sink = _ChunkSink()
+	values = {} if want_values else None
+	if isinstance(source, bytes):
+		_replay_lines(
+			source, len(source), state, sink, delimiter, encoding=encoding, base=start,
+			store_offset=store_offset, values_cache=values,
+		)
+	else:
+		with _map_part(source) as view:
+			_replay_lines(
+				view, stop, state, sink, delimiter, encoding=encoding, start=start,
+				store_offset=store_offset, values_cache=values,
+			)
+	return sink.items, sink.dropped, values
+
+
+def _chunk_bounds(view, end, count):
+	"""Split ``view[:end]`` into at most ``count`` newline-aligned ranges."""
+	bounds = [0]
+	for i in range(1, count):
+		nl = view.find(b'\n', max(end * i // count, bounds[-1]), end)
+		if nl == -1 or nl + 1 >= end:
+			break
+		if nl + 1 > bounds[-1]:
+			bounds.append(nl + 1)
+	bounds.append(end)
+	return bounds
+
+
+def _marker_lines(view, end, encoding, start=0):
+	"""Yield ``(pos, stop, line)`` for every line of ``view[start:end]`` starting with ``#_``.
+
+	Only such lines can be markers (§12), so a regex scan for them is enough
+	to follow the forward-only marker state without parsing data rows.
+	``stop`` is the offset just past the line's newline.
+	"""
+	for m in _MARKER_LINE_RE.finditer(view, start, end):
+		pos = m.start()
+		stop = view.find(b'\n', pos, end)
+		line = view[pos:stop].decode(encoding, errors='replace')
+		if line.endswith('\r'):  # noqa: FURB188
+			line = line[:-1]
+		yield pos, stop + 1, line
+
+
+def _chunk_states(view, bounds, delimiter, encoding):
+	"""Return the reader state at each chunk start, plus the final state."""
+	state = ReaderState()
+	states = []
+	scratch = {}
+	for pos, _, line in _marker_lines(view, bounds[-1], encoding):
+		while len(states) < len(bounds) - 1 and bounds[len(states)] <= pos:
+			states.append(state.copy())
+		process_record(line, state, scratch, delimiter)
+	while len(states) < len(bounds) - 1:
+		states.append(state.copy())
+	return states, state
+
+
+def scan_marker_states(path, delimiter, *, encoding='utf8', state=None, start=0):
+	"""Return the reader state in effect after each marker line of a part.
+
+	Used to decode a single row read back at an arbitrary offset with the
+	same §12 state a full replay would have applied to it.
+
+	Args:
+		path: Filesystem path of an uncompressed part.
+		delimiter: Field delimiter.
+		encoding: Text encoding used to decode lines.
+		state: Reader state in effect at ``start``; fresh when ``None``.
+		start: Line-boundary offset to begin scanning from.
+
+	Returns:
+		tuple: ``(offsets, states, end)`` where ``states[i]`` applies to rows
+		at or after ``offsets[i]`` and ``end`` is the committed length
+		scanned.
+
+	Examples:
+		>>> import os, tempfile
+		>>> fd, path = tempfile.mkstemp(suffix='.tsv'); os.close(fd)
+		>>> open(path, 'w').write('a\\t1\\n#_defaults_#\\tx\\nb\\t2\\n')
+		23
+		>>> offsets, states, end = scan_marker_states(path, '\\t')
+		>>> offsets, [s.defaults for s in states], end
+		([19], [['x']], 23)
+		>>> os.unlink(path)
+	"""
+	offsets, states = [], []
+	state = ReaderState() if state is None else state.copy()
+	scratch = {}
+	try:
+		with _map_part(path) as view:
+			end = view.rfind(b'\n') + 1
+			for _, stop, line in _marker_lines(view, end, encoding, start):
+				kind, _ = process_record(line, state, scratch, delimiter)
+				if kind == 'marker':
+					offsets.append(stop)
+					states.append(state.copy())
+	except FileNotFoundError:
+		end = 0
+	return offsets, states, end
+
+
+def replay_part_parallel(path, delimiter, *, encoding='utf8', store=None,
+						 store_offset=False, values_cache=None, workers=None,
+						 min_chunk_size=PARALLEL_MIN_CHUNK_SIZE):
+	"""Replay a large part on several cores; the result matches :func:`replay_part`.
+
+	The committed payload is split into newline-aligned chunks. A pre-scan
+	of ``#_`` lines yields the §12 marker state at every chunk start, and
+	each chunk is then replayed in a process pool into a local map that also
+	records the keys tombstoned inside it. Chunks are merged in order by
+	first dropping those keys and then assigning the local rows, which
+	reproduces sequential last-write-wins values, tombstones that cross
+	chunk boundaries, and first-appearance ordering.
+
+	Uncompressed parts are memory-mapped by each worker; compressed parts
+	are decompressed once here and their chunks shipped to the workers.
+	Parts smaller than two chunks, or ``workers <= 1``, are replayed in
+	this process. Garbage collection is paused while chunks are replayed
+	and their results transferred. Workers are started with ``forkserver``
+	(or ``spawn``), never ``fork``, as the caller may be running flusher
+	threads.
+
+	Args:
+		path: Filesystem path of the part.
+		delimiter: Field delimiter.
+		encoding: Text encoding used to decode lines.
+		store: Optional existing mapping to update.
+		store_offset: If True, store byte offsets instead of entries.
+		values_cache: Optional key→row cache filled during replay.
+		workers: Number of worker processes; ``None`` uses all CPUs.
+		min_chunk_size: Smallest chunk, in bytes, worth handing to a worker.
+
+	Returns:
+		tuple: ``(store, state)`` after replaying the part.
+	"""
+	if store is None:
+		store = OrderedDict()
+	workers = workers or os.cpu_count() or 1
+	try:
+		with contextlib.ExitStack() as stack:
+			if _is_compressed(path):
+				with open_part(path, 'rb', encoding=encoding) as f:
+					view = f.read()
+			else:
+				view = stack.enter_context(_map_part(path))
+			end = view.rfind(b'\n') + 1
+			count = min(workers, end // max(min_chunk_size, 1))
+			if count < 2:
+				state = ReaderState()
+				_replay_lines(
+					view, end, state, store, delimiter, encoding=encoding,
+					store_offset=store_offset, values_cache=values_cache,
+				)
+				return store, state
+			bounds = _chunk_bounds(view, end, count)
+			states, state = _chunk_states(view, bounds, delimiter, encoding)
+			sources = (
+				[path] * len(states) if isinstance(view, mmap.mmap)
+				else [view[a:b] for a, b in zip(bounds, bounds[1:])]
+			)
 	except FileNotFoundError:
 		return store, ReaderState()
-	return replay_bytes(
-		data, delimiter, encoding=encoding, store=store,
-		store_offset=store_offset, values_cache=values_cache,
-	)
+	n = len(states)
+	with _gc_paused(), ProcessPoolExecutor(
+		max_workers=min(workers, n), mp_context=_worker_context(), initializer=gc.disable,
+	) as pool:
+		results = pool.map(
+			_replay_chunk, sources, bounds[:-1], bounds[1:], states, [delimiter] * n,
+			[encoding] * n, [store_offset] * n, [values_cache is not None] * n,
+		)
+		for items, dropped, values in results:
+			for key in dropped:
+				store.pop(key, None)
+				if values_cache is not None:
+					values_cache.pop(key, None)
+			for key, value in items.items():
+				store[key] = value
+			if values_cache is not None:
+				values_cache.update(values)
+	return store, state
+
+
+def _part_marker_lines(path, encoding):
+	"""Process-pool worker: every ``#_`` line of a part's committed payload, in order."""
+	try:
+		if not _is_compressed(path):
+			with _map_part(path) as view:
+				return [line for _, _, line in _marker_lines(view, view.rfind(b'\n') + 1, encoding)]
+		lines = []
+		with open_part(path, 'rb', encoding=encoding) as f:
+			for _, block in iter_committed_blocks(f):
+				lines.extend(line for _, _, line in _marker_lines(block, len(block), encoding))
+		return lines
+	except FileNotFoundError:
+		return []
+
+
+def _replay_part_worker(path, state, delimiter, encoding, use_mmap):
+	"""Process-pool worker: replay a whole part from ``state`` into a local map."""
+	sink = _ChunkSink()
+	replay_part(path, delimiter, encoding=encoding, store=sink, state=state, use_mmap=use_mmap)
+	return sink.items, sink.dropped
+
+
+def replay_parts(paths, delimiter, *, encoding='utf8', store=None, workers=1,
+				 use_mmap=False):
+	"""Replay the parts of a multi-part store as one concatenation (§17.4).
+
+	Parts are applied in the order given (see :func:`discover_parts`), and
+	marker state, last-wins and tombstones all carry across part
+	boundaries. With one worker each part is replayed in turn by
+	:func:`replay_part`, resuming from the previous part's reader state.
+
+	With several workers, a first pass collects the ``#_`` lines of every
+	part in a process pool, from which the §12 marker state at the start of
+	each part is worked out here. A second pass then decompresses and
+	replays every part from its start state in the pool, and the local maps
+	are merged in ordinal order as in :func:`replay_part_parallel`.
+	Compressed parts are therefore decompressed twice, both times in a
+	worker. Garbage collection is paused in the workers and while the
+	results are unpickled, which otherwise dominates the transfer cost.
+
+	Args:
+		paths: Part paths, earliest first.
+		delimiter: Field delimiter.
+		encoding: Text encoding used to decode lines.
+		store: Optional existing mapping to update.
+		workers: Number of worker processes; ``None`` uses all CPUs.
+		use_mmap: If True, memory-map uncompressed parts.
+
+	Returns:
+		tuple: ``(store, state)`` after replaying every part.
+
+	Examples:
+		>>> import os, tempfile
+		>>> d = tempfile.mkdtemp(); base = os.path.join(d, 'db.tsvz')
+		>>> open(base + '.1', 'w').write('#_defaults_#\\tx\\na\\t1\\nb\\t2\\n')
+		23
+		>>> open(base + '.2', 'w').write('a\\nc\\t\\n#_fill_empty_with_default_#\\ttrue\\nd\\t\\n')
+		41
+		>>> store, state = replay_parts(discover_parts(base), '\\t')
+		>>> [v.row for v in store.values()], state.defaults
+		([['b', '2'], ['c', ''], ['d', 'x']], ['x'])
+		>>> import shutil; shutil.rmtree(d)
+	"""
+	if store is None:
+		store = OrderedDict()
+	workers = workers or os.cpu_count() or 1
+	state = ReaderState()
+	if workers == 1 or len(paths) < 2:
+		for path in paths:
+			replay_part(path, delimiter, encoding=encoding, store=store, state=state, use_mmap=use_mmap)
+		return store, state
+	n = len(paths)
+	with _gc_paused(), ProcessPoolExecutor(
+		max_workers=min(workers, n), mp_context=_worker_context(), initializer=gc.disable,
+	) as pool:
+		states = []
+		scratch = {}
+		for lines in pool.map(_part_marker_lines, paths, [encoding] * n):
+			states.append(state.copy())
+			for line in lines:
+				process_record(line, state, scratch, delimiter)
+		results = pool.map(
+			_replay_part_worker, paths, states, [delimiter] * n, [encoding] * n, [use_mmap] * n,
+		)
+		for items, dropped in results:
+			for key in dropped:
+				store.pop(key, None)
+			for key, value in items.items():
+				store[key] = value
+	return store, state
 
 
 def resolve_missing_key(key, state):
@@ -651,7 +1335,7 @@ def format_data_row(fields, delimiter):
 		>>> format_data_row(['k', 'a\\tb'], '\\t')
 		'k\\ta<sep>b'
 	"""
-	return delimiter.join(encode_field(f, delimiter, is_key=(i == 0)) for i, f in enumerate(fields))
+	return delimiter.join(get_codec(delimiter).encode_row(fields))
 
 
 def format_tombstone(key, delimiter):
@@ -691,8 +1375,8 @@ def format_marker_line(marker_key, values, delimiter):
 		>>> format_marker_line('#_defaults_#', ['n/a', '0'], '\\t')
 		'#_defaults_#\\tn/a\\t0'
 	"""
-	parts = [marker_key] + [encode_field(v, delimiter) for v in values]
-	return delimiter.join(parts)
+	encode = get_codec(delimiter).encode
+	return delimiter.join([marker_key] + [encode(v) for v in values])
 
 
 def format_header_comment(columns, delimiter):
@@ -723,7 +1407,9 @@ def build_snapshot_preamble(state, delimiter):
 
 	Always includes ``#_version_#``. Optional markers are emitted only when
 	their values differ from the built-in defaults, except ``#_defaults_#``
-	which is emitted whenever defaults are non-empty.
+	which is emitted whenever defaults are non-empty and ``#_write_ack_#``
+	which is emitted whenever the part set one. ``#_rotate_#`` is emitted
+	unless it is ``keep``.
 
 	Args:
 		state: Reader state whose non-default settings are serialized.
@@ -746,19 +1432,88 @@ def build_snapshot_preamble(state, delimiter):
 		lines.append(format_marker_line('#_fill_empty_with_default_#', ['true'], delimiter))
 	if not state.return_on_missing:
 		lines.append(format_marker_line('#_return_defaults_when_missing_#', ['false'], delimiter))
+	if state.rotate != 'keep':
+		lines.append(format_marker_line('#_rotate_#', [state.rotate], delimiter))
 	if state.defaults:
 		lines.append(format_marker_line('#_defaults_#', state.defaults, delimiter))
+	if state.write_ack is not None:
+		lines.append(format_marker_line('#_write_ack_#', [state.write_ack], delimiter))
 	return lines
 
 
+def _pending_size(item):
+	# Approximate size of a queued row: its text plus a separator per field.
+	if isinstance(item, list):
+		return sum(map(len, item)) + len(item)
+	if isinstance(item, tuple):
+		return len(item[1]) + 1
+	if isinstance(item, _EncodedRows):
+		return len(item.data)
+	return 0
+
+
+def _pending_count(item):
+	return item.rows if isinstance(item, _EncodedRows) else 1
+
+
+def _coalesce_rows(items):
+	"""Fold queued rows for a key into the slot of its first queued row.
+
+	Replay is last-wins per key (§7) and a key keeps the position where it
+	first appeared, so a later row only needs its value written, at the
+	earlier row's place: ``a=1, b=1, a=2`` is written as ``a=2, b=1``.
+	Tombstones are never merged or skipped over, as a delete followed by a
+	re-add moves the key to the end; a row after a tombstone starts a new
+	slot. ``#``-keyed rows (markers) are barriers that nothing moves across,
+	since a marker can change how the rows after it replay; so are
+	:meth:`WalStore.put_many` batches, which are written as they were
+	encoded.
+
+	Args:
+		items: Queued rows and ``(_TOMBSTONE, key)`` tuples, oldest first.
+
+	Returns:
+		list: The surviving items, oldest first.
+
+	Examples:
+		>>> _coalesce_rows([['a', '1'], ['b', '1'], ['a', '2']])
+		[['a', '2'], ['b', '1']]
+		>>> _coalesce_rows([['a', '1'], ['a'], ['a', '2'], ['a', '3']])
+		[['a', '1'], ['a'], ['a', '3']]
+		>>> _coalesce_rows([['a', '1'], ['#_defaults_#', 'x'], ['a', '2']])
+		[['a', '1'], ['#_defaults_#', 'x'], ['a', '2']]
+	"""
+	kept = []
+	slots = {}
+	for item in items:
+		if isinstance(item, _EncodedRows):
+			slots.clear()
+			kept.append(item)
+			continue
+		key = item[1] if isinstance(item, tuple) else item[0]
+		if key.startswith('#'):
+			slots.clear()  # rows before a marker never merge with rows after it
+		elif isinstance(item, tuple) or len(item) == 1:
+			slots.pop(key, None)
+		elif key in slots:
+			kept[slots[key]] = item
+			continue
+		else:
+			slots[key] = len(kept)
+		kept.append(item)
+	return kept
+
+
 def _queue_item_to_bytes(item, delimiter, encoding):
+	if isinstance(item, _EncodedRows):
+		return item.data
 	if isinstance(item, tuple) and len(item) == 2 and item[0] is _TOMBSTONE:
 		line = format_tombstone(item[1], delimiter)
 	elif isinstance(item, list):
 		if len(item) == 1:
 			line = format_tombstone(item[0], delimiter)
-		elif item[0] == MARKER_DEFAULTS:
-			line = format_marker_line(MARKER_DEFAULTS, item[1:], delimiter)
+		elif item[0] in OFFICIAL_MARKERS:
+			line = format_marker_line(item[0], item[1:], delimiter)
 		else:
 			line = format_data_row(item, delimiter)
 	else:
@@ -775,11 +1530,44 @@ def _strip_compression_suffix(name):
 	return base if ext in COMPRESSION_EXTENSIONS else name.lower()
 
 
+def _format_name(path):
+	"""Lower-case ``path`` without its compression suffix and §17 part suffix."""
+	lower = _strip_compression_suffix(path)
+	base = lower[:-len(ROTATED_INFIX)] if lower.endswith(ROTATED_INFIX) else lower
+	base, _, ordinal = base.rpartition('.')
+	if ordinal and base.endswith(tuple(FORMAT_EXTENSIONS)) and all(c in '0123456789abcdef' for c in ordinal):
+		return base
+	return lower
+
+
+def _is_compressed(path):
+	return path.lower().rpartition('.')[2] in COMPRESSION_EXTENSIONS
+
+
+@contextlib.contextmanager
+def _map_part(path):
+	"""Map an uncompressed part read-only for zero-copy replay.
+
+	Yields ``b''`` for an empty part (which cannot be mapped). The part must
+	not be truncated while the mapping is in use.
+	"""
+	with open(path, 'rb') as f:
+		if not os.fstat(f.fileno()).st_size:
+			yield b''
+			return
+		view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			yield view
+		finally:
+			view.close()
+
+
 def is_strict_store(path):
 	"""Return True if ``path`` uses a strict ``*z`` store extension (§5).
 
-	Compression suffixes (``.gz``, ``.bz2``, and so on) are stripped before
-	the extension is examined.
+	Compression suffixes (``.gz``, ``.bz2``, and so on) and the part suffix
+	of a multi-part store (§17) are stripped before the extension is
+	examined.
 
 	Args:
 		path: Filesystem path to inspect.
@@ -791,10 +1579,10 @@ def is_strict_store(path):
 	Examples:
 		>>> is_strict_store('data.tsvz'), is_strict_store('data.tsv')
 		(True, False)
-		>>> is_strict_store('data.csvz.gz')
-		True
+		>>> is_strict_store('data.csvz.gz'), is_strict_store('data.tsvz.1f.gz')
+		(True, True)
 	"""
-	lower = _strip_compression_suffix(path)
+	lower = _format_name(path)
 	return any(lower.endswith(ext) for ext in STRICT_EXTENSIONS)
 
 
@@ -804,7 +1592,9 @@ def delimiter_for_path(path, delimiter=None):
 	When ``delimiter`` is not ``None``, it is returned as-is (or
 	:data:`DEFAULT_DELIMITER` if empty). Otherwise the delimiter is chosen
 	from the path extension: comma for ``.csv``/``.csvz``, NUL for
-	``.nsv``/``.nsvz``, pipe for ``.psv``/``.psvz``, and tab otherwise.
+	``.nsv``/``.nsvz``, pipe for ``.psv``/``.psvz``, and tab otherwise. The
+	parts of a multi-part store (``data.csvz.<ordinal>``) use the delimiter
+	of their format extension.
 
 	Args:
 		path: Filesystem path whose extension selects the delimiter.
@@ -816,14 +1606,14 @@ def delimiter_for_path(path, delimiter=None):
 	Examples:
 		>>> delimiter_for_path('x.tsv'), delimiter_for_path('x.csv'), delimiter_for_path('x.psv')
 		('\\t', ',', '|')
-		>>> delimiter_for_path('data.csv.gz')
-		','
+		>>> delimiter_for_path('data.csv.gz'), delimiter_for_path('data.csvz.0190a3.rotated.gz')
+		(',', ',')
 		>>> delimiter_for_path('x.unknown', delimiter='|')
 		'|'
 	"""
 	if delimiter is not None:
 		return delimiter or DEFAULT_DELIMITER
-	lower = _strip_compression_suffix(path)
+	lower = _format_name(path)
 	if lower.endswith(('.csv', '.csvz')):
 		return ','
 	if lower.endswith(('.nsv', '.nsvz')):
@@ -833,15 +1623,128 @@ def delimiter_for_path(path, delimiter=None):
 	return DEFAULT_DELIMITER
 
 
-def open_part(path, mode='rb', *, encoding='utf8', compress_level=1):
-	"""Open a part file, transparently handling common compression suffixes.
+_ORDINAL_LOCK = threading.Lock()
+_last_ordinal = 0
 
-	Supports ``.gz``/``.gzip``, ``.bz2``/``.bzip2``, ``.xz``/``.lzma``, and
-	``.zst``/``.zstd`` (specification §16). Uncompressed paths fall through
-	to the built-in :func:`open`.
+
+def new_part_ordinal(after=None):
+	"""Return a fresh part ordinal: a UUIDv7 as 32 hex digits (§17.6).
+
+	UUIDv7 leads with a millisecond Unix timestamp, so ordinals sort
+	chronologically, and fills the rest with random bits. Ordinals handed
+	out by this process always increase, and exceed ``after`` when given.
 
 	Args:
-		path: Filesystem path of the part.
+		after: Optional ordinal (hex string or int) the new one must follow,
+			such as the newest existing part's.
+
+	Returns:
+		str: 32 lower-case hex digits.
+
+	Examples:
+		>>> a = new_part_ordinal(); b = new_part_ordinal()
+		>>> len(a), a[12], int(b, 16) > int(a, 16)
+		(32, '7', True)
+		>>> new_part_ordinal(after='f' * 32)
+		'100000000000000000000000000000000'
+	"""
+	global _last_ordinal
+	rand = int.from_bytes(os.urandom(10), 'big')
+	value = ((time.time_ns() // 1_000_000) << 80 | 0x7 << 76 | (rand >> 68) << 64
+			 | 0b10 << 62 | rand & ((1 << 62) - 1))
+	if after is not None:
+		value = max(value, (int(after, 16) if isinstance(after, str) else after) + 1)
+	with _ORDINAL_LOCK:
+		value = _last_ordinal = max(value, _last_ordinal + 1)
+	return f'{value:032x}'
+
+
+def part_path(path, ordinal):
+	"""Return the path of the part ``ordinal`` of the store ``path`` (§17.2).
+
+	Args:
+		path: Store path up to and including the format extension.
+		ordinal: Hex string, or an int formatted full width (32 digits).
+
+	Returns:
+		str: ``<path>.<ordinal>``.
+
+	Examples:
+		>>> part_path('data.tsvz', 'a0'), part_path('data.tsvz', 255)[-4:]
+		('data.tsvz.a0', '00ff')
+	"""
+	if not isinstance(ordinal, str):
+		ordinal = f'{ordinal:032x}'
+	return f'{path}.{ordinal}'
+
+
+def _part_ordinal(path, part):
+	"""Ordinal of ``part`` of the store ``path`` as an int; -1 for ``path`` itself."""
+	if part == path:
+		return -1
+	return int(_PART_SUFFIX_RE.fullmatch(part, len(path)).group(1), 16)
+
+def discover_parts(path, *, include_rotated=False):
+	"""List the parts of the multi-part store ``path`` in replay order (§17).
+
+	Parts are the files named ``<path>.<ordinal>[.rotated][.<compression>]``
+	next to ``path``, ordered by ``ordinal`` read as a hexadecimal integer
+	(never lexically). Parts carrying ``.rotated`` are excluded unless
+	``include_rotated`` is set (§19.5). ``path`` itself, if it exists, is the
+	store's earliest part: a single-file store is the one-part case.
+
+	Args:
+		path: Store path up to and including the format extension.
+		include_rotated: If True, also list ``.rotated`` parts.
+
+	Returns:
+		list: Part paths, earliest first.
+
+	Examples:
+		>>> import os, tempfile
+		>>> d = tempfile.mkdtemp(); base = os.path.join(d, 'db.tsvz')
+		>>> for name in ('db.tsvz.10', 'db.tsvz.f.gz', 'db.tsvz.3.rotated', 'db.tsvz.a.idx'):
+		...     open(os.path.join(d, name), 'w').close()
+		>>> [os.path.basename(p) for p in discover_parts(base)]
+		['db.tsvz.f.gz', 'db.tsvz.10']
+		>>> len(discover_parts(base, include_rotated=True))
+		3
+		>>> import shutil; shutil.rmtree(d)
+	"""
+	directory, name = os.path.split(path)
+	try:
+		names = os.listdir(directory or '.')
+	except FileNotFoundError:
+		return []
+	found = []
+	for entry in names:
+		if entry == name:
+			found.append((-1, path))
+			continue
+		if not entry.startswith(name):
+			continue
+		m = _PART_SUFFIX_RE.fullmatch(entry, len(name))
+		if m is None:
+			continue
+		ordinal, rotated, codec = m.groups()
+		if codec and codec.lower() not in COMPRESSION_EXTENSIONS:
+			continue
+		if rotated and not include_rotated:
+			continue
+		found.append((int(ordinal, 16), os.path.join(directory, entry)))
+	found.sort()
+	return [part for _, part in found]
+
+
+def open_part(path, mode='rb', *, encoding='utf8', compress_level=1):
+	"""Open a part file, transparently handling common compression suffixes.
+
+	Supports ``.gz``/``.gzip``, ``.bz2``/``.bzip2``, ``.xz``/``.lzma``, and
+	``.zst``/``.zstd`` (specification §16). Uncompressed paths fall through
+	to the built-in :func:`open`.
+
+	Args:
+		path: Filesystem path of the part.
 		mode: Open mode (binary preferred; text modes are normalized).
 		encoding: Text encoding when opening in text mode.
 		compress_level: Compression level for write modes.
@@ -949,6 +1852,44 @@ def ensure_part_exists(path, *, create=True, encoding='utf8', delimiter=None,
 	return True
 
 
+class _RowSink:
+	"""Write-through adapter that stores replayed entries as row lists.
+
+	:func:`read_store` replays straight into the caller's mapping through
+	this adapter instead of building an intermediate store, so that peak
+	memory during load is the live state itself. For
+	:class:`~collections.OrderedDict` subclasses the base-class methods are
+	used, bypassing overrides (such as :class:`WalStore`'s) that would
+	persist the replayed rows again.
+
+	Args:
+		target: Mapping that receives ``key → row`` updates.
+	"""
+
+	__slots__ = ('_pop', '_set')
+
+	def __init__(self, target):
+		base = OrderedDict if isinstance(target, OrderedDict) else type(target)
+		self._set = base.__setitem__.__get__(target)
+		self._pop = base.pop.__get__(target)
+
+	def __setitem__(self, key, entry):
+		self._set(key, entry.row)
+
+	def put_row(self, key, row):
+		self._set(key, row)
+
+	def pop(self, key, default=None):
+		return self._pop(key, default)
+
+
+def _reset_mapping(store):
+	if isinstance(store, OrderedDict):
+		OrderedDict.clear(store)
+	else:
+		store.clear()
+
+
 def _attach_replay_meta(target, state, values_cache=None):
 	try:
 		target._reader_state = state
@@ -962,18 +1903,23 @@ def _attach_replay_meta(target, state, values_cache=None):
 # Public API
 # ---------------------------------------------------------------------------
 
-def read_last_record(path, *, encoding='utf8', delimiter=None, store_offset=False):
+def read_last_record(path, *, encoding='utf8', delimiter=None, store_offset=False,
+					 use_mmap=True):
 	"""Return the last committed data row in a part file.
 
 	When ``store_offset`` is True, returns the byte offset of that row instead
 	of its field list. Returns an empty list (or ``-1`` when
 	``store_offset`` is True) if the file is missing or contains no data rows.
+	The part is scanned forward (marker state can change the decoded row),
+	over an ``mmap`` for uncompressed parts unless ``use_mmap`` is False.
 
 	Args:
 		path: Filesystem path of the part.
 		encoding: Text encoding used to decode lines.
 		delimiter: Field delimiter; inferred from ``path`` when ``None``.
 		store_offset: If True, return the byte offset instead of the row.
+		use_mmap: If True, memory-map uncompressed parts instead of reading
+			them block by block.
 
 	Returns:
 		list | int: Last data row, its byte offset, or an empty sentinel.
@@ -988,32 +1934,51 @@ def read_last_record(path, *, encoding='utf8', delimiter=None, store_offset=Fals
 		>>> os.unlink(path)
 	"""
 	delimiter = delimiter or delimiter_for_path(path)
-	empty = -1 if store_offset else []
+	state = ReaderState()
+	scratch = _LastRecordSink()
 	try:
-		with open_part(path, 'rb', encoding=encoding) as f:
-			data = f.read()
+		if use_mmap and not _is_compressed(path):
+			with _map_part(path) as view:
+				_replay_lines(
+					view, view.rfind(b'\n') + 1, state, scratch, delimiter,
+					encoding=encoding, store_offset=True, values_cache=scratch,
+				)
+		else:
+			with open_part(path, 'rb', encoding=encoding) as f:
+				for base, block in iter_committed_blocks(f):
+					_replay_lines(
+						block, len(block), state, scratch, delimiter, encoding=encoding,
+						base=base, store_offset=True, values_cache=scratch,
+					)
 	except FileNotFoundError:
-		return empty
-	state = ReaderState()
-	result = empty
-	last_offset = -1
-	pos = 0
-	payload = committed_payload(data)
-	while pos < len(payload):
-		nl = payload.find(b'\n', pos)
-		if nl == -1:
-			break
-		line = payload[pos:nl].decode(encoding, errors='replace')
-		if line.endswith('\r'):  # noqa: FURB188  # removesuffix needs 3.9+
-			line = line[:-1]
-		if line:
-			scratch = OrderedDict()
-			kind, entry = process_record(line, state, scratch, delimiter)
-			if kind == 'data' and entry is not None:
-				last_offset = pos
-				result = pos if store_offset else list(entry.row)
-		pos = nl + 1
-	return last_offset if store_offset else result
+		pass
+	if scratch.offset == -1:
+		return -1 if store_offset else []
+	return scratch.offset if store_offset else scratch.row
+
+
+class _LastRecordSink:
+	"""Scratch mapping that remembers only the most recent data row.
+
+	Used by :func:`read_last_record` as both the offset store and the values
+	cache, so that a forward scan keeps no per-key state beyond the last
+	committed row and its offset.
+	"""
+
+	__slots__ = ('offset', 'row')
+
+	def __init__(self):
+		self.offset = -1
+		self.row = None
+
+	def __setitem__(self, key, value):
+		if isinstance(value, list):
+			self.row = value
+		else:
+			self.offset = value
+
+	def pop(self, key, default=None):
+		return default
 
 
 def _fit_row(row, column_count):
@@ -1046,17 +2011,21 @@ def _fit_row(row, column_count):
 
 def read_store(path, *, create=False, encoding='utf8', delimiter=None,
 			   defaults=None, store=None, store_offset=False, last_record_only=False,
-			   header=None):
+			   header=None, use_mmap=False, workers=1, cache_values=True,
+			   checkpoint=None, multipart=False):
 	"""Replay a part into an ordered mapping of key to row list (or byte offset).
 
 	Each row retains the width it was written with (specification §3.6).
+	The part is streamed block by block and replayed directly into ``store``,
+	so no intermediate copy of the file or of the live state is built.
 	Callers that require a fixed schema may pad or trim rows themselves, or
 	use the legacy :func:`readTabularFile` helper.
 
 	When ``store_offset`` is True, values are byte offsets rather than row
 	lists, and a ``_values_cache`` attribute is attached for on-demand
 	materialization. When ``last_record_only`` is True, delegates to
-	:func:`read_last_record`.
+	:func:`read_last_record`. With ``multipart``, ``path`` names a
+	multi-part store (§17) and all of its parts are replayed.
 
 	Args:
 		path: Filesystem path of the part.
@@ -1069,6 +2038,22 @@ def read_store(path, *, create=False, encoding='utf8', delimiter=None,
 		store_offset: If True, map keys to byte offsets instead of rows.
 		last_record_only: If True, return only the last committed data row.
 		header: Optional header columns written when creating a new part.
+		use_mmap: If True, memory-map uncompressed parts for replay (see
+			:func:`replay_part`).
+		workers: Number of processes used for replay; values other than 1
+			select :func:`replay_part_parallel` (``None`` uses all CPUs).
+		cache_values: With ``store_offset``, set False to build only the
+			offset index and skip the ``_values_cache`` rows.
+		checkpoint: ``True`` (``<path>.ckpt``) or a checkpoint path written
+			by :func:`save_checkpoint`. A checkpoint that still matches the
+			part is loaded and only the bytes after it are replayed; a stale
+			or unreadable one is ignored.
+		multipart: If True, replay every part of the store ``path`` found
+			by :func:`discover_parts`, in ordinal order, with
+			:func:`replay_parts`; ``workers`` then counts parts replayed at
+			once. ``create`` creates ``path`` only when the store has no
+			parts. Offsets, ``last_record_only`` and ``checkpoint`` need a
+			single part.
 
 	Returns:
 		MutableMapping: Live key→row (or key→offset) mapping.
@@ -1085,6 +2070,23 @@ def read_store(path, *, create=False, encoding='utf8', delimiter=None,
 	if store is None:
 		store = OrderedDict()
 	header_cols = _parse_columns(header, delimiter) if header else []
+	if multipart:
+		if store_offset or last_record_only or checkpoint:
+			raise ValueError('store_offset, last_record_only and checkpoint need a single part')
+		parts = discover_parts(path)
+		if not parts:
+			ensure_part_exists(
+				path, create=create, encoding=encoding, delimiter=delimiter,
+				header=header_cols or None, defaults=_normalize_defaults(defaults),
+			)
+			parts = [path]
+		_reset_mapping(store)
+		_, state = replay_parts(
+			parts, delimiter, encoding=encoding, store=_RowSink(store), workers=workers,
+			use_mmap=use_mmap,
+		)
+		_attach_replay_meta(store, state)
+		return store
 	ensure_part_exists(
 		path, create=create, encoding=encoding, delimiter=delimiter,
 		header=header_cols or None, defaults=_normalize_defaults(defaults),
@@ -1092,20 +2094,34 @@ def read_store(path, *, create=False, encoding='utf8', delimiter=None,
 	if last_record_only:
 		return read_last_record(path, encoding=encoding, delimiter=delimiter,
 								store_offset=store_offset)
-	values_cache = {} if store_offset else None
-	internal = OrderedDict()
-	replayed, state = replay_part(
-		path, delimiter, encoding=encoding, store=internal,
-		store_offset=store_offset, values_cache=values_cache,
-	)
-	store.clear()
-	if store_offset:
-		store.update(replayed)
-		_attach_replay_meta(store, state, values_cache)
+	values_cache = {} if store_offset and cache_values else None
+	_reset_mapping(store)
+	sink = store if store_offset else _RowSink(store)
+	resumed = None
+	if checkpoint and not store_offset:
+		resumed = _resume_from_checkpoint(
+			path, _checkpoint_path(path, checkpoint), delimiter, encoding,
+		)
+	if resumed is not None:
+		rows, state, start = resumed
+		for row in rows:
+			sink.put_row(row[0], row)
+		del rows
+		replay_part(
+			path, delimiter, encoding=encoding, store=sink, use_mmap=use_mmap,
+			state=state, start=start,
+		)
+	elif workers == 1:
+		_, state = replay_part(
+			path, delimiter, encoding=encoding, store=sink,
+			store_offset=store_offset, values_cache=values_cache, use_mmap=use_mmap,
+		)
 	else:
-		for key, entry in replayed.items():
-			store[key] = list(entry.row) if isinstance(entry, StoreEntry) else entry
-		_attach_replay_meta(store, state)
+		_, state = replay_part_parallel(
+			path, delimiter, encoding=encoding, store=sink,
+			store_offset=store_offset, values_cache=values_cache, workers=workers,
+		)
+	_attach_replay_meta(store, state, values_cache)
 	return store
 
 
@@ -1133,6 +2149,16 @@ def _coerce_row(row, delimiter):
 	return [str(c).rstrip() if c else '' for c in row]
 
 
+def _keyed_rows(items, delimiter):
+	"""Yield normalized rows from a mapping or ``(key, row)`` pairs, prefixing missing keys."""
+	if hasattr(items, 'items'):
+		items = items.items()
+	for key, row in items:
+		key = str(key).rstrip()
+		row = _coerce_row(row, delimiter)
+		yield row if row and row[0] == key else [key] + row
+
+
 def append_records(path, rows, *, create=False, encoding='utf8', delimiter=None,
 				   header=None):
 	"""Append data and tombstone rows to a part file.
@@ -1231,11 +2257,79 @@ def truncate_part(path, *, encoding='utf8', delimiter=None, header=None, default
 			f.write(line.encode(encoding, errors='replace') + b'\n')
 
 
+def _snapshot_lines(data, state, delimiter):
+	"""Marker preamble and live rows of a snapshot of ``data`` replayed to ``state`` (§19.2).
+
+	Rows are written fully resolved, so fill-empty stays off; stripping is
+	turned off only when a live value ends in whitespace that was kept
+	when it was written (§19.4). Where that leaves the snapshot's state
+	unlike ``state``, markers after the rows restore it, so that rows
+	appended to later parts replay as they did before the snapshot.
+
+	Examples:
+		>>> st = ReaderState(); st.fill_empty = True; st.defaults = ['D']
+		>>> _snapshot_lines({'a': ['a', '1 ']}, st, '\\t')
+		['#_version_#\\t1', '#_strip_trailing_whites_#\\tfalse', '#_defaults_#\\tD', 'a\\t1 ', '#_strip_trailing_whites_#\\ttrue', '#_fill_empty_with_default_#\\ttrue']
+	"""
+	snap = ReaderState()
+	snap.defaults = list(state.defaults)
+	snap.return_on_missing = state.return_on_missing
+	snap.write_ack = state.write_ack
+	snap.rotate = state.rotate
+	rows = []
+	for key, row in data.items():
+		if str(key).startswith('#'):
+			continue
+		if isinstance(row, list) and row:
+			rows.append(format_data_row(row, delimiter))
+			if snap.strip_trailing and any(field[-1:] in (' ', '\t') for field in row):
+				snap.strip_trailing = False
+	lines = build_snapshot_preamble(snap, delimiter) + rows
+	if snap.strip_trailing != state.strip_trailing:
+		lines.append(format_marker_line('#_strip_trailing_whites_#',
+										['true' if state.strip_trailing else 'false'], delimiter))
+	if state.fill_empty:
+		lines.append(format_marker_line('#_fill_empty_with_default_#', ['true'], delimiter))
+	return lines
+
+
+def _replace_part(path, lines, *, encoding='utf8'):
+	"""Replace ``path`` with ``lines`` through a synced sibling temp file and ``os.replace``.
+
+	Readers see either the old part or the complete new one, never an
+	empty or torn file. The temp file keeps the compression suffix, so
+	compressed parts are written compressed. Returns the (uncompressed)
+	byte length written.
+	"""
+	head, _, ext = path.rpartition('.')
+	tmp = f'{head}.{os.getpid()}.tmp.{ext}' if _is_compressed(path) else f'{path}.{os.getpid()}.tmp'
+	data = ''.join(line + '\n' for line in lines).encode(encoding, errors='replace')
+	try:
+		with open_part(tmp, 'wb', encoding=encoding) as f:
+			f.write(data)
+		with open(tmp, 'ab') as f:
+			_sync_fd(f.fileno())
+		os.replace(tmp, path)
+	except BaseException:
+		with contextlib.suppress(OSError):
+			os.unlink(tmp)
+		raise
+	if os.name == 'posix':
+		fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+		try:
+			os.fsync(fd)
+		finally:
+			os.close(fd)
+	return len(data)
+
+
 def snapshot_part(path, *, encoding='utf8', delimiter=None, header=None, store=None):
 	"""Materialize live state into a single part (simplified specification §19).
 
-	Rewrites ``path`` in place: superseded values, tombstones, and non-header
-	comments are dropped. The resulting file begins with a ``#_version_#``
+	Replaces ``path`` through a synced temp file renamed over it, so the
+	part is never seen empty or half written. Superseded values,
+	tombstones, and non-header comments are dropped. The resulting
+	file begins with the optional header comment and a ``#_version_#``
 	preamble (and any non-default markers) followed by live rows in
 	first-appearance order.
 
@@ -1243,7 +2337,7 @@ def snapshot_part(path, *, encoding='utf8', delimiter=None, header=None, store=N
 		path: Filesystem path of the part to compact.
 		encoding: Text encoding for read/write.
 		delimiter: Field delimiter; inferred from ``path`` when ``None``.
-		header: Optional header retained when truncating before rewrite.
+		header: Optional column names written as a ``#`` comment.
 		store: Optional mapping to populate during the pre-snapshot read.
 
 	Returns:
@@ -1263,34 +2357,938 @@ def snapshot_part(path, *, encoding='utf8', delimiter=None, header=None, store=N
 	if not data:
 		return data
 	delimiter = delimiter or delimiter_for_path(path)
-	state = getattr(data, '_reader_state', ReaderState())
-	snap = ReaderState()
-	snap.defaults = list(state.defaults)
-	snap.return_on_missing = state.return_on_missing
-	lines = build_snapshot_preamble(snap, delimiter)
-	for key, row in data.items():
-		if str(key).startswith('#'):
-			continue
-		if isinstance(row, list) and row:
-			lines.append(format_data_row(row, delimiter))
-	truncate_part(path, encoding=encoding, delimiter=delimiter, header=header)
-	with open_part(path, 'ab', encoding=encoding) as f:
-		f.write(('\n'.join(lines) + '\n').encode(encoding, errors='replace'))
+	header = _parse_columns(header, delimiter)
+	lines = [format_header_comment(header, delimiter)] if header else []
+	lines += _snapshot_lines(data, getattr(data, '_reader_state', ReaderState()), delimiter)
+	_replace_part(path, lines, encoding=encoding)
 	return data
 
 
+def _rotated_path(path):
+	"""``path`` with the ``.rotated`` infix placed before any compression suffix (§19.5)."""
+	if _is_compressed(path):
+		head, _, ext = path.rpartition('.')
+		return f'{head}{ROTATED_INFIX}.{ext}'
+	return path + ROTATED_INFIX
+
+
+def rotate_parts(paths, action='keep'):
+	"""Apply a ``#_rotate_#`` action to parts a snapshot subsumes (§19.5).
+
+	Args:
+		paths: Part paths.
+		action: ``'keep'`` leaves them as they are, ``'rename'`` adds the
+			``.rotated`` infix (so :func:`discover_parts` skips them), and
+			``'delete'`` removes them.
+
+	Returns:
+		list: The parts' paths after the action (empty for ``'delete'``).
+
+	Examples:
+		>>> rotate_parts(['db.tsvz.1f'])
+		['db.tsvz.1f']
+		>>> rotate_parts(['db.tsvz.1f'], 'move')
+		Traceback (most recent call last):
+			...
+		ValueError: unknown rotate action 'move'
+	"""
+	if action not in ROTATE_ACTIONS:
+		raise ValueError(f'unknown rotate action {action!r}')
+	if action == 'keep':
+		return list(paths)
+	rotated = []
+	for path in paths:
+		if action == 'rename':
+			rotated.append(_rotated_path(path))
+			os.replace(path, rotated[-1])
+		else:
+			with contextlib.suppress(FileNotFoundError):
+				os.unlink(path)
+	return rotated
+
+
+def snapshot_parts(parts, path, *, encoding='utf8', delimiter=None, header=None, rotate=None):
+	"""Write a §19 snapshot of ``parts`` as the new part ``path``, then rotate them.
+
+	``parts`` must be an immutable prefix of a multi-part store (no writer
+	appends to any of them) and ``path`` a part whose ordinal lies between
+	the prefix and the active part (§19.2–§19.3). The parts are replayed as
+	one store with :func:`replay_parts`; the snapshot (the optional header
+	comment, a marker preamble and the live rows in first-appearance order)
+	is synced before it is renamed into place, and only then is the
+	``#_rotate_#`` action applied to ``parts``. The function only reads
+	``parts`` until that last step, so it can run in a worker process while
+	the writer carries on (see :meth:`MultiPartStore.compact`).
+
+	Args:
+		parts: Part paths of the prefix, earliest first.
+		path: Path of the snapshot part.
+		encoding: Text encoding for read/write.
+		delimiter: Field delimiter; inferred from ``path`` when ``None``.
+		header: Optional column names written as a ``#`` comment.
+		rotate: ``'keep'``, ``'rename'`` or ``'delete'``; ``None`` uses the
+			prefix's ``#_rotate_#`` marker (``'keep'`` when unset).
+
+	Returns:
+		str: ``path``.
+
+	Examples:
+		>>> import os, tempfile, shutil
+		>>> d = tempfile.mkdtemp(); base = os.path.join(d, 'db.tsvz')
+		>>> append_records(base + '.1', [['a', '1'], ['b', '2']], create=True)
+		>>> append_records(base + '.3', [['a'], ['b', '3']], create=True)
+		>>> _ = snapshot_parts(discover_parts(base), base + '.3f', rotate='rename')
+		>>> [os.path.basename(p) for p in discover_parts(base)], dict(read_store(base, multipart=True))
+		(['db.tsvz.3f'], {'b': ['b', '3']})
+		>>> shutil.rmtree(d)
+	"""
+	delimiter = delimiter or delimiter_for_path(path)
+	data = OrderedDict()
+	_, state = replay_parts(parts, delimiter, encoding=encoding, store=_RowSink(data))
+	header = _parse_columns(header, delimiter)
+	lines = [format_header_comment(header, delimiter)] if header else []
+	_replace_part(path, lines + _snapshot_lines(data, state, delimiter), encoding=encoding)
+	rotate_parts([part for part in parts if part != path], rotate or state.rotate)
+	return path
+
+
+# ---------------------------------------------------------------------------
+# Part watermarks and sidecars (incremental reopen)
+# ---------------------------------------------------------------------------
+
+def _window_digest(f, start, stop):
+	f.seek(start)
+	return hashlib.blake2b(f.read(stop - start), digest_size=16).hexdigest()
+
+
+def _committed_size(f, size):
+	"""Return the offset just past the last ``\\n`` in the first ``size`` bytes of ``f``."""
+	pos = size
+	while pos > 0:
+		start = max(0, pos - DEFAULT_BLOCK_SIZE)
+		f.seek(start)
+		nl = f.read(pos - start).rfind(b'\n')
+		if nl != -1:
+			return start + nl + 1
+		pos = start
+	return 0
+
+
+class PartWatermark:
+	"""How far a part had been replayed, and enough to tell if it changed since.
+
+	Records the committed size (a line boundary), the inode, the mtime, and
+	digests of the first and last :data:`WATERMARK_WINDOW` bytes before that
+	size. Parts are append-only, so a part that still matches both digests
+	and has not shrunk can be caught up by replaying only the bytes after
+	``size``. A rewritten, truncated, or replaced part reads as changed.
+
+	Attributes:
+		size (int): Committed byte length covered by the watermark.
+		inode (int): Inode number of the part.
+		mtime_ns (int): Modification time of the part, in nanoseconds.
+		head_digest (str): Digest of the first window of the part.
+		tail_digest (str): Digest of the window ending at ``size``.
+
+	Examples:
+		>>> import os, tempfile
+		>>> fd, path = tempfile.mkstemp(suffix='.tsv'); os.close(fd)
+		>>> open(path, 'w').write('a\\t1\\ntorn')
+		8
+		>>> wm = PartWatermark.capture(path)
+		>>> wm.size, wm.compare(path)
+		(4, 'grown')
+		>>> open(path, 'a').write('\\n')
+		1
+		>>> PartWatermark.from_dict(wm.as_dict()).compare(path)
+		'grown'
+		>>> open(path, 'w').write('b\\t2\\n')
+		4
+		>>> wm.compare(path)
+		'changed'
+		>>> os.unlink(path)
+	"""
+
+	__slots__ = ('head_digest', 'inode', 'mtime_ns', 'size', 'tail_digest')
+
+	def __init__(self, size, inode, mtime_ns, head_digest, tail_digest):
+		self.size = size
+		self.inode = inode
+		self.mtime_ns = mtime_ns
+		self.head_digest = head_digest
+		self.tail_digest = tail_digest
+
+	@classmethod
+	def capture(cls, path, size=None):
+		"""Capture a watermark of ``path`` at ``size`` (default: its current size).
+
+		The size is moved back to the last newline so that it always falls
+		on a line boundary.
+
+		Returns:
+			PartWatermark: The captured watermark.
+		"""
+		with open(path, 'rb') as f:
+			st = os.fstat(f.fileno())
+			size = _committed_size(f, st.st_size if size is None else min(size, st.st_size))
+			return cls(
+				size, st.st_ino, st.st_mtime_ns,
+				_window_digest(f, 0, min(size, WATERMARK_WINDOW)),
+				_window_digest(f, max(0, size - WATERMARK_WINDOW), size),
+			)
+
+	def compare(self, path):
+		"""Compare against the part as it is now.
+
+		Returns:
+			str: ``'same'`` if nothing was appended, ``'grown'`` if only bytes
+			after ``size`` may differ, or ``'changed'`` if a full replay is
+			needed.
+		"""
+		try:
+			f = open(path, 'rb')  # noqa: SIM115
+		except FileNotFoundError:
+			return 'changed'
+		with f:
+			st = os.fstat(f.fileno())
+			if self.matches(st):
+				return 'same'
+			if st.st_ino != self.inode or st.st_size < self.size:
+				return 'changed'
+			if st.st_size == self.size and st.st_mtime_ns != self.mtime_ns:
+				return 'changed'  # rewritten in place at the same length
+			size = self.size
+			if (_window_digest(f, 0, min(size, WATERMARK_WINDOW)) != self.head_digest
+					or _window_digest(f, max(0, size - WATERMARK_WINDOW), size) != self.tail_digest):
+				return 'changed'
+			return 'same' if st.st_size == size else 'grown'
+
+	def matches(self, st):
+		"""Return True if ``os.stat`` result ``st`` shows the part untouched since capture."""
+		return (st.st_ino == self.inode and st.st_size == self.size
+				and st.st_mtime_ns == self.mtime_ns)
+
+	def as_dict(self):
+		return {name: getattr(self, name) for name in self.__slots__}
+
+	@classmethod
+	def from_dict(cls, data):
+		return cls(**{name: data[name] for name in cls.__slots__})
+
+
+def _file_size(path):
+	try:
+		return os.path.getsize(path)
+	except OSError:
+		return None
+
+
+def _atomic_write(path, data):
+	"""Replace ``path`` with ``data`` via a fsynced sibling temp file and ``os.replace``."""
+	tmp = f'{path}.tmp.{os.getpid()}'
+	with open(tmp, 'wb') as f:
+		f.write(data)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(tmp, path)
+
+
+@contextlib.contextmanager
+def _gc_paused():
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		yield
+	finally:
+		if enabled:
+			gc.enable()
+
+
+def _worker_context():
+	# Worker processes are started without fork: callers usually run
+	# flusher or scheduler threads whose locks a forked child could inherit
+	# held.
+	method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+	return multiprocessing.get_context(method)
+
+
+def _checkpoint_path(path, checkpoint):
+	return path + '.ckpt' if checkpoint is True else checkpoint
+
+
+def _write_checkpoint(ckpt_path, store, state, watermark, delimiter, encoding):
+	"""Serialize ``store`` (key→row lists) to a versioned binary checkpoint.
+
+	Layout: :data:`CHECKPOINT_MAGIC`, ``<HI`` (format, header length), a
+	JSON header, one ``array('I')`` of row widths, and every field joined
+	by a separator character that occurs in no field, as UTF-8.
+	Returns False (writing nothing) if no separator candidate is free.
+	"""
+	rows = list(store.values())
+	widths = array.array('I', map(len, rows))
+	fields = [field for row in rows for field in row]
+	for sep in _CHECKPOINT_SEPARATORS:
+		text = sep.join(fields)
+		if text.count(sep) == max(len(fields) - 1, 0):
+			break
+	else:
+		return False
+	header = json.dumps({
+		'delimiter': delimiter,
+		'encoding': encoding,
+		'watermark': watermark.as_dict(),
+		'state': state.as_dict(),
+		'rows': len(rows),
+		'fields': len(fields),
+		'separator': sep,
+		'itemsize': widths.itemsize,
+		'byteorder': sys.byteorder,
+	}, separators=(',', ':')).encode('utf8')
+	_atomic_write(ckpt_path, b''.join((
+		CHECKPOINT_MAGIC, struct.pack('<HI', CHECKPOINT_FORMAT, len(header)), header,
+		widths.tobytes(), text.encode('utf8', errors='surrogatepass'),
+	)))
+	return True
+
+
+def _read_checkpoint(ckpt_path):
+	"""Return ``(header, rows)`` from a checkpoint; raise ``ValueError`` if invalid."""
+	with open(ckpt_path, 'rb') as f:
+		data = f.read()
+	pos = len(CHECKPOINT_MAGIC)
+	if data[:pos] != CHECKPOINT_MAGIC:
+		raise ValueError('not a TSVZ checkpoint')
+	version, header_len = struct.unpack_from('<HI', data, pos)
+	if version != CHECKPOINT_FORMAT:
+		raise ValueError(f'unsupported checkpoint format {version}')
+	pos += struct.calcsize('<HI')
+	header = json.loads(data[pos:pos + header_len])
+	pos += header_len
+	widths = array.array('I')
+	if header['itemsize'] != widths.itemsize:
+		raise ValueError('checkpoint written with a different array item size')
+	widths.frombytes(data[pos:pos + header['rows'] * widths.itemsize])
+	if header['byteorder'] != sys.byteorder:
+		widths.byteswap()
+	pos += header['rows'] * widths.itemsize
+	fields = []
+	if header['fields']:
+		fields = data[pos:].decode('utf8', errors='surrogatepass').split(header['separator'])
+	if len(fields) != header['fields'] or sum(widths) != len(fields):
+		raise ValueError('truncated checkpoint')
+	rows = []
+	i = 0
+	with _gc_paused():  # only new, acyclic row lists are allocated here
+		for width in widths:
+			rows.append(fields[i:i + width])
+			i += width
+	return header, rows
+
+
+def _resume_from_checkpoint(path, ckpt_path, delimiter, encoding):
+	"""Return ``(rows, state, start)`` from a still-valid checkpoint, else ``None``."""
+	if _is_compressed(path):
+		return None
+	try:
+		header, rows = _read_checkpoint(ckpt_path)
+		if header['delimiter'] != delimiter or header['encoding'] != encoding:
+			return None
+		watermark = PartWatermark.from_dict(header['watermark'])
+		state = ReaderState.from_dict(header['state'])
+	except (OSError, ValueError, KeyError, TypeError, struct.error):
+		return None
+	if watermark.compare(path) == 'changed':
+		return None
+	return rows, state, watermark.size
+
+
+def save_checkpoint(path, *, encoding='utf8', delimiter=None, checkpoint=True):
+	"""Write a full-state checkpoint of an uncompressed part next to it.
+
+	The checkpoint holds the live rows, the final :class:`ReaderState`, and a
+	:class:`PartWatermark`, so that :func:`read_store` with ``checkpoint``
+	can load it and replay only bytes appended afterwards. It is built from
+	disk (an existing valid checkpoint plus the tail), so it always matches
+	what a full replay would produce, and is replaced atomically.
+
+	Args:
+		path: Filesystem path of the part.
+		encoding: Text encoding used to decode lines.
+		delimiter: Field delimiter; inferred from ``path`` when ``None``.
+		checkpoint: ``True`` for ``<path>.ckpt``, or the checkpoint path.
+
+	Returns:
+		PartWatermark | None: Watermark of the written checkpoint, or
+		``None`` if the part is compressed or could not be checkpointed.
+
+	Examples:
+		>>> import os, tempfile
+		>>> fd, path = tempfile.mkstemp(suffix='.tsv'); os.close(fd)
+		>>> append_records(path, [['a', '1'], ['b', '2']])
+		>>> save_checkpoint(path).size
+		8
+		>>> append_records(path, [['a']])
+		>>> dict(read_store(path, checkpoint=True))
+		{'b': ['b', '2']}
+		>>> os.unlink(path); os.unlink(path + '.ckpt')
+	"""
+	delimiter = delimiter or delimiter_for_path(path)
+	if _is_compressed(path):
+		return None
+	ckpt_path = _checkpoint_path(path, checkpoint)
+	size = os.path.getsize(path)
+	store = OrderedDict()
+	resumed = _resume_from_checkpoint(path, ckpt_path, delimiter, encoding)
+	if resumed is None:
+		state, start = ReaderState(), 0
+	else:
+		rows, state, start = resumed
+		for row in rows:
+			store[row[0]] = row
+	with _map_part(path) as view:
+		_replay_lines(
+			view, min(size, len(view)), state, _RowSink(store), delimiter,
+			encoding=encoding, start=start,
+		)
+	watermark = PartWatermark.capture(path, size)
+	if not _write_checkpoint(ckpt_path, store, state, watermark, delimiter, encoding):
+		return None
+	return watermark
+
+
+# ---------------------------------------------------------------------------
+# Durability policy (§18.3–§18.4 group commit)
+# ---------------------------------------------------------------------------
+
+# Policy named by each ``#_write_ack_#`` value when it is passed as ``fsync``.
+WRITE_ACK_POLICIES = {'disk': 'always', 'memory': 'interval:1000'}
+
+
+def _sync_fd(fd, datasync=True):
+	if datasync and hasattr(os, 'fdatasync'):
+		os.fdatasync(fd)
+	else:
+		os.fsync(fd)
+
+
+def _load_syncfs():
+	# ``syncfs(2)`` flushes a whole file system in one call (Linux only).
+	if not sys.platform.startswith('linux'):
+		return None
+	try:
+		import ctypes
+		return ctypes.CDLL(None, use_errno=True).syncfs
+	except (ImportError, OSError, AttributeError):
+		return None
+
+
+_syncfs = _load_syncfs()
+
+
+def _sync_file_system(path):
+	"""Sync every file on the file system holding ``path`` with one ``syncfs``."""
+	import ctypes
+	fd = os.open(path, os.O_RDONLY)
+	try:
+		if _syncfs(fd) != 0:
+			err = ctypes.get_errno()
+			raise OSError(err, os.strerror(err), path)
+	finally:
+		os.close(fd)
+
+
+class DurabilityPolicy:
+	"""When a writer forces appended bytes to stable storage.
+
+	Policies:
+
+	- ``'always'`` — sync at the end of every flush.
+	- ``'interval:<ms>'`` — sync at most once every ``ms`` milliseconds; a
+	  later flush or the background flusher syncs what is left.
+	- ``'bytes:<n>'`` — sync once at least ``n`` bytes are unsynced.
+	- ``'never'`` — leave write-back to the operating system.
+
+	The §18.4 ``#_write_ack_#`` values are accepted as well, through
+	:data:`WRITE_ACK_POLICIES`. Every row written by one flush shares one
+	sync, and deferred flushes share the next (group commit).
+
+	Only ``'always'`` keeps every committed flush on disk; the other
+	policies trade that for throughput and are never chosen implicitly.
+
+	Args:
+		policy: Policy string, or a :class:`DurabilityPolicy` to copy.
+		datasync: If True, use ``os.fdatasync`` where available instead of
+			``os.fsync``.
+
+	Attributes:
+		mode (str): ``'always'``, ``'interval'``, ``'bytes'``, or ``'never'``.
+		limit (float): Interval in seconds or byte threshold, else 0.
+		unsynced (int): Bytes written since the last sync.
+		syncs (int): Syncs performed so far.
+
+	Raises:
+		ValueError: If ``policy`` is not a recognized policy string.
+
+	Examples:
+		>>> p = DurabilityPolicy('bytes:100')
+		>>> p.wrote(60); p.due()
+		False
+		>>> p.wrote(60); p.due()
+		True
+		>>> str(DurabilityPolicy('interval:250')), DurabilityPolicy('disk').write_ack
+		('interval:250', 'disk')
+		>>> DurabilityPolicy('sometimes')
+		Traceback (most recent call last):
+		...
+		ValueError: unknown durability policy 'sometimes'
+	"""
+
+	__slots__ = ('_last_sync', 'datasync', 'limit', 'mode', 'syncs', 'unsynced')
+
+	def __init__(self, policy='always', datasync=True):
+		text = str(policy).strip().lower()
+		text = WRITE_ACK_POLICIES.get(text, text)
+		mode, _, arg = text.partition(':')
+		try:
+			if mode in ('always', 'never') and not arg:
+				limit = 0
+			elif mode == 'interval':
+				limit = float(arg) / 1000
+			elif mode == 'bytes':
+				limit = int(arg)
+			else:
+				raise ValueError
+			if limit < 0:
+				raise ValueError
+		except ValueError:
+			raise ValueError(f'unknown durability policy {policy!r}') from None
+		self.mode = mode
+		self.limit = limit
+		self.datasync = datasync
+		self.unsynced = 0
+		self.syncs = 0
+		self._last_sync = time.monotonic()
+
+	def __str__(self):
+		if self.mode == 'interval':
+			return f'interval:{self.limit * 1000:g}'
+		if self.mode == 'bytes':
+			return f'bytes:{self.limit}'
+		return self.mode
+
+	def __repr__(self):
+		return f'DurabilityPolicy({str(self)!r}, datasync={self.datasync})'
+
+	@property
+	def write_ack(self):
+		"""The ``#_write_ack_#`` value describing this policy: ``'disk'`` or ``'memory'``."""
+		return 'disk' if self.mode == 'always' else 'memory'
+
+	def wrote(self, nbytes):
+		"""Account for ``nbytes`` appended and not yet synced."""
+		self.unsynced += nbytes
+
+	def due(self):
+		"""Return True if the unsynced bytes should be synced now."""
+		if not self.unsynced or self.mode == 'never':
+			return False
+		if self.mode == 'interval':
+			return time.monotonic() - self._last_sync >= self.limit
+		if self.mode == 'bytes':
+			return self.unsynced >= self.limit
+		return True
+
+	def sync(self, fd):
+		"""Sync file descriptor ``fd`` and reset the unsynced count."""
+		_sync_fd(fd, self.datasync)
+		self.synced(self.unsynced)
+
+	def synced(self, nbytes):
+		"""Account for ``nbytes`` of the unsynced bytes synced by someone else."""
+		self.unsynced = max(0, self.unsynced - nbytes)
+		self.syncs += 1
+		self._last_sync = time.monotonic()
+
+
+class WriteAck:
+	"""Completion handle returned by :meth:`WalStore.put` (§18.4).
+
+	A ``memory`` acknowledgement is complete as soon as the row is queued. A
+	``disk`` acknowledgement completes once the flush that wrote the row
+	has also synced it to stable storage.
+
+	Args:
+		level: ``'memory'`` or ``'disk'``.
+
+	Attributes:
+		level (str): Acknowledgement level.
+		error (OSError | None): Set if the row could not be written.
+	"""
+
+	__slots__ = ('_event', 'error', 'level')
+
+	def __init__(self, level='memory'):
+		self.level = level
+		self.error = None
+		self._event = threading.Event()
+		if level == 'memory':
+			self._event.set()
+
+	def done(self):
+		"""Return True once the acknowledgement is complete (or failed)."""
+		return self._event.is_set()
+
+	def wait(self, timeout=None):
+		"""Block until acknowledged.
+
+		Args:
+			timeout: Maximum seconds to wait; ``None`` waits indefinitely.
+
+		Returns:
+			bool: True if acknowledged, False if ``timeout`` expired first.
+
+		Raises:
+			OSError: If the write carrying the row failed.
+		"""
+		if not self._event.wait(timeout):
+			return False
+		if self.error is not None:
+			raise self.error
+		return True
+
+	def _complete(self, error=None):
+		self.error = error
+		self._event.set()
+
+	def __repr__(self):
+		status = 'failed' if self.error else 'done' if self.done() else 'pending'
+		return f'<WriteAck {self.level} {status}>'
+
+
 # ---------------------------------------------------------------------------
 # WalStore — in-memory store + async append-only writer (§18)
 # ---------------------------------------------------------------------------
 
+# Stores currently holding a persistent part handle (``keep_open``), by id.
+_KEPT_OPEN = weakref.WeakValueDictionary()
+
+
+def _drop_kept_handles():
+	"""Forget persistent part handles inherited by a forked child.
+
+	The child gets a copy of the descriptor but none of the parent's
+	``lockf`` locks or threads. Closing its copy leaves the parent's handle
+	untouched, and fresh thread locks replace ones the parent may have held
+	mid-flush; the child reopens the part on its next flush.
+	"""
+	for store in list(_KEPT_OPEN.values()):
+		store._lock = threading.Lock()
+		handle, store._handle = store._handle, None
+		if handle is not None:
+			with contextlib.suppress(OSError):
+				handle.close()
+	_KEPT_OPEN.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+	os.register_at_fork(after_in_child=_drop_kept_handles)
+
+
+class FlushScheduler:
+	"""Pool of threads that flushes the pending queues of many stores.
+
+	A :class:`WalStore` registered with a scheduler starts no thread of its
+	own. Its first queued row schedules a flush ``max_batch_delay`` later,
+	or at once when ``max_batch_size`` rows are queued. Due stores are
+	served oldest first, and a pass writes at most ``max_batch_size`` rows
+	of a store before requeueing it behind the others, so one busy store
+	cannot starve the rest. The stores a pass takes are grouped by device,
+	and every store in a group is written before any of them is synced.
+	Where ``syncfs`` is available (Linux), two or more stores of a group
+	that owe a sync share a single ``syncfs`` of their file system instead
+	of one ``fsync`` each.
+	Idle stores are only revisited when they monitor external changes or
+	owe an interval sync.
+
+	A single ``atexit`` hook closes every registered store and then stops
+	the threads.
+
+	Args:
+		workers: Number of flush threads, started on first use.
+		max_stores_per_pass: Most due stores one thread takes per pass.
+
+	Raises:
+		ValueError: If ``workers`` is less than 1.
+
+	Examples:
+		>>> import os, tempfile
+		>>> fd, path = tempfile.mkstemp(suffix='.tsvz'); os.close(fd); os.unlink(path)
+		>>> pool = FlushScheduler(workers=1)
+		>>> db = WalStore(path, create=True, scheduler=pool)
+		>>> db['a'] = ['1']
+		>>> len(pool)
+		1
+		>>> pool.shutdown()  # closes (and so drains) every registered store
+		>>> dict(read_store(path)), len(pool)
+		({'a': ['a', '1']}, 0)
+		>>> os.unlink(path)
+	"""
+
+	def __init__(self, workers=2, max_stores_per_pass=64):
+		if workers < 1:
+			raise ValueError('workers must be at least 1')
+		self.workers = workers
+		self.max_stores_per_pass = max_stores_per_pass
+		self._stores = weakref.WeakValueDictionary()
+		self._devices = {}
+		self._due = {}
+		self._busy = set()
+		self._heap = []
+		self._seq = itertools.count()
+		# Reentrant: a store collected while the lock is held closes itself
+		# (and so unregisters) from the same thread.
+		self._cond = threading.Condition()
+		self._threads = []
+		self._stopping = False
+		_SCHEDULERS.add(self)
+		atexit.register(self.shutdown)
+
+	def __len__(self):
+		return len(self._stores)
+
+	def register(self, store):
+		"""Serve ``store`` from this pool; it must not run its own flusher.
+
+		Args:
+			store: :class:`WalStore` to flush in the background.
+		"""
+		key = id(store)
+		try:
+			device = os.stat(store.path).st_dev
+		except OSError:
+			device = None
+		with self._cond:
+			self._stores[key] = store
+			self._devices[key] = device
+			self._due.pop(key, None)  # a stale entry left by a store that reused this id
+		delay = store._next_flush_delay()
+		if delay is not None:
+			self.schedule(store, delay)
+
+	def unregister(self, store):
+		"""Stop serving ``store``, waiting out a pass that is flushing it."""
+		key = id(store)
+		with self._cond:
+			while key in self._busy:
+				self._cond.wait()
+			self._stores.pop(key, None)
+			self._devices.pop(key, None)
+			self._due.pop(key, None)
+
+	def schedule(self, store, delay):
+		"""Flush ``store`` within ``delay`` seconds (an earlier request wins).
+
+		Args:
+			store: A registered :class:`WalStore`.
+			delay: Seconds from now.
+		"""
+		key = id(store)
+		when = time.monotonic() + delay
+		with self._cond:
+			if key not in self._stores:
+				return
+			due = self._due.get(key)
+			if due is not None and due <= when:
+				return
+			self._due[key] = when
+			if key in self._busy:
+				return  # requeued when its current pass ends
+			heapq.heappush(self._heap, (when, next(self._seq), key))
+			if self._heap[0][2] == key:
+				self._cond.notify()
+			while len(self._threads) < self.workers and not self._stopping:
+				thread = threading.Thread(target=self._work, daemon=True,
+										  name=f'tsvz-flush-{len(self._threads)}')
+				self._threads.append(thread)
+				thread.start()
+
+	def shutdown(self):
+		"""Close every registered store, then stop the flush threads.
+
+		The scheduler stays usable: threads restart when a store is
+		scheduled again.
+		"""
+		for store in list(self._stores.values()):
+			with contextlib.suppress(OSError, ValueError):
+				store.close()
+		with self._cond:
+			self._stopping = True
+			self._cond.notify_all()
+			threads, self._threads = self._threads, []
+		for thread in threads:
+			if thread is not threading.current_thread():
+				thread.join()
+		with self._cond:
+			self._stopping = False
+
+	def _work(self):
+		while True:
+			stores = self._take()
+			if stores is None:
+				return
+			try:
+				self._run(stores)
+			finally:
+				self._finish(stores)
+
+	def _take(self):
+		with self._cond:
+			while True:
+				if self._stopping:
+					return None
+				now = time.monotonic()
+				if self._heap and self._heap[0][0] <= now:
+					break
+				self._cond.wait(self._heap[0][0] - now if self._heap else None)
+			stores = []
+			while self._heap and self._heap[0][0] <= now and len(stores) < self.max_stores_per_pass:
+				when, _, key = heapq.heappop(self._heap)
+				store = self._stores.get(key)
+				if store is None or key in self._busy or self._due.get(key) != when:
+					continue  # closed, or superseded by an earlier request
+				del self._due[key]
+				self._busy.add(key)
+				stores.append(store)
+			if self._heap and self._heap[0][0] <= now:
+				self._cond.notify()  # let an idle thread take the rest
+			return stores
+
+	def _run(self, stores):
+		groups = {}
+		for store in stores:
+			groups.setdefault(self._devices.get(id(store)), []).append(store)
+		for device, group in groups.items():
+			written = []
+			for store in group:
+				with contextlib.suppress(OSError, ValueError):
+					written.append((store, store._background_batch(store.max_batch_size, sync=False)))
+			if device is not None:
+				self._sync_device([store for store, (acks, error) in written
+								   if error is None and store._sync_wanted(acks)])
+			for store, (acks, error) in written:
+				with contextlib.suppress(OSError, ValueError):
+					store._after_batch(acks, error)
+
+	@staticmethod
+	def _sync_device(stores):
+		# One syncfs for stores on one device; each store then finds nothing
+		# left to sync in _after_batch. On failure they sync one by one.
+		if len(stores) < 2 or _syncfs is None:
+			return
+		owed = [(store, store.durability.unsynced) for store in stores]
+		try:
+			_sync_file_system(stores[0].path)
+		except OSError:
+			return
+		for store, nbytes in owed:
+			with store._lock:
+				store.durability.synced(nbytes)
+
+	def _finish(self, stores):
+		now = time.monotonic()
+		with self._cond:
+			for store in stores:
+				key = id(store)
+				self._busy.discard(key)
+				if key not in self._stores:
+					continue
+				when = self._due.get(key)
+				delay = store._next_flush_delay()
+				if delay is not None and (when is None or now + delay < when):
+					when = now + delay
+				if when is None:
+					continue
+				self._due[key] = when
+				heapq.heappush(self._heap, (when, next(self._seq), key))
+			self._cond.notify_all()
+
+	def _after_fork(self):
+		# Only the forking thread survives: fresh lock, no threads, and any
+		# store caught mid-pass is due again at once.
+		self._cond = threading.Condition()
+		self._threads = []
+		self._stopping = False
+		now = time.monotonic()
+		for key in self._busy:
+			self._due[key] = now
+			heapq.heappush(self._heap, (now, next(self._seq), key))
+		self._busy.clear()
+
+
+_SCHEDULERS = weakref.WeakSet()
+_SHARED_SCHEDULER = None
+_SHARED_SCHEDULER_LOCK = threading.Lock()
+
+
+def shared_flush_scheduler(workers=2):
+	"""Return the process-wide :class:`FlushScheduler`, creating it on first use.
+
+	Stores opened without a ``scheduler`` argument register here.
+
+	Args:
+		workers: Thread count of the scheduler if this call creates it.
+
+	Returns:
+		FlushScheduler: The shared scheduler.
+	"""
+	global _SHARED_SCHEDULER
+	with _SHARED_SCHEDULER_LOCK:
+		if _SHARED_SCHEDULER is None:
+			_SHARED_SCHEDULER = FlushScheduler(workers=workers)
+		return _SHARED_SCHEDULER
+
+
+def _reset_schedulers_after_fork():
+	global _SHARED_SCHEDULER_LOCK
+	_SHARED_SCHEDULER_LOCK = threading.Lock()
+	for scheduler in list(_SCHEDULERS):
+		scheduler._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+	os.register_at_fork(after_in_child=_reset_schedulers_after_fork)
+
+
+class _EncodedRows:
+	"""Rows queued by :meth:`WalStore.put_many`, already encoded as whole lines."""
+
+	__slots__ = ('data', 'rows')
+
+	def __init__(self, data, rows):
+		self.data = data
+		self.rows = rows
+
+
 class WalStore(OrderedDict):
 	"""Ordered key→row store backed by an append-only part file.
 
 	Mutations are enqueued for a background flusher; :meth:`flush` and
-	:meth:`close` drain the pending queue to disk. Deletion appends a
+	:meth:`close` drain the pending queue to disk. Setting a key to the row
+	it already holds writes nothing and counts in ``skipped_writes``. The flusher gathers a
+	batch for up to ``max_batch_delay`` seconds or until ``max_batch_size``
+	rows are queued, and an idle store costs no CPU. By default the store
+	is served by the process-wide :class:`FlushScheduler` rather than a
+	thread of its own. Deletion appends a
 	tombstone (specification §9). Prefer :meth:`pop`, :meth:`popitem`, or
 	``del`` for removals — all persist to the WAL.
 
+	The store tracks :attr:`part_bytes` (bytes in the part, as replayed and
+	appended) against :attr:`live_bytes` (text size of the current rows),
+	so superseded rows and tombstones show up in :attr:`dead_ratio`. With
+	``compact_ratio`` set, the flusher calls :meth:`compact` once the dead
+	share passes it and the part holds at least ``compact_min_bytes``.
+	Compressed parts count only the bytes appended since they were opened.
+
 	Args:
 		path: Filesystem path of the backing part.
 		header: Optional column names written when creating the part.
@@ -1298,7 +3296,53 @@ class WalStore(OrderedDict):
 		encoding: Text encoding for append I/O.
 		delimiter: Field delimiter; inferred from ``path`` when ``None``.
 		defaults: Optional value-column defaults.
-		flush_interval: Seconds between background flush attempts.
+		flush_interval: Default ``max_batch_delay``.
+		max_batch_delay: Longest a queued row waits for more rows before
+			the batch is flushed; ``None`` uses ``flush_interval``.
+		max_batch_size: Queued rows that trigger a flush at once.
+		max_pending_rows: Most rows (and tombstones) the pending queue may
+			hold; ``None`` for no limit.
+		max_pending_bytes: Most text (see :attr:`pending_bytes`) the pending
+			queue may hold; ``None`` for no limit.
+		backpressure: What a mutation does when the queue is full:
+			``'block'`` waits for the flusher to make room, ``'raise'``
+			raises :class:`queue.Full` and leaves the store unchanged, and
+			``'sync'`` queues the row and flushes the whole queue in the
+			caller's thread. A row is always admitted to an empty queue.
+		coalesce: If True, each flush writes only the last row or
+			tombstone queued for a key (see :func:`_coalesce_rows`);
+			:attr:`coalesced_rows` counts the rows left out.
+		compact_ratio: :attr:`dead_ratio` above which the part is
+			compacted automatically; ``None`` to never compact on its own.
+		compact_min_bytes: Smallest :attr:`part_bytes` worth compacting.
+		replay_workers: Processes used to replay the part on (re)load; see
+			:func:`replay_part_parallel`.
+		checkpoint: ``True`` (``<path>.ckpt``) or a checkpoint path. Loads
+			start from the checkpoint and replay only the newer tail, and
+			:meth:`close` refreshes it with :func:`save_checkpoint`.
+		monitor_external_changes: If True, the background flusher calls
+			:meth:`refresh` before each flush to pick up other writers'
+			appends.
+		external_check_interval: Seconds between :meth:`refresh` calls
+			while the store is idle under ``monitor_external_changes``;
+			``None`` checks only before a flush, so an idle store sleeps
+			until a write arrives.
+		keep_open: If True, keep an uncompressed part open for the life of
+			the store instead of reopening it on every flush. The lock is
+			still taken per flush, as a short lease on the open handle, so
+			other writers are not shut out. The handle is reopened if the
+			part is replaced, and released on :meth:`close` or in a forked
+			child.
+		fsync: :class:`DurabilityPolicy` (or policy string) for flushed
+			bytes. ``None`` means ``'always'``: every flush is synced, even
+			when the part's ``#_write_ack_#`` marker says ``memory``. Pass
+			``'memory'`` or another relaxed policy to opt in to deferred
+			syncs.
+		datasync: If True, sync with ``os.fdatasync`` where available.
+		scheduler: :class:`FlushScheduler` that flushes this store; ``None``
+			uses :func:`shared_flush_scheduler`. ``False`` starts a
+			dedicated flush thread that sleeps on a condition variable until
+			a mutation arrives.
 
 	Examples:
 		>>> import os, tempfile, time
@@ -1316,24 +3360,68 @@ class WalStore(OrderedDict):
 	"""
 
 	def __init__(self, path, *, header=None, create=True, encoding='utf8',
-				 delimiter=None, defaults=None, flush_interval=0.01):
+				 delimiter=None, defaults=None, flush_interval=0.01, replay_workers=1,
+				 checkpoint=False, monitor_external_changes=False, keep_open=False,
+				 fsync=None, datasync=True, max_batch_delay=None, max_batch_size=4096,
+				 scheduler=None, max_pending_rows=None, max_pending_bytes=None,
+				 backpressure='block', coalesce=False, compact_ratio=None,
+				 compact_min_bytes=DEFAULT_COMPACT_MIN_BYTES, external_check_interval=None):
+		if backpressure not in ('block', 'raise', 'sync'):
+			raise ValueError(f'unknown backpressure policy {backpressure!r}')
 		super().__init__()
 		self.path = path
+		self.keep_open = keep_open
+		self._handle = None
+		self.durability = DurabilityPolicy(datasync=datasync)
+		self.replay_workers = replay_workers
+		self.checkpoint = checkpoint
+		self.monitor_external_changes = monitor_external_changes
+		self.external_check_interval = external_check_interval
+		self._watermark = None
 		self.encoding = encoding
 		self.delimiter = delimiter or delimiter_for_path(path)
 		self.header = _parse_columns(header, self.delimiter)
 		self.create = create
 		self._pending = deque()
+		self._pending_rows = 0
+		self._pending_bytes = 0
+		self._blocked = 0
+		self._room = threading.Condition(threading.Lock())
+		self.max_pending_rows = max_pending_rows
+		self.max_pending_bytes = max_pending_bytes
+		self.backpressure = backpressure
+		self.coalesce = coalesce
+		self.coalesced_rows = 0
+		self.skipped_writes = 0
+		self.compact_ratio = compact_ratio
+		self.compact_min_bytes = compact_min_bytes
+		self.part_bytes = 0
+		self.live_bytes = 0
+		self._rewriting = False
 		self._lock = threading.Lock()
 		self._shutdown = threading.Event()
+		self._scheduler = None
+		self._worker = None
+		self._wakeup = threading.Condition(threading.Lock())
+		self._worker_idle = False
+		self._worker_filling = False
 		self._reader_state = ReaderState()
 		self._defaults_row = [MARKER_DEFAULTS]
 		self.set_defaults(defaults)
 		self.flush_interval = flush_interval
-		self._worker = threading.Thread(target=self._flush_worker, daemon=True)
-		self._worker.start()
+		self.max_batch_delay = flush_interval if max_batch_delay is None else max_batch_delay
+		self.max_batch_size = max_batch_size
 		self.reload()
-		atexit.register(self.close)
+		if fsync is None:
+			fsync = 'always'
+		self.durability = DurabilityPolicy(fsync, datasync=datasync)
+		if scheduler is False:
+			self._worker = threading.Thread(target=self._flush_worker, daemon=True)
+			self._worker.start()
+			atexit.register(self.close)
+		else:
+			self._scheduler = shared_flush_scheduler() if scheduler is None else scheduler
+			self._scheduler.register(self)  # its atexit hook closes the store
 
 	def set_defaults(self, defaults):
 		"""Set value-column defaults (excluding the ``#_defaults_#`` key field).
@@ -1354,15 +3442,148 @@ class WalStore(OrderedDict):
 		"""Return the defaults row with ``#_defaults_#`` as field 0.
 
 		Returns:
-			list: Copy of the defaults row including the marker key.
+			list: Copy of the defaults row including the marker key.
+		"""
+		return list(self._defaults_row)
+
+	@property
+	def pending_rows(self):
+		"""Rows (and tombstones) queued and not yet written."""
+		return self._pending_rows
+
+	@property
+	def pending_bytes(self):
+		"""Approximate text size of the queued rows, as limited by ``max_pending_bytes``."""
+		return self._pending_bytes
+
+	@property
+	def dead_ratio(self):
+		"""Share of :attr:`part_bytes` taken by superseded rows and tombstones (approximate)."""
+		if not self.part_bytes:
+			return 0.0
+		return max(0.0, 1.0 - self.live_bytes / self.part_bytes)
+
+	def _compaction_due(self):
+		return (self.compact_ratio is not None and not self._rewriting
+				and self.part_bytes >= self.compact_min_bytes
+				and self.dead_ratio > self.compact_ratio)
+
+	def _count_bytes(self):
+		# After a replay: the part as it is now, and the rows that survived it.
+		self.live_bytes = sum(_pending_size(row) for key, row in self.items() if not key.startswith('#'))
+		size = None if _is_compressed(self.path) else _file_size(self.path)
+		self.part_bytes = self.live_bytes if size is None else size
+
+	def compact(self):
+		"""Rewrite the part with only its live rows (see :func:`snapshot_part`).
+
+		The flush lock and the part's file lock are held from the final
+		flush of the pending rows through the replace, so nothing is
+		appended to the old part in between. Memory is left alone when no
+		other writer touched the part since it was last replayed, since it
+		already holds the part's live rows; otherwise the rewritten part's
+		rows are replayed aside and swapped in key by key (see
+		:meth:`_swap_in`). Rows queued meanwhile land in the new part.
+
+		Returns:
+			bool: True on success, or False if a compaction is already in
+			progress.
+
+		Raises:
+			OSError: If the part could not be flushed or rewritten; the old
+				part is then left in place.
+		"""
+		if self._rewriting:
+			return False
+		self._rewriting = True
+		acks = []
+		error = None
+		try:
+			with self._open_locked('ab') as f:
+				error = self._write_pending(f, acks)
+				if error is not None:
+					raise error
+				self._rewrite_locked()
+		finally:
+			self._after_batch(acks, error)
+			self._rewriting = False
+		return True
+
+	def _rewrite_locked(self):
+		# compact() with the flush and file locks held.
+		watermark = self._watermark
+		caught_up = watermark is not None and watermark.matches(os.stat(self.path))
+		compressed = _is_compressed(self.path)
+		fresh = OrderedDict()
+		# Keep the read handle open until the part is replaced: closing any
+		# handle on the part would release this process's lockf lock on it.
+		with open_part(self.path, 'rb', encoding=self.encoding) as src:
+			size = 0 if compressed else os.fstat(src.fileno()).st_size
+			data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) if size else src.read()
+			try:
+				_, state = replay_bytes(data, self.delimiter, encoding=self.encoding,
+										store=_RowSink(fresh))
+			finally:
+				if size:
+					data.close()
+			lines = [format_header_comment(self.header, self.delimiter)] if self.header else []
+			lines += _snapshot_lines(fresh, state, self.delimiter)
+			written = _replace_part(self.path, lines, encoding=self.encoding)
+		if not caught_up:
+			self._reader_state = state
+			self._swap_in(fresh)
+			self._reapply_pending()
+			self.live_bytes = sum(_pending_size(row) for key, row in list(OrderedDict.items(self))
+								  if not key.startswith('#'))
+		self._watermark = None if compressed else self._capture_watermark(written)
+		self.part_bytes = self.live_bytes if compressed else written
+
+	def _swap_in(self, rows):
+		# Make memory hold ``rows`` (in their order) without a moment where a
+		# key live in both is missing; in-memory ``#`` keys are kept.
+		for key in [key for key in OrderedDict.keys(self) if key not in rows and not key.startswith('#')]:
+			OrderedDict.pop(self, key, None)
+		for key, row in rows.items():
+			OrderedDict.__setitem__(self, key, row)
+			OrderedDict.move_to_end(self, key)
+
+	def set_durability(self, fsync, persist=False):
+		"""Switch the :class:`DurabilityPolicy` used for later flushes.
+
+		Args:
+			fsync: Policy string or :class:`DurabilityPolicy`.
+			persist: If True, also append a ``#_write_ack_#`` marker, which
+				sets the default :class:`WriteAck` level of stores opened on
+				the part later. Their durability policy still defaults to
+				``'always'``.
+
+		Returns:
+			WalStore: ``self``.
+
+		Examples:
+			>>> import os, tempfile
+			>>> fd, path = tempfile.mkstemp(suffix='.tsv'); os.close(fd)
+			>>> db = WalStore(path)
+			>>> _ = db.set_durability('never', persist=True); _ = db.close()
+			>>> open(path).read()
+			'#_write_ack_#\\tmemory\\n'
+			>>> db = WalStore(path); str(db.durability), db._reader_state.write_ack
+			('always', 'memory')
+			>>> _ = db.close(); os.unlink(path)
 		"""
-		return list(self._defaults_row)
+		policy = DurabilityPolicy(fsync, datasync=self.durability.datasync)
+		policy.unsynced = self.durability.unsynced
+		self.durability = policy
+		if persist:
+			self._reader_state.write_ack = policy.write_ack
+			self._enqueue(['#_write_ack_#', policy.write_ack])
+		return self
 
 	def reload(self):
 		"""Discard in-memory state and replay the part from disk.
 
 		Pending writes that have not yet been flushed are preserved across
-		the reload.
+		the reload and re-applied over the replayed rows.
 
 		Returns:
 			WalStore: ``self``, after replay.
@@ -1370,18 +3591,90 @@ class WalStore(OrderedDict):
 		prev = self._pending
 		self._pending = deque()
 		super().clear()
+		self._watermark = None
+		size = _file_size(self.path)
 		try:
-			read_store(
-				self.path, create=self.create, encoding=self.encoding,
-				delimiter=self.delimiter, store=self, header=self.header or None,
-			)
+			self._replay()
 		except FileNotFoundError:
 			if self.create:
 				raise
+		else:
+			# The watermark is only exact if nothing was appended mid-replay;
+			# otherwise leave it unset so the next refresh reloads in full.
+			if size is None or _file_size(self.path) == size:
+				self._watermark = self._capture_watermark(size)
 		self._reader_state = getattr(self, '_reader_state', self._reader_state)
 		self._pending = prev
+		self._reapply_pending()
+		self._count_bytes()
 		return self
 
+	def _replay(self):
+		# Replay the part from disk straight into self (see read_store).
+		read_store(
+			self.path, create=self.create, encoding=self.encoding,
+			delimiter=self.delimiter, store=self, header=self.header or None,
+			workers=self.replay_workers, checkpoint=self.checkpoint,
+		)
+
+	def refresh(self):
+		"""Catch up with changes other writers made to the part.
+
+		The part is append-only, so when it only grew since the last replay
+		(see :class:`PartWatermark`) just the appended lines are replayed,
+		resuming from the saved reader state. A part that shrank, was
+		rewritten, or is compressed is reloaded in full with :meth:`reload`.
+
+		Returns:
+			WalStore: ``self``, after catching up.
+
+		Examples:
+			>>> import os, tempfile
+			>>> fd, path = tempfile.mkstemp(suffix='.tsvz'); os.close(fd); os.unlink(path)
+			>>> db = WalStore(path, create=True)
+			>>> append_records(path, [['a', '1'], ['b', '2']])  # another writer
+			>>> dict(db.refresh())
+			{'a': ['a', '1'], 'b': ['b', '2']}
+			>>> _ = db.close(); os.unlink(path)
+		"""
+		watermark = self._watermark
+		if watermark is not None:
+			status = watermark.compare(self.path)
+			if status == 'same':
+				return self
+			if status == 'grown' and not _is_compressed(self.path):
+				with self._lock:
+					with _map_part(self.path) as view:
+						end = view.rfind(b'\n') + 1
+						_replay_lines(
+							view, end, self._reader_state, _RowSink(self), self.delimiter,
+							encoding=self.encoding, start=watermark.size,
+						)
+					self._watermark = self._capture_watermark(end)
+				self._reapply_pending()
+				self._count_bytes()
+				return self
+		return self.reload()
+
+	def _capture_watermark(self, size=None):
+		try:
+			return PartWatermark.capture(self.path, size)
+		except OSError:
+			return None
+
+	def _reapply_pending(self):
+		# Unflushed local writes land after anything replayed from disk.
+		for item in list(self._pending):
+			if isinstance(item, WriteAck):
+				continue
+			if isinstance(item, _EncodedRows):
+				_replay_lines(item.data, len(item.data), self._reader_state.copy(), _RowSink(self),
+							  self.delimiter, encoding=self.encoding)
+			elif item[0] is _TOMBSTONE:
+				OrderedDict.pop(self, item[1], None)
+			elif not item[0].startswith('#'):
+				OrderedDict.__setitem__(self, item[0], list(item))
+
 	def __getitem__(self, key):
 		key = str(key).rstrip()
 		try:
@@ -1402,26 +3695,174 @@ class WalStore(OrderedDict):
 			del self[key]
 			return
 		if key == MARKER_DEFAULTS:
+			self._enqueue([MARKER_DEFAULTS] + _normalize_defaults(value[1:]))
 			self.set_defaults(value[1:])
-			self._pending.append(list(self._defaults_row))
 			return
+		old = OrderedDict.get(self, key)
+		if old == value:
+			self.skipped_writes += 1  # same row already live: appending it again is a no-op
+			return
+		if not key.startswith('#'):
+			self._enqueue(list(value))  # first, so backpressure='raise' leaves the store unchanged
+			self.live_bytes += _pending_size(value) - (_pending_size(old) if old else 0)
 		super().__setitem__(key, value)
-		if key.startswith('#'):
+
+	def put(self, key, row, ack=None):
+		"""Set ``key`` like ``self[key] = row`` and return a :class:`WriteAck`.
+
+		With ``ack='disk'`` the flush that writes the row also syncs it,
+		whatever the :class:`DurabilityPolicy`, and then completes the
+		acknowledgement; rows queued together share that one sync. Callers
+		can wait for their own row without forcing a :meth:`flush`.
+
+		Args:
+			key: Row key.
+			row: Row fields (with or without the key), or a delimited string.
+			ack: ``'memory'`` or ``'disk'``; ``None`` follows the part's
+				``#_write_ack_#`` marker (built-in default ``memory``).
+
+		Returns:
+			WriteAck: Acknowledgement for the row.
+
+		Raises:
+			ValueError: If ``ack`` is not a recognized level.
+
+		Examples:
+			>>> import os, tempfile
+			>>> fd, path = tempfile.mkstemp(suffix='.tsv'); os.close(fd)
+			>>> db = WalStore(path)
+			>>> db.put('a', ['1'], ack='disk').wait(timeout=5)
+			True
+			>>> open(path).read()
+			'a\\t1\\n'
+			>>> _ = db.close(); os.unlink(path)
+		"""
+		level = self._ack_level(ack)
+		self[key] = row
+		return self._acknowledge(level)
+
+	def put_many(self, rows, ack=None):
+		"""Set many rows at once, queueing them as pre-encoded whole lines.
+
+		Each row is a delimited string or a field list whose first field is
+		the key; a lone key deletes it. Rows are normalized and encoded in
+		one pass, and every ``max_batch_size`` of them are queued as one
+		buffer that the flusher appends with a single write (§18.2), which
+		saves the per-row work of ``self[key] = row`` and of the flusher's
+		encoding. Rows equal to the live row are skipped as by
+		:meth:`__setitem__`, and ``#``-keyed rows are applied in their place
+		through it. ``coalesce`` does not merge rows across or within these
+		buffers.
+
+		Args:
+			rows: Iterable of rows.
+			ack: Acknowledgement level for the whole call, as for :meth:`put`.
+
+		Returns:
+			WriteAck: Acknowledgement for the rows.
+
+		Examples:
+			>>> import os, tempfile
+			>>> fd, path = tempfile.mkstemp(suffix='.tsv'); os.close(fd)
+			>>> db = WalStore(path)
+			>>> db.put_many([['a', '1'], 'b\\t2', ['a', '3'], ['b']], ack='disk').wait(timeout=5)
+			True
+			>>> dict(db), open(path).read()
+			({'a': ['a', '3']}, 'a\\t1\\nb\\t2\\na\\t3\\nb\\n')
+			>>> _ = db.close(); os.unlink(path)
+		"""
+		delimiter = self.delimiter
+		return self._put_many((_coerce_row(row, delimiter) for row in rows), self._ack_level(ack))
+
+	def update_many(self, items, ack=None):
+		"""Like :meth:`put_many` for a mapping or ``(key, row)`` pairs.
+
+		Rows may omit the key, as with ``self[key] = row``.
+
+		Args:
+			items: Mapping or iterable of ``(key, row)`` pairs.
+			ack: Acknowledgement level, as for :meth:`put`.
+
+		Returns:
+			WriteAck: Acknowledgement for the rows.
+		"""
+		return self._put_many(_keyed_rows(items, self.delimiter), self._ack_level(ack))
+
+	def _put_many(self, rows, level):
+		delimiter = self.delimiter
+		encode_line = get_codec(delimiter).encode_line
+		lines = []
+		ops = []
+		staged = {}
+		for row in rows:
+			key = row[0].rstrip() if row else ''
+			if not key:
+				continue
+			row[0] = key
+			if key.startswith('#'):
+				self._queue_encoded(lines, ops)
+				lines, ops = [], []
+				staged.clear()
+				self[key] = row
+				continue
+			current = staged[key] if key in staged else OrderedDict.get(self, key)
+			if len(row) == 1:
+				if current is None:
+					continue
+				lines.append(format_tombstone(key, delimiter))
+				row = None
+			elif current == row:
+				self.skipped_writes += 1
+				continue
+			else:
+				lines.append(encode_line(row))
+			ops.append((key, row))
+			staged[key] = row
+			if len(lines) >= self.max_batch_size:
+				self._queue_encoded(lines, ops)
+				lines, ops = [], []
+				staged.clear()
+		self._queue_encoded(lines, ops)
+		return self._acknowledge(level)
+
+	def _queue_encoded(self, lines, ops):
+		# Queue first, so backpressure='raise' leaves the store unchanged.
+		if not lines:
 			return
-		self._pending.append(list(value))
+		lines.append('')
+		self._enqueue(_EncodedRows('\n'.join(lines).encode(self.encoding, errors='replace'), len(ops)))
+		for key, row in ops:
+			old = OrderedDict.pop(self, key, None) if row is None else OrderedDict.get(self, key)
+			if old:
+				self.live_bytes -= _pending_size(old)
+			if row is not None:
+				OrderedDict.__setitem__(self, key, row)
+				self.live_bytes += _pending_size(row)
+
+	def _ack_level(self, ack):
+		level = (ack or self._reader_state.write_ack or 'memory').lower()
+		if level not in ('memory', 'disk'):
+			raise ValueError(f'unknown write_ack level {ack!r}')
+		return level
+
+	def _acknowledge(self, level):
+		handle = WriteAck(level)
+		if level == 'disk':
+			self._enqueue(handle)
+		return handle
 
 	def __delitem__(self, key):
 		key = str(key).rstrip()
 		if key == MARKER_DEFAULTS:
+			self._enqueue([MARKER_DEFAULTS])
 			self.set_defaults([])
-			self._pending.append([MARKER_DEFAULTS])
 			return
 		if key not in self:
 			return
+		if not key.startswith('#'):
+			self._enqueue((_TOMBSTONE, key))
+			self.live_bytes -= _pending_size(OrderedDict.__getitem__(self, key))
 		super().__delitem__(key)
-		if key.startswith('#'):
-			return
-		self._pending.append((_TOMBSTONE, key))
 
 	def pop(self, key, *args):
 		"""Remove ``key`` and persist a tombstone.
@@ -1472,10 +3913,14 @@ class WalStore(OrderedDict):
 		Returns:
 			WalStore: ``self``, after truncation.
 		"""
-		self._pending.clear()
+		acks = [item for item in self._drain_pending() if isinstance(item, WriteAck)]
 		super().clear()
 		truncate_part(self.path, encoding=self.encoding, delimiter=self.delimiter,
 					  header=self.header, defaults=self._reader_state.defaults)
+		self._watermark = self._capture_watermark()
+		self._count_bytes()
+		for handle in acks:
+			handle._complete()
 		return self
 
 	def flush(self):
@@ -1484,17 +3929,99 @@ class WalStore(OrderedDict):
 		Returns:
 			WalStore: ``self``, after draining the pending queue.
 		"""
-		if not self._pending:
-			return self
+		if self._pending:
+			self._after_batch(*self._write_batch())
+		return self
+
+	def _write_batch(self, limit=None, sync=True):
+		"""Write up to ``limit`` queued rows; return ``(acks, error)``.
+
+		``acks`` are the :class:`WriteAck` handles met along the way, left
+		for :meth:`_after_batch` to complete. With ``sync=False`` a due sync
+		is left to :meth:`_after_batch` as well. On ``OSError`` the rest of
+		the queue is dropped and its handles join ``acks``.
+		"""
+		acks = []
 		try:
 			with self._open_locked('ab') as f:
-				buf = io.BufferedWriter(f, buffer_size=65536)
-				while self._pending:
-					buf.write(_queue_item_to_bytes(self._pending.popleft(), self.delimiter, self.encoding))
-				buf.flush()
-		except OSError:
-			self._pending.clear()
-		return self
+				error = self._write_pending(f, acks, limit, sync)
+		except OSError as e:
+			acks.extend(item for item in self._drain_pending() if isinstance(item, WriteAck))
+			return acks, e
+		return acks, error
+
+	def _write_pending(self, f, acks, limit=None, sync=True):
+		# Body of _write_batch; the caller holds the part lock (see _open_locked).
+		rows = size = 0
+		try:
+			watermark = self._watermark
+			caught_up = watermark is not None and watermark.matches(os.fstat(f.fileno()))
+			buf = io.BufferedWriter(f, buffer_size=65536)
+			written = 0
+			batch = [] if self.coalesce else None
+			# past the limit, still take the acks that belong to rows written
+			while self._pending and (limit is None or rows < limit
+									 or isinstance(self._pending[0], WriteAck)):
+				item = self._pending.popleft()
+				if isinstance(item, WriteAck):
+					acks.append(item)
+					continue
+				rows += _pending_count(item)
+				size += _pending_size(item)
+				if batch is not None:
+					batch.append(item)
+					continue
+				data = _queue_item_to_bytes(item, self.delimiter, self.encoding)
+				written += len(data)
+				buf.write(data)
+			if batch:
+				kept = _coalesce_rows(batch)
+				self.coalesced_rows += len(batch) - len(kept)
+				data = b''.join(_queue_item_to_bytes(item, self.delimiter, self.encoding)
+								for item in kept)
+				written += len(data)
+				buf.write(data)
+			buf.flush()
+			buf.detach()  # leave ``f`` open for _LockedPart (or the next flush)
+			f.flush()
+			self.part_bytes += written
+			self.durability.wrote(written)
+			if sync and (self.durability.due() or (acks and self.durability.unsynced)):
+				self.durability.sync(f.fileno())
+			if caught_up:
+				# Nobody else wrote since the last replay: our own lines
+				# need no replay, so move the watermark past them.
+				self._watermark = self._capture_watermark()
+		except OSError as e:
+			acks.extend(item for item in self._drain_pending() if isinstance(item, WriteAck))
+			return e
+		finally:
+			self._release_room(rows, size)
+		return None
+
+	def _after_batch(self, acks, error):
+		"""Sync if the policy (or a waiting disk ack) asks for it, then complete ``acks``."""
+		if error is None and self._sync_wanted(acks):
+			try:
+				self.sync()
+			except OSError as e:
+				error = e
+		for handle in acks:
+			handle._complete(error)
+		if error is None and self._compaction_due():
+			self.compact()
+
+	def _sync_wanted(self, acks):
+		return self.durability.due() or bool(acks and self.durability.unsynced)
+
+	def _background_batch(self, limit=None, sync=True):
+		"""Background flusher step: pick up external appends, then write a batch."""
+		if self.monitor_external_changes:
+			with contextlib.suppress(OSError, ValueError):
+				self.refresh()
+		if not self._pending:
+			return [], None
+		return self._write_batch(limit, sync)
 
 	def close(self):
 		"""Stop the background flush worker and drain the pending queue.
@@ -1507,7 +4034,23 @@ class WalStore(OrderedDict):
 		if self._shutdown.is_set():
 			return self
 		self._shutdown.set()
-		self._worker.join()
+		with self._room:
+			self._room.notify_all()  # release producers blocked on a full queue
+		if self._scheduler is not None:
+			self._scheduler.unregister(self)
+		with self._wakeup:
+			self._wakeup.notify()
+		if self._worker is not None and self._worker.is_alive():
+			self._worker.join()
+		self.flush()
+		if self.durability.mode != 'never':
+			with contextlib.suppress(OSError):
+				self.sync()
+		self._release_handle()
+		if self.checkpoint:
+			with contextlib.suppress(OSError, ValueError):
+				save_checkpoint(self.path, encoding=self.encoding, delimiter=self.delimiter,
+								checkpoint=self.checkpoint)
 		return self
 
 	def __enter__(self):
@@ -1520,33 +4063,205 @@ class WalStore(OrderedDict):
 		with contextlib.suppress(AttributeError, RuntimeError, OSError, TypeError):
 			self.close()
 
+	def sync(self):
+		"""Force bytes flushed so far to stable storage, whatever the policy.
+
+		Returns:
+			WalStore: ``self``.
+		"""
+		with self._lock:
+			self._sync_part()
+		return self
+
+	def _sync_part(self):
+		# Caller holds self._lock.
+		if not self.durability.unsynced:
+			return
+		if self._handle is not None:
+			self.durability.sync(self._handle.fileno())
+		else:
+			with open(self.path, 'ab') as f:
+				self.durability.sync(f.fileno())
+
+	def _enqueue(self, item):
+		if isinstance(item, WriteAck):
+			self._pending.append(item)
+		elif self._make_room(item):
+			self.flush()  # backpressure='sync': the caller writes the queue itself
+			return
+		scheduler = self._scheduler
+		if scheduler is not None:
+			if len(self._pending) >= self.max_batch_size:
+				scheduler.schedule(self, 0)
+			else:
+				due = scheduler._due.get(id(self))
+				if due is None or due > time.monotonic() + self.max_batch_delay:
+					scheduler.schedule(self, self.max_batch_delay)
+			return
+		# The worker raises a flag before it re-checks the queue and sleeps,
+		# so reading the flag after appending never misses a wakeup.
+		if self._worker_idle or (self._worker_filling and len(self._pending) >= self.max_batch_size):
+			with self._wakeup:
+				self._wakeup.notify()
+
+	def _make_room(self, item):
+		# Queue a row within the pending limits; True if the caller must flush.
+		size = _pending_size(item)
+		flush = False
+		with self._room:
+			if self._pending_rows and not self._has_room(size):
+				if self.backpressure == 'raise':
+					raise queue.Full(f'{self._pending_rows} rows ({self._pending_bytes} bytes) pending for {self.path}')
+				if self.backpressure == 'block':
+					self._blocked += 1
+					try:
+						self._flush_soon()
+						while self._pending_rows and not self._has_room(size) and not self._shutdown.is_set():
+							self._room.wait()
+					finally:
+						self._blocked -= 1
+				else:
+					flush = True
+			self._pending.append(item)
+			self._pending_rows += _pending_count(item)
+			self._pending_bytes += size
+		return flush
+
+	def _has_room(self, size):
+		return ((self.max_pending_rows is None or self._pending_rows < self.max_pending_rows)
+				and (self.max_pending_bytes is None or self._pending_bytes + size <= self.max_pending_bytes))
+
+	def _release_room(self, rows, size):
+		if not rows:
+			return
+		with self._room:
+			self._pending_rows = max(0, self._pending_rows - rows)
+			self._pending_bytes = max(0, self._pending_bytes - size)
+			self._room.notify_all()
+
+	def _drain_pending(self):
+		# Remove every queued item (keeping the counters exact) and return them.
+		items = []
+		rows = size = 0
+		while self._pending:
+			item = self._pending.popleft()
+			items.append(item)
+			if not isinstance(item, WriteAck):
+				rows += _pending_count(item)
+				size += _pending_size(item)
+		self._release_room(rows, size)
+		return items
+
+	def _flush_soon(self):
+		# Ask the flusher for an immediate batch (a producer is blocked on a full queue).
+		if self._scheduler is not None:
+			self._scheduler.schedule(self, 0)
+		else:
+			with self._wakeup:
+				self._wakeup.notify()
+
+	def _idle_timeout(self):
+		# None sleeps until a mutation arrives; periodic work shortens it.
+		timeout = self.external_check_interval if self.monitor_external_changes else None
+		policy = self.durability
+		if policy.unsynced and policy.mode == 'interval':
+			due_in = max(0.0, policy.limit - (time.monotonic() - policy._last_sync))
+			timeout = due_in if timeout is None else min(timeout, due_in)
+		return timeout
+
+	def _next_flush_delay(self):
+		# Seconds until a scheduler should visit this store again, or None.
+		if self._shutdown.is_set():
+			return None
+		if self._pending:
+			if self._blocked or len(self._pending) >= self.max_batch_size:
+				return 0
+			return self.max_batch_delay
+		return self._idle_timeout()
+
+	def _wait_for_batch(self):
+		with self._wakeup:
+			self._worker_idle = True
+			while not self._pending and not self._shutdown.is_set():
+				timeout = self._idle_timeout()
+				if not self._wakeup.wait(timeout) and timeout is not None:
+					break
+			self._worker_idle = False
+			if not self._pending:
+				return
+			self._worker_filling = True
+			deadline = time.monotonic() + self.max_batch_delay
+			while (len(self._pending) < self.max_batch_size and not self._blocked
+				   and not self._shutdown.is_set()):
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					break
+				self._wakeup.wait(remaining)
+			self._worker_filling = False
+
 	def _flush_worker(self):
 		while not self._shutdown.is_set():
-			self.flush()
-			time.sleep(self.flush_interval)
+			self._wait_for_batch()
+			with contextlib.suppress(OSError):
+				self._after_batch(*self._background_batch())
 		self.flush()
 
 	def _open_locked(self, mode):
 		self._lock.acquire()
-		f = open_part(self.path, mode, encoding=self.encoding)
-		if os.name == 'posix':
-			fcntl.lockf(f, fcntl.LOCK_EX)
-		elif os.name == 'nt':
-			msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 2147483647)
-		return _LockedPart(f, self._lock)
+		try:
+			keep = self.keep_open and mode == 'ab' and not _is_compressed(self.path)
+			f = self._kept_handle() if keep else open_part(self.path, mode, encoding=self.encoding)
+			if os.name == 'posix':
+				fcntl.lockf(f, fcntl.LOCK_EX)
+			elif os.name == 'nt':
+				if keep:
+					f.seek(0)  # lock (and later unlock) the same region every time
+				msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 2147483647)
+		except BaseException:
+			self._lock.release()
+			raise
+		return _LockedPart(f, self._lock, close=not keep)
+
+	def _kept_handle(self):
+		"""Return the persistent append handle, reopening it if the part was replaced."""
+		f = self._handle
+		if f is not None:
+			try:
+				if os.path.samestat(os.fstat(f.fileno()), os.stat(self.path)):
+					return f
+			except (OSError, ValueError):
+				pass
+			with contextlib.suppress(OSError):
+				f.close()
+		self._handle = None
+		f = self._handle = open(self.path, 'ab', buffering=0)  # noqa: SIM115
+		_KEPT_OPEN[id(self)] = self
+		return f
+
+	def _release_handle(self):
+		with self._lock:
+			handle, self._handle = self._handle, None
+			_KEPT_OPEN.pop(id(self), None)
+			if handle is not None:
+				with contextlib.suppress(OSError):
+					handle.close()
 
 
 class _LockedPart:
 	"""File wrapper that releases its lock and closes the file on exit.
 
+	Syncing is left to the caller's :class:`DurabilityPolicy`.
+
 	Args:
 		file_obj: Open part file handle.
 		lock: Threading lock held for the duration of the context.
+		close: If False, only unlock on exit and leave ``file_obj`` open.
 	"""
 
-	def __init__(self, file_obj, lock):
+	def __init__(self, file_obj, lock, close=True):
 		self._file = file_obj
 		self._lock = lock
+		self._close = close
 
 	def write(self, data):
 		return self._file.write(data)
@@ -1560,7 +4275,6 @@ class _LockedPart:
 	def __exit__(self, *exc):
 		try:
 			self._file.flush()
-			os.fsync(self._file.fileno())
 		except OSError:
 			pass
 		if not self._file.closed:
@@ -1568,24 +4282,362 @@ class _LockedPart:
 				fcntl.lockf(self._file, fcntl.LOCK_UN)
 			elif os.name == 'nt':
 				try:
+					if not self._close:
+						self._file.seek(0)
 					msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 2147483647)
 				except OSError:
 					pass
-			self._file.close()
+			if self._close:
+				self._file.close()
 		if self._lock.locked():
 			self._lock.release()
 
 
+class MultiPartStore(WalStore):
+	"""A :class:`WalStore` over a multi-part store (specification §17).
+
+	Opening the store replays every part of ``path`` (see
+	:func:`discover_parts`) as one concatenation with :func:`replay_parts`,
+	so marker state carries across parts, and then starts a fresh active
+	part named with a new UUIDv7 ordinal (:func:`new_part_ordinal`) that
+	sorts after every existing part. All writes go to the active part: the
+	parts found on open are never written again, so they can be cached or
+	compressed by another process. An active part that is still empty when
+	the store is closed is removed again.
+
+	:meth:`compact` follows the full §19 procedure without pausing the
+	writer: the store moves to a new active part and a worker process
+	snapshots the now immutable prefix into a part slotted between the two.
+	With ``compact_ratio`` set the flusher starts one on its own. Parts kept
+	by the ``'keep'`` rotate action still count in :attr:`part_bytes` once
+	the store is reopened, so pair automatic compaction with ``'rename'`` or
+	``'delete'``.
+
+	:meth:`refresh` follows appends to the active part only; parts added by
+	other writers are picked up by :meth:`reload`. :meth:`clear` writes a
+	tombstone for every key, since earlier parts cannot be truncated. Only
+	one writer should run per store, as any part up to the active one may
+	be snapshotted.
+
+	Args:
+		path: Store path up to and including the format extension, such as
+			``data.tsvz``.
+		create: If False, raise ``FileNotFoundError`` when the store has no
+			parts yet.
+		rotate: ``#_rotate_#`` action applied after a snapshot (``'keep'``,
+			``'rename'`` or ``'delete'``); ``None`` follows the store's own
+			marker.
+		replay_workers: Processes used to replay the parts on (re)load; see
+			:func:`replay_parts`.
+		**kwargs: Any other :class:`WalStore` argument except
+			``checkpoint``.
+
+	Attributes:
+		store_path (str): The store path.
+		parts (list): Parts before the active one, earliest first.
+
+	Examples:
+		>>> import os, tempfile, shutil
+		>>> d = tempfile.mkdtemp(); path = os.path.join(d, 'db.tsvz')
+		>>> with MultiPartStore(path, header=['id', 'v']) as db:
+		...     db['a'] = ['1']; db['b'] = ['2']
+		>>> with MultiPartStore(path) as db:
+		...     del db['a']; db['c'] = ['3']
+		...     len(db.parts)
+		1
+		>>> len(discover_parts(path)), dict(read_store(path, multipart=True))
+		(2, {'b': ['b', '2'], 'c': ['c', '3']})
+		>>> shutil.rmtree(d)
+	"""
+
+	def __init__(self, path, *, create=True, rotate=None, **kwargs):
+		if kwargs.get('checkpoint'):
+			raise ValueError('checkpoint needs a single-part store')
+		if rotate is not None and rotate not in ROTATE_ACTIONS:
+			raise ValueError(f'unknown rotate action {rotate!r}')
+		self.store_path = path
+		self.rotate = rotate
+		self._snapshot = None
+		self._pool = None
+		self._compacting = threading.Lock()  # held from rotation until the snapshot is done
+		self.parts = discover_parts(path)
+		if not self.parts and not create:
+			raise FileNotFoundError(path)
+		after = _part_ordinal(path, self.parts[-1]) if self.parts else None
+		super().__init__(part_path(path, new_part_ordinal(after)), create=True, **kwargs)
+		self._empty_size = _file_size(self.path)
+
+	def _replay(self):
+		ensure_part_exists(self.path, encoding=self.encoding, delimiter=self.delimiter,
+						   header=self.header or None)
+		read_store(
+			self.store_path, encoding=self.encoding, delimiter=self.delimiter, store=self,
+			workers=self.replay_workers, multipart=True,
+		)
+		self.parts = [part for part in discover_parts(self.store_path) if part != self.path]
+
+	def _count_bytes(self):
+		super()._count_bytes()
+		self.part_bytes += sum(_file_size(part) or 0 for part in self.parts)
+
+	def compact(self, rotate=None):
+		"""Snapshot everything written so far in a worker process (§19.2).
+
+		Under the flush lock the writer syncs and leaves the active part for
+		a fresh one; rows still pending simply land in the new part. The
+		parts up to the old active one are then an immutable prefix, and the
+		store's worker process runs :func:`snapshot_parts` on them: it writes the
+		snapshot as a part whose ordinal lies halfway between the prefix and
+		the new active part, syncs it, and applies the rotate action. This
+		call returns as soon as the worker is started; the store keeps
+		serving reads and writes from memory meanwhile.
+
+		Args:
+			rotate: ``'keep'``, ``'rename'`` or ``'delete'``; ``None`` uses
+				the store's ``rotate`` argument, then its ``#_rotate_#``
+				marker.
+
+		Returns:
+			concurrent.futures.Future | bool: Future of the snapshot part's
+			path, or False if the previous snapshot is still running.
+		"""
+		if rotate is not None and rotate not in ROTATE_ACTIONS:
+			raise ValueError(f'unknown rotate action {rotate!r}')
+		if not self._compacting.acquire(blocking=False):
+			return False
+		try:
+			future = self._start_snapshot(rotate)
+		except BaseException:
+			self._compacting.release()
+			raise
+		self._snapshot = future
+		future.add_done_callback(self._snapshot_done)
+		return future
+
+	def _start_snapshot(self, rotate):
+		last = _part_ordinal(self.store_path, self.path)
+		ordinal = int(new_part_ordinal(after=last + 1), 16)
+		with self._lock:
+			self._sync_part()
+			handle, self._handle = self._handle, None
+			_KEPT_OPEN.pop(id(self), None)
+			if handle is not None:
+				with contextlib.suppress(OSError):
+					handle.close()
+			self.parts = [*self.parts, self.path]
+			self.path = part_path(self.store_path, ordinal)
+			ensure_part_exists(self.path, encoding=self.encoding, delimiter=self.delimiter,
+							   header=self.header or None)
+			self._empty_size = _file_size(self.path)
+			self._watermark = self._capture_watermark()
+		prefix = [part for part in self.parts if _part_ordinal(self.store_path, part) <= last]
+		return self._snapshot_pool().submit(
+			snapshot_parts, prefix, part_path(self.store_path, last + (ordinal - last) // 2),
+			encoding=self.encoding, delimiter=self.delimiter, header=self.header or None,
+			rotate=rotate or self.rotate,
+		)
+
+	def _snapshot_pool(self):
+		# One worker process for the store's lifetime (see _worker_context).
+		if self._pool is None:
+			self._pool = ProcessPoolExecutor(max_workers=1, mp_context=_worker_context())
+		return self._pool
+
+	def _snapshot_done(self, future):
+		try:
+			if future.cancelled() or future.exception() is not None:
+				return
+			snap = future.result()
+			with self._lock:
+				self.parts = [part for part in discover_parts(self.store_path) if part != self.path]
+				# parts before the snapshot are subsumed by it, kept or not
+				live = self.parts[self.parts.index(snap):] if snap in self.parts else self.parts
+				self.part_bytes = sum(_file_size(part) or 0 for part in [*live, self.path])
+		finally:
+			self._compacting.release()
+
+	def clear(self):
+		"""Delete every key by appending tombstones to the active part.
+
+		Returns:
+			MultiPartStore: ``self``.
+		"""
+		for key in list(self):
+			del self[key]
+		return self
+
+	def close(self):
+		"""Close as :meth:`WalStore.close`, then wait for a running snapshot.
+
+		The snapshot worker process is shut down, and the active part is
+		removed if nothing was written to it.
+
+		Returns:
+			MultiPartStore: ``self``.
+		"""
+		if self._shutdown.is_set():
+			return self
+		super().close()
+		if self._snapshot is not None:
+			self._snapshot.exception()  # waits; a failed snapshot leaves the parts as they were
+		if self._pool is not None:
+			self._pool.shutdown()
+			self._pool = None
+		if _file_size(self.path) == self._empty_size:
+			with contextlib.suppress(OSError):
+				os.unlink(self.path)
+		return self
+
+
 # ---------------------------------------------------------------------------
 # OffsetStore — key→offset index, synchronous append (§18 single-process)
 # ---------------------------------------------------------------------------
 
+class LRURowCache:
+	"""Bounded key→row cache with least-recently-used eviction.
+
+	Either bound may be ``None``; with both unset the cache is unbounded.
+	Byte accounting is approximate: the summed length of a row's fields.
+
+	Args:
+		max_rows: Maximum number of cached rows.
+		max_bytes: Maximum summed field length of cached rows.
+
+	Attributes:
+		hits (int): Lookups answered from the cache.
+		misses (int): Lookups that were not cached.
+		evictions (int): Rows dropped to honour a bound.
+
+	Examples:
+		>>> cache = LRURowCache(max_rows=2)
+		>>> cache.put('a', ['a', '1']); cache.put('b', ['b', '2'])
+		>>> cache.get('a')
+		['a', '1']
+		>>> cache.put('c', ['c', '3'])
+		>>> cache.get('b') is None, sorted(cache.keys())
+		(True, ['a', 'c'])
+		>>> cache.stats()['evictions']
+		1
+	"""
+
+	def __init__(self, max_rows=None, max_bytes=None):
+		self.max_rows = max_rows
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._rows = OrderedDict()
+		self._bytes = 0
+
+	@property
+	def bounded(self):
+		return self.max_rows is not None or self.max_bytes is not None
+
+	def get(self, key):
+		"""Return the cached row for ``key`` (marking it recently used), or ``None``."""
+		try:
+			row, _ = self._rows[key]
+		except KeyError:
+			self.misses += 1
+			return None
+		self._rows.move_to_end(key)
+		self.hits += 1
+		return row
+
+	def peek(self, key):
+		"""Return the cached row for ``key``, or ``None``, without touching recency or counters."""
+		entry = self._rows.get(key)
+		return None if entry is None else entry[0]
+
+	def put(self, key, row):
+		"""Cache ``row`` under ``key``, evicting the least recently used rows."""
+		size = sum(map(len, row))
+		if self.max_bytes is not None and size > self.max_bytes:
+			self.pop(key)
+			return
+		old = self._rows.pop(key, None)
+		if old is not None:
+			self._bytes -= old[1]
+		self._rows[key] = (row, size)
+		self._bytes += size
+		while self._rows and (
+			(self.max_rows is not None and len(self._rows) > self.max_rows)
+			or (self.max_bytes is not None and self._bytes > self.max_bytes)
+		):
+			_, (_, evicted) = self._rows.popitem(last=False)
+			self._bytes -= evicted
+			self.evictions += 1
+
+	def update(self, rows):
+		for key, row in rows.items():
+			self.put(key, row)
+
+	def pop(self, key, default=None):
+		old = self._rows.pop(key, None)
+		if old is None:
+			return default
+		self._bytes -= old[1]
+		return old[0]
+
+	def clear(self):
+		self._rows.clear()
+		self._bytes = 0
+
+	def keys(self):
+		return self._rows.keys()
+
+	def __contains__(self, key):
+		return key in self._rows
+
+	def __len__(self):
+		return len(self._rows)
+
+	def stats(self):
+		"""Return counters and current occupancy.
+
+		Returns:
+			dict: ``hits``, ``misses``, ``evictions``, ``rows``, ``bytes``,
+			``max_rows``, and ``max_bytes``.
+		"""
+		return {
+			'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+			'rows': len(self._rows), 'bytes': self._bytes,
+			'max_rows': self.max_rows, 'max_bytes': self.max_bytes,
+		}
+
+
 class OffsetStore(MutableMapping):
 	"""Key→byte-offset index with on-demand value materialization.
 
 	Uses less memory than :class:`WalStore` because row contents are read
-	from disk when accessed. Writes are synchronous. Intended for
-	single-process use (specification §18).
+	from disk when accessed. Intended for single-process use
+	(specification §18).
+
+	Offsets are assigned from a tail counter rather than a ``seek``/``tell``
+	per write, and by default every row is written through. With
+	``buffer_bytes`` set (``DEFAULT_WRITE_BUFFER`` is a good size), appended
+	lines are collected in a write buffer instead, which is written once it
+	holds ``buffer_bytes``, on the first write after it has held rows for
+	``buffer_delay`` seconds, and on :meth:`flush`, :meth:`reload`,
+	:meth:`write_index`, and :meth:`close`. Nothing writes the buffer out
+	between writes, so a buffering caller must :meth:`flush` when it goes
+	idle. Rows still in the buffer are read from it.
+
+	Rows are kept in an :class:`LRURowCache`. With ``cache_size`` or
+	``cache_bytes`` set, :meth:`reload` builds only the offset index and
+	rows are cached as they are read or written; misses are read back from
+	the part and decoded with the marker state in effect at their offset.
+
+	Setting a key to the row it already holds writes nothing and counts in
+	``skipped_writes``. The check only looks in the row cache, so it never
+	reads the part and keeps nothing per key beyond the cache's bounds; a
+	key whose row is not cached is written.
+
+	With ``index`` enabled, the offset index, final reader state, and a
+	:class:`PartWatermark` are saved to a JSON sidecar on :meth:`close` (and
+	every ``index_every`` writes). The next open loads the sidecar and
+	replays only the bytes appended after the watermark, falling back to a
+	full replay if the part was rewritten.
 
 	Args:
 		path: Filesystem path of the backing part.
@@ -1594,18 +4646,52 @@ class OffsetStore(MutableMapping):
 		encoding: Text encoding for append I/O.
 		delimiter: Field delimiter; inferred from ``path`` when ``None``.
 		defaults: Optional value-column defaults.
+		cache_size: Maximum number of cached rows; ``None`` for no limit.
+		cache_bytes: Maximum summed field length of cached rows; ``None``
+			for no limit.
+		index: ``True`` to keep a sidecar index at ``<path>.idx``, or the
+			sidecar path itself; falsy to disable.
+		index_every: Also rewrite the sidecar after this many writes.
+		buffer_bytes: Write-buffer size in bytes; ``0`` (the default) to
+			write through.
+		buffer_delay: Seconds a buffered row may wait for a later write
+			before the buffer is written with it.
+
+	Examples:
+		>>> import os, tempfile
+		>>> fd, path = tempfile.mkstemp(suffix='.tsvz'); os.close(fd); os.unlink(path)
+		>>> db = OffsetStore(path, cache_size=1)
+		>>> db['a'] = ['1']; db['b'] = ['2']
+		>>> db['a'], db['b'], db['b']
+		(['a', '1'], ['b', '2'], ['b', '2'])
+		>>> {k: db.cache_stats()[k] for k in ('hits', 'misses', 'evictions')}
+		{'hits': 1, 'misses': 2, 'evictions': 3}
+		>>> _ = db.close(); os.unlink(path)
 	"""
 
 	def __init__(self, path, *, header=None, create=True, encoding='utf8',
-				 delimiter=None, defaults=None):
+				 delimiter=None, defaults=None, cache_size=None, cache_bytes=None,
+				 index=False, index_every=None, buffer_bytes=0, buffer_delay=1.0):
 		self.path = path
+		self.index = index
+		self.index_every = index_every
+		self.buffer_bytes = buffer_bytes
+		self.buffer_delay = buffer_delay
+		self._buffer = bytearray()
+		self._buffered_at = 0.0
+		self._tail = None
+		self._writes_since_index = 0
 		self.encoding = encoding
 		self.delimiter = delimiter or delimiter_for_path(path)
 		self.header = _parse_columns(header, self.delimiter)
 		self.create = create
 		self._reader_state = ReaderState()
-		self._values = {}
+		self._values = LRURowCache(cache_size, cache_bytes)
 		self._offsets = {}
+		self.skipped_writes = 0
+		self._mark_offsets = []
+		self._mark_states = []
+		self._replayed_end = 0
 		self.set_defaults(defaults)
 		try:
 			ensure_part_exists(self.path, create=self.create, encoding=self.encoding,
@@ -1631,23 +4717,156 @@ class OffsetStore(MutableMapping):
 	def defaults(self):
 		return list(self._defaults_row)
 
+	@property
+	def index_path(self):
+		"""Path of the sidecar index, or ``None`` when disabled."""
+		if not self.index:
+			return None
+		return self.path + '.idx' if self.index is True else self.index
+
 	def reload(self):
+		if not self._file.closed:
+			self.flush()
+		self._tail = None
 		self._offsets.clear()
 		self._values.clear()
+		if self.index_path and self._load_index():
+			return self
 		loaded = OrderedDict()
 		read_store(self.path, create=self.create, encoding=self.encoding,
-				   delimiter=self.delimiter, store=loaded, store_offset=True)
+				   delimiter=self.delimiter, store=loaded, store_offset=True,
+				   use_mmap=True, cache_values=not self._values.bounded)
 		self._offsets.update(loaded)
-		self._values.update(getattr(loaded, '_values_cache', {}))
+		self._values.update(getattr(loaded, '_values_cache', None) or {})
 		self._reader_state = getattr(loaded, '_reader_state', self._reader_state)
+		self._mark_offsets, self._mark_states, self._replayed_end = scan_marker_states(
+			self.path, self.delimiter, encoding=self.encoding,
+		)
 		return self
 
-	def _append_line(self, line):
-		self._file.seek(0, os.SEEK_END)
-		pos = self._file.tell()
-		self._file.write(line.encode(self.encoding, errors='replace') + b'\n')
+	def _load_index(self):
+		try:
+			with open(self.index_path, 'rb') as f:
+				meta = json.load(f)
+			if (meta['format'] != INDEX_FORMAT or meta['delimiter'] != self.delimiter
+					or meta['encoding'] != self.encoding):
+				return False
+			watermark = PartWatermark.from_dict(meta['watermark'])
+			state = ReaderState.from_dict(meta['state'])
+			marks = [(off, ReaderState.from_dict(st)) for off, st in meta['marks']]
+			offsets = meta['offsets']
+		except (OSError, ValueError, KeyError, TypeError):
+			return False
+		status = watermark.compare(self.path)
+		if status == 'changed':
+			return False
+		self._offsets.update(offsets)
+		self._mark_offsets = [off for off, _ in marks]
+		self._mark_states = [st for _, st in marks]
+		self._replayed_end = watermark.size
+		if status == 'grown':
+			values = None if self._values.bounded else {}
+			self._scan_tail_marks(state)
+			_, state = replay_part(
+				self.path, self.delimiter, encoding=self.encoding, store=self._offsets,
+				store_offset=True, values_cache=values, use_mmap=True, state=state,
+				start=watermark.size,
+			)
+			self._values.update(values or {})
+		self._reader_state = state
+		return True
+
+	def _scan_tail_marks(self, state):
+		offsets, states, end = scan_marker_states(
+			self.path, self.delimiter, encoding=self.encoding, state=state,
+			start=self._replayed_end,
+		)
+		self._mark_offsets.extend(offsets)
+		self._mark_states.extend(states)
+		self._replayed_end = max(end, self._replayed_end)
+
+	def write_index(self):
+		"""Atomically rewrite the sidecar index (no-op when disabled).
+
+		Returns:
+			OffsetStore: ``self``.
+		"""
+		if not self.index_path or self._file.closed:
+			return self
+		self.flush()
+		if not os.path.exists(self.path):
+			return self
+		# Markers appended this session must be in the saved marks.
+		self._scan_tail_marks(self._mark_states[-1] if self._mark_states else ReaderState())
+		meta = {
+			'format': INDEX_FORMAT,
+			'delimiter': self.delimiter,
+			'encoding': self.encoding,
+			'watermark': PartWatermark.capture(self.path, self._replayed_end).as_dict(),
+			'state': self._reader_state.as_dict(),
+			'marks': [[off, st.as_dict()] for off, st in zip(self._mark_offsets, self._mark_states)],
+			'offsets': {k: v for k, v in self._offsets.items() if isinstance(v, int)},
+		}
+		_atomic_write(self.index_path, json.dumps(meta, separators=(',', ':')).encode('utf8'))
+		self._writes_since_index = 0
+		return self
+
+	def _note_write(self, count=1):
+		if self.index_every:
+			self._writes_since_index += count
+			if self._writes_since_index >= self.index_every:
+				self.write_index()
+
+	def cache_stats(self):
+		"""Return value-cache counters (see :meth:`LRURowCache.stats`)."""
+		return self._values.stats()
+
+	def _state_at(self, offset):
+		# Rows appended after the last reload use the live state.
+		if offset >= self._replayed_end:
+			return self._reader_state.copy()
+		i = bisect.bisect_right(self._mark_offsets, offset)
+		return self._mark_states[i - 1].copy() if i else ReaderState()
+
+	def flush(self):
+		"""Write the buffered lines to the part.
+
+		Returns:
+			OffsetStore: ``self``.
+		"""
+		if self._buffer:
+			self._file.seek(self._tail - len(self._buffer))
+			self._file.write(self._buffer)
+			self._buffer.clear()
+		self._file.flush()
+		return self
+
+	def _append(self, data):
+		# Buffer ``data`` at the tail and return its offset.
+		if self._tail is None:
+			self._file.seek(0, os.SEEK_END)
+			self._tail = self._file.tell()
+		pos = self._tail
+		now = time.monotonic()
+		if not self._buffer:
+			self._buffered_at = now
+		self._buffer += data
+		self._tail += len(data)
+		if len(self._buffer) >= self.buffer_bytes or now - self._buffered_at >= self.buffer_delay:
+			self.flush()
 		return pos
 
+	def _append_line(self, line):
+		return self._append(line.encode(self.encoding, errors='replace') + b'\n')
+
+	def _line_at(self, offset):
+		start = offset - (self._tail - len(self._buffer)) if self._buffer else -1
+		if start < 0:
+			self._file.seek(offset)
+			return self._file.readline()
+		end = self._buffer.find(b'\n', start)
+		return bytes(self._buffer[start:end + 1 if end >= 0 else len(self._buffer)])
+
 	def _write_row(self, fields):
 		if len(fields) == 1:
 			line = format_tombstone(fields[0], self.delimiter)
@@ -1658,13 +4877,16 @@ class OffsetStore(MutableMapping):
 		return self._append_line(line)
 
 	def _read_at(self, offset, key=None):
-		if key is not None and key in self._values:
-			return list(self._values[key])
-		self._file.seek(offset)
-		line = self._file.readline().decode(self.encoding, errors='replace').rstrip('\r\n')
+		if key is not None:
+			row = self._values.get(key)
+			if row is not None:
+				return list(row)
+		line = self._line_at(offset).decode(self.encoding, errors='replace').rstrip('\r\n')
 		scratch = OrderedDict()
-		kind, entry = process_record(line, self._reader_state.copy(), scratch, self.delimiter)
+		kind, entry = process_record(line, self._state_at(offset), scratch, self.delimiter)
 		if kind == 'data' and entry is not None:
+			if key is not None:
+				self._values.put(key, entry.row)
 			return list(entry.row)
 		if key is not None:
 			raise KeyError(key)
@@ -1678,7 +4900,10 @@ class OffsetStore(MutableMapping):
 			if self._reader_state.return_on_missing:
 				return resolve_missing_key(key, self._reader_state)
 			raise KeyError(key)
-		return self._read_at(self._offsets[key], key)
+		offset = self._offsets[key]
+		if isinstance(offset, list):  # in-memory '#' key, never written
+			return list(offset)
+		return self._read_at(offset, key)
 
 	def __setitem__(self, key, value):
 		key = str(key).rstrip()
@@ -1694,18 +4919,133 @@ class OffsetStore(MutableMapping):
 			self.set_defaults(value[1:])
 			return
 		if key.startswith('#'):
-			self._offsets[key] = value
-			self._values[key] = list(value)
+			self._offsets[key] = list(value)
+			return
+		if key in self._offsets and self._is_current(key, value):
+			self.skipped_writes += 1
 			return
 		pos = self._write_row(value)
 		self._offsets[key] = pos
-		self._values[key] = list(value)
+		self._values.put(key, list(value))
+		self._note_write()
+
+	def put_many(self, rows):
+		"""Set many rows with one append to the part file.
+
+		Rows are as for :meth:`WalStore.put_many`: the first field is the
+		key and a lone key deletes it. Their lines are encoded in one pass
+		and appended through the write buffer about ``DEFAULT_BLOCK_SIZE``
+		bytes at a time, before the offsets are updated; written rows are
+		not put in the value cache. Unchanged rows are skipped as by :meth:`__setitem__`,
+		and ``#``-keyed rows are applied in their place through it.
+
+		Args:
+			rows: Iterable of delimited strings or field lists.
+
+		Returns:
+			OffsetStore: ``self``.
+
+		Examples:
+			>>> import os, tempfile
+			>>> fd, path = tempfile.mkstemp(suffix='.tsv'); os.close(fd)
+			>>> db = OffsetStore(path)
+			>>> db.put_many([['a', '1'], ['b', '2'], ['a', '3'], ['b']])['a']
+			['a', '3']
+			>>> sorted(db)
+			['a']
+			>>> _ = db.close(); open(path).read()
+			'a\\t1\\nb\\t2\\na\\t3\\nb\\n'
+			>>> os.unlink(path)
+		"""
+		delimiter = self.delimiter
+		return self._put_many(_coerce_row(row, delimiter) for row in rows)
+
+	def update_many(self, items):
+		"""Like :meth:`put_many` for a mapping or ``(key, row)`` pairs.
+
+		Args:
+			items: Mapping or iterable of ``(key, row)`` pairs.
+
+		Returns:
+			OffsetStore: ``self``.
+		"""
+		return self._put_many(_keyed_rows(items, self.delimiter))
+
+	def _put_many(self, rows):
+		delimiter = self.delimiter
+		encoding = self.encoding
+		encode_line = get_codec(delimiter).encode_line
+		chunks = []
+		ops = []
+		size = 0
+		staged = {}
+		for row in rows:
+			key = row[0].rstrip() if row else ''
+			if not key:
+				continue
+			row[0] = key
+			if key.startswith('#'):
+				self._write_staged(chunks, ops)
+				chunks, ops, size = [], [], 0
+				staged.clear()
+				self[key] = row
+				continue
+			if len(row) == 1:
+				if key in staged:
+					live = staged[key] is not None
+				else:
+					live = key in self._offsets
+				if not live:
+					continue
+				line = format_tombstone(key, delimiter)
+				row = None
+			else:
+				if key in staged:
+					unchanged = staged[key] == row
+				else:
+					unchanged = key in self._offsets and self._is_current(key, row)
+				if unchanged:
+					self.skipped_writes += 1
+					continue
+				line = encode_line(row)
+			data = line.encode(encoding, errors='replace') + b'\n'
+			chunks.append(data)
+			ops.append((key, row))
+			staged[key] = row
+			size += len(data)
+			if size >= DEFAULT_BLOCK_SIZE:
+				self._write_staged(chunks, ops)
+				chunks, ops, size = [], [], 0
+				staged.clear()
+		self._write_staged(chunks, ops)
+		return self
+
+	def _write_staged(self, chunks, ops):
+		# One write per block, then point the offsets into it. The rows are not
+		# cached, so that a bulk load does not evict the rows being read.
+		if not chunks:
+			return
+		pos = self._append(b''.join(chunks))
+		for (key, row), data in zip(ops, chunks):
+			self._values.pop(key, None)
+			if row is None:
+				self._offsets.pop(key, None)
+			else:
+				self._offsets[key] = pos
+			pos += len(data)
+		self._note_write(len(ops))
+
+	def _is_current(self, key, value):
+		# Whether ``value`` is known to be the live row of ``key``, without
+		# reading the part: a row that is not cached counts as changed.
+		return self._values.peek(key) == value
 
 	def __delitem__(self, key):
 		key = str(key).rstrip()
 		if key == MARKER_DEFAULTS:
 			self.set_defaults([])
 			self._write_row([MARKER_DEFAULTS])
+			self._note_write()
 			return
 		if key not in self._offsets:
 			return
@@ -1713,6 +5053,7 @@ class OffsetStore(MutableMapping):
 		self._values.pop(key, None)
 		if not key.startswith('#'):
 			self._write_row([key])
+			self._note_write()
 
 	def pop(self, key, *args):
 		"""Remove ``key`` and persist a tombstone to the part file.
@@ -1761,6 +5102,11 @@ class OffsetStore(MutableMapping):
 	def clear(self):
 		self._offsets.clear()
 		self._values.clear()
+		self._mark_offsets = []
+		self._mark_states = []
+		self._replayed_end = 0
+		self._buffer.clear()
+		self._tail = 0
 		self._file.seek(0)
 		self._file.truncate()
 		if self.header:
@@ -1769,6 +5115,8 @@ class OffsetStore(MutableMapping):
 
 	def close(self):
 		if not self._file.closed:
+			self.flush()
+			self.write_index()
 			self._file.close()
 		return self
 
@@ -2113,8 +5461,12 @@ class TSVZed(WalStore):
 
 	Provides an append-only WAL with optional periodic snapshots.
 	``rewrite_on_load``, ``rewrite_on_exit``, and ``rewrite_interval`` map to
-	:meth:`hardMapToFile` (which calls :func:`snapshot_part`). Prefer
-	invoking ``hardMapToFile()`` explicitly in new code.
+	:meth:`hardMapToFile` (which calls :meth:`WalStore.compact`). With
+	``compact_ratio`` set, the load and interval rewrites only run when
+	:attr:`WalStore.dead_ratio` is past it and the part holds at least
+	``compact_min_bytes``, and the store also compacts itself then (see
+	:class:`WalStore`). Prefer invoking ``hardMapToFile()`` explicitly in
+	new code.
 
 	Args:
 		fileName: Path of the backing part.
@@ -2126,21 +5478,46 @@ class TSVZed(WalStore):
 		rewrite_on_exit: If True, compact during :meth:`close`.
 		rewrite_interval: Seconds between automatic compact attempts.
 		append_check_delay: Background flush interval in seconds.
-		monitor_external_changes: Unused; retained for compatibility.
+		monitor_external_changes: If True, pick up other writers' appends
+			before each background flush (see :meth:`WalStore.refresh`).
+		external_check_interval: Seconds between external-change checks
+			while idle; ``None`` (the default) lets an idle store sleep.
 		verbose: Unused; retained for compatibility.
 		encoding: Text encoding for append I/O.
 		delimiter: Legacy delimiter argument.
 		defaults: Optional value-column defaults.
 		strict: Unused; retained for compatibility.
 		correctColumnNum: Unused; retained for compatibility.
+		checkpoint: Full-state checkpoint setting (see :class:`WalStore`).
+		keep_open: Keep the part open between flushes (see :class:`WalStore`).
+		fsync: Durability policy (see :class:`DurabilityPolicy`); ``None`` syncs
+			every flush.
+		datasync: If True, sync with ``os.fdatasync`` where available.
+		scheduler: Flush scheduler, or False for a dedicated thread (see
+			:class:`WalStore`).
+		max_batch_delay: Longest a queued row waits for a batch.
+		max_batch_size: Queued rows that trigger a flush at once.
+		max_pending_rows: Pending queue row limit (see :class:`WalStore`).
+		max_pending_bytes: Pending queue size limit.
+		backpressure: ``'block'``, ``'raise'``, or ``'sync'`` when the
+			pending queue is full.
+		coalesce: Write only the last queued row per key in each flush.
+		compact_ratio: Dead share of the part that load and interval
+			rewrites (and automatic compaction) wait for; ``None`` rewrites
+			on those triggers regardless.
+		compact_min_bytes: Smallest part those rewrites consider.
 	"""
 
 	def __init__(self, fileName, teeLogger=None, header='', createIfNotExist=True,
 				 verifyHeader=True, rewrite_on_load=False, rewrite_on_exit=False,
 				 rewrite_interval=0, append_check_delay=0.01, monitor_external_changes=True,
 				 verbose=False, encoding='utf8', delimiter=..., defaults=None,
-				 strict=False, correctColumnNum=-1):
-		_ = (verifyHeader, monitor_external_changes, verbose, strict, correctColumnNum)
+				 strict=False, correctColumnNum=-1, checkpoint=False, keep_open=False,
+				 fsync=None, datasync=True, scheduler=None, max_batch_delay=None,
+				 max_batch_size=4096, max_pending_rows=None, max_pending_bytes=None,
+				 backpressure='block', coalesce=False, compact_ratio=None,
+				 compact_min_bytes=DEFAULT_COMPACT_MIN_BYTES, external_check_interval=None):
+		_ = (verifyHeader, verbose, strict, correctColumnNum)
 		d = None if delimiter is ... else _legacy_delimiter(delimiter=delimiter, file_name=fileName)
 		self._fileName = fileName
 		self.teeLogger = teeLogger
@@ -2152,14 +5529,20 @@ class TSVZed(WalStore):
 		self.rewrite_on_exit = rewrite_on_exit
 		self.rewrite_interval = float(rewrite_interval or 0)
 		self._last_rewrite = time.monotonic()
-		self._rewriting = False
 		super().__init__(
 			fileName, header=header or None, create=createIfNotExist,
 			encoding=encoding, delimiter=d, defaults=defaults,
-			flush_interval=append_check_delay,
+			flush_interval=append_check_delay, checkpoint=checkpoint,
+			monitor_external_changes=monitor_external_changes, keep_open=keep_open,
+			fsync=fsync, datasync=datasync, scheduler=scheduler,
+			max_batch_delay=max_batch_delay, max_batch_size=max_batch_size,
+			max_pending_rows=max_pending_rows, max_pending_bytes=max_pending_bytes,
+			backpressure=backpressure, coalesce=coalesce, compact_ratio=compact_ratio,
+			compact_min_bytes=compact_min_bytes,
+			external_check_interval=external_check_interval,
 		)
 		self.appendQueue = self._pending
-		if self.rewrite_on_load and os.path.isfile(self.path):
+		if self.rewrite_on_load and os.path.isfile(self.path) and self._rewrite_wanted():
 			self.hardMapToFile()
 
 	def commitAppendToFile(self):
@@ -2210,49 +5593,51 @@ class TSVZed(WalStore):
 		return self.hardMapToFile()
 
 	def hardMapToFile(self):
-		"""Compact the part via :func:`snapshot_part` and refresh memory state.
+		"""Compact the part via :meth:`WalStore.compact` and refresh memory state.
 
 		Returns:
 			bool: True on success, or False if a rewrite is already in
 			progress.
 		"""
-		if self._rewriting:
-			return False
-		self._rewriting = True
-		try:
-			WalStore.flush(self)
-			data = snapshot_part(
-				self.path, encoding=self.encoding, delimiter=self.delimiter,
-				header=self.header or None,
-			)
+		return self.compact()
+
+	def compact(self):
+		done = WalStore.compact(self)
+		if done:
 			self._last_rewrite = time.monotonic()
-			prev = self._pending
-			self._pending = deque()
-			super(WalStore, self).clear()
-			if data:
-				self.update(data)
-				self._reader_state = getattr(data, '_reader_state', self._reader_state)
-			self._pending = prev
-			return True
-		finally:
-			self._rewriting = False
+		return done
 
 	mapToFile = hardMapToFile
 
 	def checkExternalChanges(self):
-		"""No-op retained for API compatibility.
+		"""Legacy alias for :meth:`WalStore.refresh` when monitoring is enabled.
 
 		Returns:
 			TSVZed: ``self``.
 		"""
+		if self.monitor_external_changes:
+			self.refresh()
 		return self
 
 	def flush(self):
 		WalStore.flush(self)
+		self._maybe_rewrite()
+		return self
+
+	def _after_batch(self, acks, error):
+		WalStore._after_batch(self, acks, error)
+		self._maybe_rewrite()
+
+	def _maybe_rewrite(self):
 		if (not self._rewriting and self.rewrite_interval > 0
 				and time.monotonic() - self._last_rewrite >= self.rewrite_interval):
-			self.hardMapToFile()
-		return self
+			if self._rewrite_wanted():
+				self.hardMapToFile()
+			else:
+				self._last_rewrite = time.monotonic()
+
+	def _rewrite_wanted(self):
+		return self.compact_ratio is None or self._compaction_due()
 
 	def close(self):
 		if self._shutdown.is_set():
@@ -2279,16 +5664,26 @@ class TSVZedLite(OffsetStore):
 		correctColumnNum: Unused; retained for compatibility.
 		indexes: Optional pre-built offset mapping.
 		fileObj: Optional open file object to adopt.
+		cache_size: Maximum number of cached rows (see :class:`OffsetStore`).
+		cache_bytes: Maximum summed field length of cached rows.
+		index: Sidecar index setting (see :class:`OffsetStore`).
+		index_every: Rewrite the sidecar after this many writes.
+		buffer_bytes: Write-buffer size (see :class:`OffsetStore`).
+		buffer_delay: Write-buffer delay in seconds.
 	"""
 
 	def __init__(self, fileName, header='', createIfNotExist=True, verifyHeader=True,
 				 verbose=False, encoding='utf8', delimiter=..., defaults=None,
-				 strict=True, correctColumnNum=-1, indexes=..., fileObj=...):
+				 strict=True, correctColumnNum=-1, indexes=..., fileObj=...,
+				 cache_size=None, cache_bytes=None, index=False, index_every=None,
+				 buffer_bytes=0, buffer_delay=1.0):
 		_ = (verifyHeader, verbose, strict, correctColumnNum)
 		d = None if delimiter is ... else _legacy_delimiter(delimiter=delimiter, file_name=fileName)
 		super().__init__(
 			fileName, header=header or None, create=createIfNotExist,
 			encoding=encoding, delimiter=d, defaults=defaults,
+			cache_size=cache_size, cache_bytes=cache_bytes, index=index,
+			index_every=index_every, buffer_bytes=buffer_bytes, buffer_delay=buffer_delay,
 		)
 		self._fileName = fileName
 		self.verifyHeader = verifyHeader
@@ -2302,9 +5697,10 @@ class TSVZedLite(OffsetStore):
 		if fileObj is not ...:
 			self._file.close()
 			self._file = fileObj
+			self._tail = None
 
 	def getListView(self):
-		return getListView(self._values, header=self.header, delimiter=self.delimiter)
+		return getListView(self, header=self.header, delimiter=self.delimiter)
 
 	def clear_file(self):
 		return self.clear()
@@ -2320,7 +5716,7 @@ class TSVZedLite(OffsetStore):
 		Returns:
 			TSVZedLite: ``self``, after switching.
 		"""
-		self._file.close()
+		self.close()
 		self.path = newFileName
 		self._fileName = newFileName
 		if createIfNotExist is not ...:
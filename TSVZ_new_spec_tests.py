@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Tests for TSVZ_new.py (tsvz-spec-v1.md core conformance)."""
 import gzip
+import io
 import os
 import tempfile
+import threading
+import time
 import unittest
 from collections import OrderedDict
+from unittest import mock
 
 import TSVZ_new as TSVZ
 
@@ -98,6 +102,19 @@ class TestEncoding(unittest.TestCase):
 	def test_format_data_row(self):
 		self.assertEqual(TSVZ.format_data_row(['k', 'a\tb'], '\t'), 'k\ta<sep>b')
 
+	def test_codec_rows(self):
+		codec = TSVZ.get_codec('|')
+		self.assertIs(codec, TSVZ.get_codec('|'))
+		row = ['#k', 'a|b', '<x>\n', '#v', None]
+		encoded = codec.encode_row(row)
+		self.assertEqual(encoded, ['<#>k', 'a<sep>b', '<lt>x><LF>', '#v', ''])
+		self.assertEqual(codec.decode_row(encoded), ['#k', 'a|b', '<x>\n', '#v', ''])
+		self.assertEqual(codec.decode_row(['<<sep>', '<lt', 'a<b>c<sep>']), ['<<sep>', '<lt', 'a<b>c|'])
+
+	def test_hash_delimiter_escapes_as_sep(self):
+		self.assertEqual(TSVZ.encode_field('#a', '#', is_key=True), '<sep>a')
+		self.assertEqual(TSVZ.decode_field('<sep>a', '#'), '#a')
+
 
 class TestClassification(unittest.TestCase):
 	def test_data_comment_marker(self):
@@ -172,6 +189,250 @@ class TestFraming(unittest.TestCase):
 		self.assertEqual(TSVZ.committed_payload(b'torn'), b'')
 
 
+class TestStreamingReplay(unittest.TestCase):
+	CONTENT = (
+		b'#_defaults_#\tguest\n#_fill_empty_with_default_#\ttrue\n'
+		b'alice\tAlice\t30\nbob\t\ncarol\tCarol\nalice\nbob\tBob\ndave\tDa'
+	)
+
+	def test_matches_replay_bytes_for_any_block_size(self):
+		expected, _ = replay(self.CONTENT)
+		for block_size in (1, 2, 7, 64, 1 << 20):
+			store, state = TSVZ.replay_stream(io.BytesIO(self.CONTENT), '\t', block_size=block_size)
+			rows = OrderedDict((k, list(v.row)) for k, v in store.items())
+			self.assertEqual(rows, expected)
+			self.assertEqual(state.defaults, ['guest'])
+			self.assertNotIn('dave', rows)
+
+	def test_offsets_are_absolute_across_blocks(self):
+		with TempFile(suffix='.tsv', content=self.CONTENT) as path:
+			idx, _ = TSVZ.replay_part(path, '\t', store_offset=True, block_size=5)
+			with open(path, 'rb') as f:
+				for key, off in idx.items():
+					f.seek(off)
+					self.assertTrue(f.readline().startswith(key.encode()))
+
+	def test_walstore_reopen_keeps_part(self):
+		with TempFile(suffix='.tsvz') as path:
+			TSVZ.append_records(path, [['a', '1'], ['b', '2']], create=True)
+			db = TSVZ.WalStore(path, flush_interval=0.001)
+			self.assertEqual(db['a'], ['a', '1'])
+			db.close()
+			self.assertEqual(dict(TSVZ.read_store(path)), {'a': ['a', '1'], 'b': ['b', '2']})
+
+
+class TestBatchedReplay(unittest.TestCase):
+	CONTENT = (
+		b'# comment\r\n#_strip_trailing_whites_#\tfalse\n'
+		b'a \tx \r\nb\ty<sep>z\n<#>c\t1\n\n'
+		b'#_strip_trailing_whites_#\ttrue\nd \t 2 \ne\tp<lt>q\t\nb\n'
+		b'#_defaults_#\tD\n#_fill_empty_with_default_#\ttrue\nf\t\ng \n'
+	)
+
+	def per_line(self, store_offset):
+		state, store, cache = TSVZ.ReaderState(), OrderedDict(), {}
+		pos = 0
+		for raw in self.CONTENT.split(b'\n')[:-1]:
+			line = raw.decode().rstrip('\r')
+			if line:
+				TSVZ.process_record(line, state, store, '\t', offset=pos,
+									store_offset=store_offset, values_cache=cache)
+			pos += len(raw) + 1
+		return store, cache
+
+	def test_matches_per_line_processing(self):
+		expected, _ = self.per_line(False)
+		store, _ = TSVZ.replay_bytes(self.CONTENT, '\t')
+		self.assertEqual([(k, v.row) for k, v in store.items()],
+						 [(k, v.row) for k, v in expected.items()])
+		self.assertEqual(store['a '].row, ['a ', 'x '])
+		self.assertEqual(store['d'].row, ['d', ' 2'])
+		self.assertEqual(store['f'].row, ['f', 'D'])
+
+	def test_offsets_match_per_line_processing(self):
+		expected, expected_cache = self.per_line(True)
+		cache = {}
+		store, _ = TSVZ.replay_bytes(self.CONTENT, '\t', store_offset=True, values_cache=cache)
+		self.assertEqual(list(store.items()), list(expected.items()))
+		self.assertEqual(cache, expected_cache)
+
+	def test_index_only_matches_per_line_processing(self):
+		expected, _ = self.per_line(True)
+		for block_size in (3, 1 << 20):
+			store, state = TSVZ.replay_stream(
+				io.BytesIO(self.CONTENT), '\t', store_offset=True, block_size=block_size,
+			)
+			self.assertEqual(list(store.items()), list(expected.items()))
+			self.assertEqual(state.defaults, ['D'])
+
+
+class TestMmapReplay(unittest.TestCase):
+	CONTENT = TestStreamingReplay.CONTENT
+
+	def test_mmap_matches_streaming(self):
+		with TempFile(suffix='.tsv', content=self.CONTENT) as path:
+			streamed, _ = TSVZ.replay_part(path, '\t', store_offset=True)
+			mapped, state = TSVZ.replay_part(path, '\t', store_offset=True, use_mmap=True)
+			self.assertEqual(mapped, streamed)
+			self.assertEqual(state.defaults, ['guest'])
+			self.assertEqual(TSVZ.read_last_record(path), ['bob', 'Bob'])
+			self.assertEqual(TSVZ.read_last_record(path, use_mmap=False), ['bob', 'Bob'])
+
+	def test_empty_and_compressed_parts(self):
+		with TempFile(suffix='.tsv', content=b'') as path:
+			store, _ = TSVZ.replay_part(path, '\t', use_mmap=True)
+			self.assertEqual(store, OrderedDict())
+			self.assertEqual(TSVZ.read_last_record(path, store_offset=True), -1)
+		with TempFile(suffix='.tsv.gz', content=gzip.compress(self.CONTENT)) as path:
+			self.assertEqual(dict(TSVZ.read_store(path, use_mmap=True)), dict(replay(self.CONTENT)[0]))
+
+
+class TestParallelReplay(unittest.TestCase):
+	CONTENT = (
+		b'#_defaults_#\tguest\n'
+		+ b''.join(b'k%d\tv%d\n' % (i % 40, i) for i in range(200))
+		+ b'#_fill_empty_with_default_#\ttrue\n'
+		+ b''.join(b'k%d\n' % i for i in range(0, 40, 3))
+		+ b''.join(b'k%d\t\n' % i for i in range(0, 40, 6))
+		+ b'#_defaults_#\tother\nk7\t\ntorn'
+	)
+
+	def test_matches_sequential(self):
+		expected, expected_state = replay(self.CONTENT)
+		for suffix, content in (('.tsv', self.CONTENT), ('.tsv.gz', gzip.compress(self.CONTENT))):
+			with TempFile(suffix=suffix, content=content) as path:
+				store, state = TSVZ.replay_part_parallel(path, '\t', workers=4, min_chunk_size=64)
+				rows = OrderedDict((k, list(v.row)) for k, v in store.items())
+				self.assertEqual(list(rows.items()), list(expected.items()))
+				self.assertEqual(state.defaults, expected_state.defaults)
+
+	def test_offsets_and_values_cache(self):
+		with TempFile(suffix='.tsv', content=self.CONTENT) as path:
+			seq_cache, par_cache = {}, {}
+			seq, _ = TSVZ.replay_part(path, '\t', store_offset=True, values_cache=seq_cache)
+			par, _ = TSVZ.replay_part_parallel(
+				path, '\t', store_offset=True, values_cache=par_cache, workers=3, min_chunk_size=64,
+			)
+			self.assertEqual(list(par.items()), list(seq.items()))
+			self.assertEqual(par_cache, seq_cache)
+
+	def test_workers_are_not_forked(self):
+		with TempFile(suffix='.tsv', content=self.CONTENT) as path, \
+				mock.patch.object(TSVZ, 'ProcessPoolExecutor', wraps=TSVZ.ProcessPoolExecutor) as pool:
+			TSVZ.replay_part_parallel(path, '\t', workers=2, min_chunk_size=64)
+			TSVZ.replay_parts([path, path], '\t', workers=2)
+			self.assertEqual(pool.call_count, 2)
+			for call in pool.call_args_list:
+				self.assertNotEqual(call.kwargs['mp_context'].get_start_method(), 'fork')
+
+
+class TestMultiPart(unittest.TestCase):
+	def setUp(self):
+		self.dir = tempfile.mkdtemp()
+		self.path = os.path.join(self.dir, 'db.csvz')
+
+	def tearDown(self):
+		import shutil
+		shutil.rmtree(self.dir)
+
+	def write(self, name, content):
+		with open(os.path.join(self.dir, name), 'wb') as f:
+			f.write(content)
+
+	def test_parts_replay_in_ordinal_order_with_markers_across_parts(self):
+		content = TestParallelReplay.CONTENT.replace(b'\t', b',')
+		lines = content.splitlines(keepends=True)
+		third = len(lines) // 3
+		self.write('db.csvz.f', b''.join(lines[:third]))
+		self.write('db.csvz.10.gz', gzip.compress(b''.join(lines[third:2 * third])))
+		self.write('db.csvz.0a0', b''.join(lines[2 * third:]))
+		self.write('db.csvz.11.rotated', b'k1,rotated\n')
+		self.write('db.csvz.12.idx', b'k1,sidecar\n')
+		parts = TSVZ.discover_parts(self.path)
+		self.assertEqual([os.path.basename(p) for p in parts], ['db.csvz.f', 'db.csvz.10.gz', 'db.csvz.0a0'])
+		expected, expected_state = replay(content, ',')
+		for workers in (1, 3):
+			store, state = TSVZ.replay_parts(parts, ',', workers=workers)
+			self.assertEqual([(k, list(v.row)) for k, v in store.items()], list(expected.items()))
+			self.assertEqual((state.defaults, state.fill_empty), (expected_state.defaults, expected_state.fill_empty))
+		self.assertEqual(TSVZ.read_store(self.path, multipart=True, workers=2), expected)
+
+	def test_store_writes_to_a_fresh_active_part(self):
+		self.write('db.csvz', b'a,1\nb,2\n')
+		with TSVZ.MultiPartStore(self.path, flush_interval=0.001) as db:
+			active = db.path
+			self.assertEqual(db.parts, [self.path])
+			self.assertEqual(os.path.basename(active)[:8], 'db.csvz.')
+			self.assertEqual(db.delimiter, ',')
+			db['a'] = ['9']
+			db.clear()
+			db['c'] = ['3']
+		with open(self.path, 'rb') as f:
+			self.assertEqual(f.read(), b'a,1\nb,2\n')
+		self.assertEqual(TSVZ.discover_parts(self.path), [self.path, active])
+		self.assertEqual(dict(TSVZ.read_store(self.path, multipart=True)), {'c': ['c', '3']})
+		with TSVZ.MultiPartStore(self.path) as db:
+			self.assertGreater(db.path, active)
+			self.assertEqual(dict(db), {'c': ['c', '3']})
+		self.assertEqual(TSVZ.discover_parts(self.path), [self.path, active])
+
+	def test_background_snapshot_slots_between_prefix_and_active_part(self):
+		self.write('db.csvz', b'#_defaults_#,d\na,1\n')
+		with TSVZ.MultiPartStore(self.path, rotate='rename') as db:
+			for i in range(50):
+				db[str(i % 5)] = [str(i)]
+			db.flush()
+			prefix = [*db.parts, db.path]
+			future = db.compact()
+			self.assertFalse(db.compact())  # one snapshot at a time
+			db['late'] = ['x']
+			active = db.path
+			snap = future.result(timeout=60)
+			prefix_ord, snap_ord, active_ord = (int(p.rsplit('.', 1)[1], 16) for p in (prefix[-1], snap, active))
+			self.assertTrue(prefix_ord < snap_ord < active_ord)
+			self.assertEqual(db['a'], ['a', '1'])
+		self.assertEqual(TSVZ.discover_parts(self.path), [snap, active])
+		self.assertTrue(all(os.path.exists(p + '.rotated') for p in prefix))
+		with open(snap) as f:
+			self.assertEqual(f.read().splitlines()[:2], ['#_version_#,1', '#_defaults_#,d'])
+		expected = {'a': ['a', '1'], **{str(i): [str(i), str(45 + i)] for i in range(5)}, 'late': ['late', 'x']}
+		self.assertEqual(dict(TSVZ.read_store(self.path, multipart=True)), expected)
+
+	def test_snapshot_keeps_marker_state_for_later_parts(self):
+		prefix = (b'#_defaults_#,D\n#_fill_empty_with_default_#,true\n'
+				  b'#_strip_trailing_whites_#,false\na,1 \n#_strip_trailing_whites_#,true\n')
+		later = b'e,\nf,2 \n'
+		copy = os.path.join(self.dir, 'copy.csvz')
+		self.write('copy.csvz', prefix + later)
+		self.write('db.csvz', prefix)
+		db = TSVZ.MultiPartStore(self.path, rotate='delete')
+		db.compact().result(timeout=60)
+		with db._compacting:
+			pass
+		db.close()
+		with open(TSVZ.part_path(self.path, TSVZ.new_part_ordinal()), 'wb') as f:
+			f.write(later)
+		self.assertEqual(len(TSVZ.discover_parts(self.path)), 2)
+		expected = TSVZ.read_store(copy)
+		self.assertEqual(expected['e'], ['e', 'D'])
+		self.assertEqual(dict(TSVZ.read_store(self.path, multipart=True)), dict(expected))
+
+	def test_snapshots_share_one_non_forking_worker(self):
+		db = TSVZ.MultiPartStore(self.path, rotate='delete')
+		pools = []
+		for n in range(2):
+			db[str(n)] = ['v']
+			db.flush()
+			db.compact().result(timeout=60)
+			with db._compacting:  # released by the done-callback, just after the result
+				pools.append(db._pool)
+		self.assertIs(pools[0], pools[1])
+		self.assertNotEqual(pools[0]._mp_context.get_start_method(), 'fork')
+		db.close()
+		self.assertIsNone(db._pool)
+		self.assertEqual(dict(TSVZ.read_store(self.path, multipart=True)), {'0': ['0', 'v'], '1': ['1', 'v']})
+
+
 class TestHeaderComment(unittest.TestCase):
 	def test_format_and_decode(self):
 		line = TSVZ.format_header_comment(['id', 'name'], '\t')
@@ -262,6 +523,24 @@ class TestSnapshot(unittest.TestCase):
 			with open(path) as f:
 				self.assertIn('#_version_#', f.read())
 
+	def test_snapshot_replaces_the_part_atomically_and_keeps_whitespace(self):
+		content = '#_strip_trailing_whites_#\tfalse\na\tx  \n#_strip_trailing_whites_#\ttrue\na\tx  \nb\ty \nb\n'
+		with TempFile(suffix='.tsv', content=content) as path:
+			expected = dict(TSVZ.read_store(path))
+			replace = os.replace
+			seen = []
+
+			def check_replace(src, dst):
+				with open(dst) as f:
+					seen.append(f.read())
+				replace(src, dst)
+
+			with mock.patch.object(TSVZ.os, 'replace', side_effect=check_replace):
+				TSVZ.snapshot_part(path)
+			self.assertEqual(seen, [content])
+			self.assertEqual(dict(TSVZ.read_store(path)), expected)
+			self.assertEqual(os.listdir(os.path.dirname(path)).count(os.path.basename(path)), 1)
+
 
 class TestDelimiterVariants(unittest.TestCase):
 	def test_csv_psv_nsv(self):
@@ -326,6 +605,555 @@ class TestWalStore(unittest.TestCase):
 			db.close()
 			self.assertIn('k\n', open(path).read() or 'k')
 
+	def test_refresh_replays_only_appended_tail(self):
+		with TempFile(suffix='.tsv') as path:
+			db = self._store(path)
+			db['a'] = ['a', '1']
+			db.flush()
+			self.assertEqual(db._watermark.compare(path), 'same')
+			with open(path, 'ab') as f:
+				f.write(b'#_defaults_#\tD\n#_fill_empty_with_default_#\ttrue\nb\t\na\n')
+			db['c'] = ['c', 'local']  # pending, not yet flushed
+			with mock.patch.object(TSVZ, 'read_store', wraps=TSVZ.read_store) as full:
+				db.refresh()
+				self.assertFalse(full.called)
+			self.assertEqual(dict(db), {'b': ['b', 'D'], 'c': ['c', 'local']})
+			db.close()
+			self.assertEqual(dict(TSVZ.read_store(path)), dict(db))
+
+	def test_refresh_reloads_rewritten_part(self):
+		with TempFile(suffix='.tsv') as path:
+			db = self._store(path)
+			db['a'] = ['a', '1']
+			db['b'] = ['b', '2']
+			db.flush()
+			with open(path, 'wb') as f:
+				f.write(b'z\t9\nb\t2\nmore\t3\n')
+			with mock.patch.object(TSVZ, 'read_store', wraps=TSVZ.read_store) as full:
+				db.refresh()
+				self.assertTrue(full.called)
+			self.assertEqual(dict(db), {'z': ['z', '9'], 'b': ['b', '2'], 'more': ['more', '3']})
+			db.close()
+
+
+class TestFlushWorker(unittest.TestCase):
+	def test_idle_worker_sleeps_until_signalled(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, flush_interval=0.001, scheduler=False)
+			with mock.patch.object(TSVZ.WalStore, '_write_batch', autospec=True, side_effect=TSVZ.WalStore._write_batch) as written:
+				time.sleep(0.05)
+				self.assertTrue(db._worker_idle)
+				self.assertEqual(written.call_count, 0)
+				db['a'] = ['1']
+				deadline = time.monotonic() + 5
+				while os.path.getsize(path) == 0 and time.monotonic() < deadline:
+					time.sleep(0.001)
+				self.assertEqual(open(path).read(), 'a\t1\n')
+			db.close()
+
+	def test_monitoring_store_does_not_poll_while_idle(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.TSVZed(path, scheduler=False)
+			self.assertTrue(db.monitor_external_changes)
+			self.assertIsNone(db._idle_timeout())
+			with mock.patch.object(TSVZ.WalStore, 'refresh', autospec=True) as refreshed:
+				time.sleep(0.05)
+				self.assertEqual(refreshed.call_count, 0)
+			db.close()
+
+	def test_external_check_interval_polls_while_idle(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.TSVZed(path, scheduler=False, external_check_interval=0.005)
+			with open(path, 'a') as f:
+				f.write('a\t1\n')
+			deadline = time.monotonic() + 5
+			while 'a' not in db and time.monotonic() < deadline:
+				time.sleep(0.001)
+			self.assertEqual(db['a'], ['a', '1'])
+			db.close()
+
+	def test_full_batch_flushes_before_delay(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, max_batch_delay=60, max_batch_size=10)
+			acks = [db.put(str(i), ['v'], ack='disk') for i in range(10)]
+			self.assertTrue(acks[-1].wait(timeout=5))
+			self.assertEqual(len(TSVZ.read_store(path)), 10)
+			start = time.monotonic()
+			db.close()
+			self.assertLess(time.monotonic() - start, 5)
+
+
+class TestFlushScheduler(unittest.TestCase):
+	def test_many_stores_share_the_pool_threads(self):
+		pool = TSVZ.FlushScheduler(workers=2)
+		with TempFile(suffix='.tsv') as p1, TempFile(suffix='.tsv') as p2, TempFile(suffix='.tsv') as p3:
+			threads = threading.active_count()
+			stores = [TSVZ.WalStore(p, scheduler=pool, flush_interval=0.001) for p in (p1, p2, p3)]
+			acks = [db.put('k', [str(i)], ack='disk') for i, db in enumerate(stores)]
+			for ack in acks:
+				self.assertTrue(ack.wait(timeout=5))
+			self.assertLessEqual(threading.active_count(), threads + 2)
+			self.assertEqual(len(pool), 3)
+			self.assertEqual(TSVZ.read_store(p3)['k'], ['k', '2'])
+			pool.shutdown()
+			self.assertEqual(len(pool), 0)
+			self.assertTrue(all(db._shutdown.is_set() for db in stores))
+
+	def test_pass_writes_a_device_group_before_syncing_it(self):
+		pool = TSVZ.FlushScheduler(workers=1)
+		with TempFile(suffix='.tsv') as p1, TempFile(suffix='.tsv') as p2:
+			a = TSVZ.WalStore(p1, scheduler=pool, max_batch_delay=60)
+			b = TSVZ.WalStore(p2, scheduler=pool, max_batch_delay=60)
+			for i in range(5):
+				a[str(i)] = ['v']
+			b['x'] = ['v']
+			a.max_batch_size = 2  # only now, so nothing is due before the pass below
+			calls = []
+			write_batch, sync = TSVZ.WalStore._write_batch, TSVZ.WalStore.sync
+			sync_fs = TSVZ._sync_file_system
+			with mock.patch.object(TSVZ.WalStore, '_write_batch', autospec=True,
+								   side_effect=lambda db, *args: calls.append(('write', db.path)) or write_batch(db, *args)), \
+					mock.patch.object(TSVZ.WalStore, 'sync', autospec=True,
+									  side_effect=lambda db: calls.append(('sync', db.path)) or sync(db)), \
+					mock.patch.object(TSVZ, '_sync_file_system',
+									  side_effect=lambda path: calls.append(('syncfs', path)) or sync_fs(path)):
+				pool._run([a, b])
+			if TSVZ._syncfs is None:
+				self.assertEqual(calls, [('write', p1), ('write', p2), ('sync', p1), ('sync', p2)])
+			else:  # both stores owed a sync: one syncfs covers them
+				self.assertEqual(calls, [('write', p1), ('write', p2), ('syncfs', p1)])
+			self.assertEqual((a.durability.unsynced, b.durability.unsynced), (0, 0))
+			# a pass writes at most max_batch_size rows of a store
+			self.assertEqual(len(TSVZ.read_store(p1)), 2)
+			self.assertEqual(len(a._pending), 3)
+			pool.shutdown()
+			self.assertEqual(len(TSVZ.read_store(p1)), 5)
+
+
+class TestBackpressure(unittest.TestCase):
+	def test_raise_leaves_store_unchanged_and_sync_writes_inline(self):
+		pool = TSVZ.FlushScheduler(workers=1)
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, scheduler=pool, max_batch_delay=60,
+							   max_pending_rows=2, backpressure='raise')
+			db['a'] = ['1']
+			db['b'] = ['22']
+			self.assertEqual((db.pending_rows, db.pending_bytes), (2, 9))
+			with self.assertRaises(TSVZ.queue.Full):
+				db['c'] = ['3']
+			self.assertNotIn('c', db)
+			db.flush()
+			self.assertEqual((db.pending_rows, db.pending_bytes), (0, 0))
+			db.backpressure = 'sync'
+			db['c'] = ['3']
+			db['d'] = ['4']
+			db['e'] = ['5']  # queue full: written by this call
+			self.assertEqual(db.pending_rows, 0)
+			self.assertEqual(list(TSVZ.read_store(path)), ['a', 'b', 'c', 'd', 'e'])
+			pool.shutdown()
+
+	def test_block_waits_for_the_flusher(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, max_batch_delay=60, max_pending_bytes=64)
+			peak = 0
+			for i in range(100):
+				db[str(i)] = ['x' * 10]
+				peak = max(peak, db.pending_bytes)
+			self.assertLessEqual(peak, 64)
+			db.close()
+			self.assertEqual(len(TSVZ.read_store(path)), 100)
+		with self.assertRaises(ValueError):
+			TSVZ.WalStore(path, backpressure='drop')
+
+
+class TestCoalesce(unittest.TestCase):
+	def test_flush_writes_last_entry_per_key(self):
+		pool = TSVZ.FlushScheduler(workers=1)
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, scheduler=pool, max_batch_delay=60, coalesce=True)
+			for i in range(100):
+				db['a'] = [str(i)]
+			db['b'] = ['x']
+			db['#_defaults_#'] = ['d']
+			db['b'] = ['y']
+			del db['b']
+			db.flush()
+			self.assertEqual(db.coalesced_rows, 99)
+			with open(path) as f:
+				self.assertEqual(f.read(), 'a\t99\nb\tx\n#_defaults_#\td\nb\ty\nb\n')
+			pool.shutdown()
+
+	def test_replay_order_matches_store_after_coalesced_batch(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, scheduler=False, max_batch_delay=60, coalesce=True)
+			db['a'] = ['1']
+			db['b'] = ['1']
+			db['a'] = ['2']
+			db['c'] = ['1']
+			del db['c']
+			db['c'] = ['2']
+			db['d'] = ['1']
+			db['c'] = ['3']
+			db.flush()
+			self.assertEqual(db.coalesced_rows, 2)
+			expected = [(k, list(v)) for k, v in db.items()]
+			db.close()
+			self.assertEqual(list(TSVZ.read_store(path).items()), expected)
+			self.assertEqual([k for k, _ in expected], ['a', 'b', 'c', 'd'])
+
+	def test_legacy_coalesce_keeps_first_slot(self):
+		import TSVZ as legacy
+		lines = [['a', '1'], ['b', '1'], ['a', '2'], ['c', '1'], ['c', ''], ['c', '2'], ['c', '3']]
+		self.assertEqual(legacy._coalesceLines(lines),
+						 [['a', '2'], ['b', '1'], ['c', '1'], ['c', ''], ['c', '3']])
+
+	def test_legacy_wrapper_passes_queue_options(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.TSVZed(path, coalesce=True, max_pending_rows=10, backpressure='sync',
+							 scheduler=False, monitor_external_changes=False)
+			for i in range(25):
+				db['k'] = [str(i)]
+			self.assertLessEqual(db.pending_rows, 10)
+			db.close()
+			self.assertGreater(db.coalesced_rows, 0)
+			self.assertEqual(TSVZ.read_store(path)['k'], ['k', '24'])
+
+
+class TestSkipNoopWrites(unittest.TestCase):
+	def test_walstore_skips_rows_it_already_holds(self):
+		with TempFile(suffix='.tsv') as path:
+			with TSVZ.WalStore(path, flush_interval=0.001) as db:
+				db['a'] = ['1']
+				db['a'] = ['a', '1']
+				db['b'] = ['2']
+				self.assertEqual(db.skipped_writes, 1)
+			with TSVZ.WalStore(path, flush_interval=0.001) as db:
+				db['a'] = ['1']  # replayed row
+				db['b'] = ['3']
+				self.assertEqual(db.skipped_writes, 1)
+			with open(path) as f:
+				self.assertEqual(f.read(), 'a\t1\nb\t2\nb\t3\n')
+
+	def test_offset_store_checks_only_cached_rows(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.OffsetStore(path, cache_size=1)
+			db['a'] = ['1']
+			db['b'] = ['2']  # evicts 'a' from the cache
+			size = os.path.getsize(path)
+			with mock.patch.object(TSVZ.OffsetStore, '_read_at', autospec=True) as read_at:
+				db['b'] = ['2']  # cached: skipped
+				db['a'] = ['1']  # not cached: written again, without reading it back
+				self.assertFalse(read_at.called)
+			self.assertEqual((db.skipped_writes, os.path.getsize(path)), (1, size + 4))
+			self.assertEqual(len(db._values), 1)
+			db['a'] = ['9']
+			self.assertEqual(db['a'], ['a', '9'])
+			del db['a']
+			db['a'] = ['9']
+			self.assertEqual(db.skipped_writes, 1)
+			db.close()
+			self.assertEqual(dict(TSVZ.read_store(path)), {'b': ['b', '2'], 'a': ['a', '9']})
+
+
+class TestPutMany(unittest.TestCase):
+	def test_walstore_queues_encoded_chunks_in_order(self):
+		with TempFile(suffix='.tsv') as path:
+			with TSVZ.WalStore(path, flush_interval=0.001, max_batch_size=2) as db:
+				db['a'] = ['1']
+				handle = db.put_many([['a', '1'], ['b', '2'], 'c\t3', ['#_defaults_#', 'x', 'y'], ['c'], ['zz']], ack='disk')
+				self.assertTrue(handle.wait(timeout=5))
+				self.assertEqual(db.skipped_writes, 1)
+				self.assertEqual(dict(db), {'a': ['a', '1'], 'b': ['b', '2']})
+				db.update_many({'d': ['4'], 'e': ['e', '5']})
+				self.assertEqual(db['d'], ['d', '4'])
+			with open(path) as f:
+				self.assertEqual(f.read(), 'a\t1\nb\t2\nc\t3\n#_defaults_#\tx\ty\nc\nd\t4\ne\t5\n')
+			self.assertEqual(dict(TSVZ.read_store(path)),
+							 {'a': ['a', '1'], 'b': ['b', '2'], 'd': ['d', '4'], 'e': ['e', '5']})
+
+	def test_offset_store_writes_batch_once(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.OffsetStore(path, cache_size=1, buffer_bytes=0)
+			db['a'] = ['1']
+			with mock.patch.object(db, '_file', wraps=db._file) as handle:
+				db.update_many([('a', ['1']), ('b', ['2']), ('c', ['3']), ('b', ['b', '4']), ('c', [])])
+				self.assertEqual(handle.write.call_count, 1)
+			self.assertEqual(db.skipped_writes, 1)
+			self.assertEqual((db['a'], db['b']), (['a', '1'], ['b', '4']))
+			self.assertNotIn('c', db)
+			db.close()
+			self.assertEqual(dict(TSVZ.read_store(path)), {'a': ['a', '1'], 'b': ['b', '4']})
+
+
+class TestOffsetStoreWriteBuffer(unittest.TestCase):
+	def test_buffered_rows_are_read_from_the_buffer(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.OffsetStore(path, cache_size=1, buffer_bytes=1 << 20, buffer_delay=60)
+			db['a'] = ['1']
+			db.flush()
+			with mock.patch.object(db, '_file', wraps=db._file) as handle:
+				for i in range(100):
+					db[str(i)] = [str(i), 'x' * i]
+				self.assertEqual((db['7'], db['99']), (['7', 'x' * 7], ['99', 'x' * 99]))
+				self.assertFalse(handle.seek.called or handle.tell.called or handle.write.called)
+			self.assertEqual(db['a'], ['a', '1'])
+			self.assertEqual(os.path.getsize(path), 4)
+			db.flush()
+			self.assertEqual(dict(db.items()), dict(TSVZ.read_store(path)))
+			self.assertEqual(db['50'], ['50', 'x' * 50])
+			db.close()
+
+	def test_buffer_written_on_size_delay_and_close(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.OffsetStore(path, buffer_bytes=16, buffer_delay=60)
+			db['a'] = ['1']
+			self.assertEqual(os.path.getsize(path), 0)
+			db['b'] = ['2' * 12]
+			self.assertEqual(os.path.getsize(path), 19)
+			db.buffer_delay = 0
+			db['c'] = ['3']
+			self.assertEqual(os.path.getsize(path), 23)
+			db.buffer_delay = 60
+			del db['a']
+			db.close()
+			self.assertEqual(dict(TSVZ.read_store(path)), {'b': ['b', '2' * 12], 'c': ['c', '3']})
+
+	def test_writes_go_through_by_default(self):
+		import TSVZ as legacy
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.OffsetStore(path)
+			db['a'] = ['1']
+			self.assertEqual(os.path.getsize(path), 4)
+			db.close()
+		with TempFile(suffix='.tsv') as path:
+			db = legacy.TSVZedLite(path)
+			db['a'] = ['a', '1']
+			self.assertEqual(os.path.getsize(path), 4)
+			db.close()
+
+
+class TestDeadRatioCompaction(unittest.TestCase):
+	def test_walstore_tracks_dead_bytes_and_compacts(self):
+		with TempFile(suffix='.tsv') as path:
+			with TSVZ.WalStore(path, flush_interval=0.001, scheduler=False) as db:
+				for i in range(10):
+					db[str(i)] = ['v' * 8]
+				db.flush()
+				self.assertEqual((db.part_bytes, db.live_bytes), (os.path.getsize(path),) * 2)
+				self.assertEqual(db.dead_ratio, 0)
+				for i in range(5):
+					db[str(i)] = ['w' * 8]
+				del db['9']
+				db.flush()
+				self.assertEqual(db.part_bytes, os.path.getsize(path))
+				self.assertAlmostEqual(db.dead_ratio, 1 - 99 / 167)
+			with TSVZ.WalStore(path, scheduler=False, compact_ratio=0.5, compact_min_bytes=0) as db:
+				self.assertAlmostEqual(db.dead_ratio, 1 - 99 / 167)
+				for i in range(5, 9):
+					db[str(i)] = ['x' * 8]
+				db.flush()
+				self.assertLess(db.dead_ratio, 0.5)
+				self.assertLess(db.part_bytes, 16 * 11)
+			self.assertEqual(dict(TSVZ.read_store(path)),
+							 {**{str(i): [str(i), 'w' * 8] for i in range(5)},
+							  **{str(i): [str(i), 'x' * 8] for i in range(5, 9)}})
+
+	def test_automatic_compaction_under_concurrent_writers(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, flush_interval=0.0005, max_batch_size=64, scheduler=False,
+							   compact_ratio=0.5, compact_min_bytes=0)
+			missing = []
+			done = threading.Event()
+
+			def write(n):
+				for i in range(3000):
+					db[f'{n}-{i % 50}'] = [str(i)]
+
+			def read():
+				while not done.is_set():
+					missing.extend(f'0-{i}' for i in range(50) if f'0-{i}' not in db)
+
+			with mock.patch.object(TSVZ, '_replace_part', wraps=TSVZ._replace_part) as rewrites:
+				for i in range(50):
+					db[f'0-{i}'] = ['seed']
+				reader = threading.Thread(target=read)
+				writers = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+				reader.start()
+				for t in writers:
+					t.start()
+				for t in writers:
+					t.join()
+				done.set()
+				reader.join()
+				expected = {k: list(v) for k, v in db.items()}
+				db.close()
+				self.assertGreater(rewrites.call_count, 0)
+			self.assertEqual(missing, [])
+			self.assertEqual(len(expected), 200)
+			self.assertEqual(dict(TSVZ.read_store(path)), expected)
+
+	def test_tsvzed_rewrites_on_load_only_past_the_ratio(self):
+		with TempFile(suffix='.tsv') as path:
+			TSVZ.append_records(path, [[str(i), 'v'] for i in range(10)])
+			with mock.patch.object(TSVZ, '_replace_part', wraps=TSVZ._replace_part) as snap:
+				db = TSVZ.TSVZed(path, rewrite_on_load=True, compact_ratio=0.5, compact_min_bytes=0)
+				db.close()
+				self.assertFalse(snap.called)
+				TSVZ.append_records(path, [[str(i), 'w'] for i in range(10)] + [['0']])
+				db = TSVZ.TSVZed(path, rewrite_on_load=True, compact_ratio=0.5, compact_min_bytes=0)
+				self.assertEqual(snap.call_count, 1)
+				self.assertLess(db.dead_ratio, 0.5)
+				db.close()
+			self.assertEqual(dict(TSVZ.read_store(path)), {str(i): [str(i), 'w'] for i in range(1, 10)})
+
+
+	def test_legacy_replay_does_not_count_skipped_writes(self):
+		import TSVZ as legacy
+		with TempFile(suffix='.tsv', content='a\t1\na\t1\nb\t2\n') as path:
+			db = legacy.TSVZed(path, rewrite_on_load=False)
+			self.assertEqual((db.skippedWrites, db.fileBytes, db.liveBytes), (0, 12, 8))
+			db['a'] = ['a', '1']
+			self.assertEqual((db.skippedWrites, db.fileBytes, db.liveBytes), (1, 12, 8))
+			db.close()
+
+
+class TestKeepOpen(unittest.TestCase):
+	def test_flushes_reuse_one_handle(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, flush_interval=0.001, keep_open=True)
+			db['a'] = ['a', '1']
+			db.flush()
+			handle = db._handle
+			with mock.patch.object(TSVZ, 'open_part', wraps=TSVZ.open_part) as opened:
+				db['b'] = ['b', '2']
+				db.flush()
+				self.assertFalse(opened.called)
+			self.assertIs(db._handle, handle)
+			self.assertFalse(handle.closed)
+			db.close()
+			self.assertTrue(handle.closed)
+			self.assertEqual(dict(TSVZ.read_store(path)), {'a': ['a', '1'], 'b': ['b', '2']})
+
+	def test_reopens_replaced_part_and_after_fork(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, flush_interval=0.001, keep_open=True)
+			db['a'] = ['a', '1']
+			db.flush()
+			with open(path + '.new', 'wb') as f:
+				f.write(b'z\t0\n')
+			os.replace(path + '.new', path)
+			db['b'] = ['b', '2']
+			db.flush()
+			self.assertEqual(open(path).read(), 'z\t0\nb\t2\n')
+			handle = db._handle
+			TSVZ._drop_kept_handles()  # what a forked child runs
+			self.assertTrue(handle.closed)
+			self.assertIsNone(db._handle)
+			db['c'] = ['c', '3']
+			db.close()
+			self.assertEqual(open(path).read(), 'z\t0\nb\t2\nc\t3\n')
+
+
+class TestDurability(unittest.TestCase):
+	def test_policies_group_syncs(self):
+		with TempFile(suffix='.tsv') as path:
+			with mock.patch.object(TSVZ, '_sync_fd') as synced:
+				db = TSVZ.WalStore(path, flush_interval=0.001, fsync='always')
+				for i in range(3):
+					db[str(i)] = ['v']
+					db.flush()
+				db.close()
+				always = synced.call_count
+				db = TSVZ.WalStore(path, flush_interval=0.001, fsync='bytes:1000000')
+				synced.reset_mock()
+				for i in range(3):
+					db[str(i)] = ['w']
+					db.flush()
+				self.assertEqual(synced.call_count, 0)
+				self.assertGreater(db.durability.unsynced, 0)
+				db.close()
+				self.assertEqual(synced.call_count, 1)
+			self.assertGreaterEqual(always, 3)
+			self.assertEqual(TSVZ.read_store(path)['2'], ['2', 'w'])
+
+	def test_write_ack_marker_does_not_relax_default_policy(self):
+		with TempFile(suffix='.tsv', content='#_write_ack_#\tDISK\na\t1\n') as path:
+			db = TSVZ.WalStore(path, flush_interval=0.001)
+			self.assertEqual(str(db.durability), 'always')
+			db.set_durability('interval:50', persist=True)
+			db.close()
+			TSVZ.snapshot_part(path)
+			self.assertIn('#_write_ack_#\tmemory\n', open(path).read())
+			db = TSVZ.WalStore(path, flush_interval=0.001)
+			self.assertEqual(str(db.durability), 'always')
+			self.assertEqual(db.put('b', ['b', '2']).level, 'memory')
+			self.assertEqual(dict(db), {'a': ['a', '1'], 'b': ['b', '2']})
+			db.close()
+			db = TSVZ.WalStore(path, flush_interval=0.001, fsync='memory')
+			self.assertEqual(str(db.durability), 'interval:1000')
+			db.close()
+			with self.assertRaises(ValueError):
+				TSVZ.DurabilityPolicy('bytes:-1')
+
+
+class TestWriteAck(unittest.TestCase):
+	def test_disk_ack_waits_for_sync_under_any_policy(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, flush_interval=0.001, fsync='never')
+			with mock.patch.object(TSVZ, '_sync_fd') as synced:
+				memory = db.put('a', ['1'])
+				self.assertTrue(memory.done())
+				acks = [db.put(str(i), ['v'], ack='disk') for i in range(50)]
+				for ack in acks:
+					self.assertTrue(ack.wait(timeout=5))
+				self.assertGreaterEqual(synced.call_count, 1)
+				self.assertLessEqual(synced.call_count, len(acks))
+			db.close()
+			self.assertEqual(len(TSVZ.read_store(path)), 51)
+			with self.assertRaises(ValueError):
+				db.put('b', ['2'], ack='eventually')
+
+	def test_failed_write_fails_ack(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, flush_interval=0.001)
+			with mock.patch.object(TSVZ.WalStore, '_open_locked', side_effect=OSError('disk full')):
+				ack = db.put('a', ['1'], ack='disk')
+				with self.assertRaises(OSError):
+					ack.wait(timeout=5)
+			db.close()
+
+
+class TestCheckpoint(unittest.TestCase):
+	def test_walstore_resumes_from_checkpoint(self):
+		with TempFile(suffix='.tsv') as path:
+			db = TSVZ.WalStore(path, flush_interval=0.001, checkpoint=True)
+			db['a'] = ['1']
+			db['b'] = ['b', 'x\ty']
+			db.close()
+			size = os.path.getsize(path)
+			with open(path, 'ab') as f:
+				f.write(b'#_defaults_#\tD\n#_fill_empty_with_default_#\ttrue\nc\t\na\n')
+			with mock.patch.object(TSVZ, 'replay_part', wraps=TSVZ.replay_part) as replay:
+				db = TSVZ.WalStore(path, flush_interval=0.001, checkpoint=True)
+				self.assertEqual(replay.call_args.kwargs['start'], size)
+			self.assertEqual(dict(db), dict(TSVZ.read_store(path)))
+			self.assertEqual(db['c'], ['c', 'D'])
+			db.close()
+			self.assertEqual(dict(TSVZ.read_store(path, checkpoint=True)), dict(TSVZ.read_store(path)))
+			os.unlink(path + '.ckpt')
+
+	def test_stale_or_corrupt_checkpoint_ignored(self):
+		with TempFile(suffix='.tsv') as path:
+			TSVZ.append_records(path, [['a', '1'], ['b', '2'], ['a']])
+			TSVZ.save_checkpoint(path)
+			TSVZ.snapshot_part(path)
+			TSVZ.append_records(path, [['c', '3']])
+			self.assertEqual(dict(TSVZ.read_store(path, checkpoint=True)), {'b': ['b', '2'], 'c': ['c', '3']})
+			with open(path + '.ckpt', 'r+b') as f:
+				f.truncate(20)
+			self.assertEqual(dict(TSVZ.read_store(path, checkpoint=True)), {'b': ['b', '2'], 'c': ['c', '3']})
+			os.unlink(path + '.ckpt')
+
 
 class TestOffsetStore(unittest.TestCase):
 	def _store(self, path, **kw):
@@ -360,6 +1188,61 @@ class TestOffsetStore(unittest.TestCase):
 			self.assertNotIn('#note', open(path).read())
 			s.close()
 
+	def test_bounded_cache_reads_through(self):
+		content = b'a\t\n#_defaults_#\tD\n#_fill_empty_with_default_#\ttrue\nb\t\nc\tx\n'
+		with TempFile(suffix='.tsv', content=content) as path:
+			s = self._store(path, cache_size=1)
+			self.assertEqual(s.cache_stats()['rows'], 0)
+			self.assertEqual(s['a'], ['a', ''])
+			self.assertEqual(s['b'], ['b', 'D'])
+			self.assertEqual(s['a'], ['a', ''])
+			s['d'] = ['d', 'y']
+			s.flush()
+			self.assertEqual(dict(s.items()), dict(TSVZ.read_store(path)))
+			stats = s.cache_stats()
+			self.assertEqual(stats['rows'], 1)
+			self.assertGreater(stats['evictions'], 0)
+			self.assertGreater(stats['misses'], stats['hits'])
+			s.close()
+
+	def test_cache_bytes_bound(self):
+		with TempFile(suffix='.tsv') as path:
+			s = self._store(path, cache_bytes=10)
+			for i in range(20):
+				s[str(i)] = ['val%d' % i]
+			self.assertLessEqual(s.cache_stats()['bytes'], 10)
+			self.assertEqual(s['3'], ['3', 'val3'])
+			s.close()
+
+	def test_index_sidecar_replays_only_tail(self):
+		with TempFile(suffix='.tsv') as path:
+			s = self._store(path, index=True)
+			s['a'] = ['1']
+			s['b'] = ['2']
+			s.close()
+			self.assertTrue(os.path.isfile(path + '.idx'))
+			with open(path, 'ab') as f:
+				f.write(b'#_defaults_#\tD\n#_fill_empty_with_default_#\ttrue\nc\t\na\n')
+			with mock.patch.object(TSVZ, 'read_store', wraps=TSVZ.read_store) as full:
+				s = self._store(path, index=True, cache_size=1)
+				self.assertEqual(full.call_count, 0)
+			self.assertEqual(dict(s.items()), dict(TSVZ.read_store(path)))
+			self.assertEqual(s['c'], ['c', 'D'])
+			s.close()
+			os.unlink(path + '.idx')
+
+	def test_index_sidecar_ignored_after_rewrite(self):
+		with TempFile(suffix='.tsv') as path:
+			s = self._store(path, index=True)
+			s['a'] = ['1']
+			s.close()
+			TSVZ.truncate_part(path)
+			TSVZ.append_records(path, [['b', '2']])
+			s = self._store(path, index=True)
+			self.assertEqual(dict(s.items()), {'b': ['b', '2']})
+			s.close()
+			os.unlink(path + '.idx')
+
 
 class TestWriterHelpers(unittest.TestCase):
 	def test_snapshot_preamble(self):
@@ -6,6 +6,7 @@ import random
 import re
 import shutil
 import time
+import tracemalloc
 
 import TSVZ_new as TSVZ
 
@@ -239,6 +240,107 @@ def _open_store(path, *, lite=False, flush_interval=0.01, verbose=False):
 	return TSVZ.WalStore(path, create=True, flush_interval=flush_interval)
 
 
+def _load_per_line(path):
+	"""Reference loader: one ``find``/``decode``/``process_record`` per line."""
+	delimiter = TSVZ.delimiter_for_path(path)
+	state = TSVZ.ReaderState()
+	store = {}
+	with TSVZ.open_part(path, 'rb') as f:
+		data = f.read()
+	pos = 0
+	end = data.rfind(b'\n') + 1
+	while pos < end:
+		nl = data.find(b'\n', pos, end)
+		line = data[pos:nl].decode('utf8', errors='replace').rstrip('\r')
+		if line:
+			TSVZ.process_record(line, state, store, delimiter)
+		pos = nl + 1
+	return store
+
+
+def _bench_load(path, verbose=False):
+	for label, load in (
+		('per-line process_record', _load_per_line),
+		('read_store (batched)', TSVZ.read_store),
+	):
+		start = time.perf_counter()
+		rows = len(load(path))
+		elapsed = time.perf_counter() - start
+		print(f'Time to load {rows} rows with {label}: {elapsed:.3f} seconds'
+			  f' ({rows / elapsed if elapsed else 0:,.0f} rows/s)')
+		_print_usage(verbose)
+
+
+def _bench_fsync(path, number, verbose=False):
+	"""Write ``number`` rows, flushing after each, once per durability policy."""
+	part = path + '.fsync' + os.path.splitext(path)[1]
+	for policy in ('always', 'interval:100', 'bytes:1048576', 'never'):
+		if os.path.exists(part):
+			os.unlink(part)
+		store = TSVZ.WalStore(part, create=True, fsync=policy)
+		start = time.perf_counter()
+		for i in range(number):
+			store[str(i)] = [str(i)] + [str(id(i))] * 19
+			store.flush()
+		store.close()
+		elapsed = time.perf_counter() - start
+		print(f'fsync={policy}: {number} flushed writes in {elapsed:.3f} seconds'
+			  f' ({number / elapsed if elapsed else 0:,.0f} entries/s, {store.durability.syncs} syncs)')
+		_print_usage(verbose)
+	os.unlink(part)
+
+
+def _bench_put_many(path, number, *, lite=False, verbose=False):
+	"""Ingest ``number`` rows per item and with ``put_many``, into a fresh part each."""
+	part = path + '.ingest' + os.path.splitext(path)[1]
+	for label in ('per-item', 'put_many'):
+		if os.path.exists(part):
+			os.unlink(part)
+		store = TSVZ.OffsetStore(part, create=True) if lite else TSVZ.WalStore(part, create=True)
+		rows = ([str(i)] + [str(id(i))] * 19 for i in range(number))
+		start = time.perf_counter()
+		if label == 'put_many':
+			store.put_many(rows)
+		else:
+			for row in rows:
+				store[row[0]] = row
+		store.close()
+		elapsed = time.perf_counter() - start
+		print(f'Time to ingest {number} rows {label}: {elapsed:.3f} seconds'
+			  f' ({number / elapsed if elapsed else 0:,.0f} rows/s)')
+		_print_usage(verbose)
+	os.unlink(part)
+
+
+def _bench_legacy_commit(path, number, verbose=False):
+	"""Time the legacy TSVZed append commits and a full rewrite, tracing allocations."""
+	import TSVZ as legacy
+	part = path + '.legacy' + os.path.splitext(path)[1]
+	if os.path.exists(part):
+		os.unlink(part)
+	store = legacy.TSVZed(part, fsync='never', rewrite_on_load=False, monitor_external_changes=False,
+						  append_check_delay=0.01)
+	tracemalloc.start()
+	start = time.perf_counter()
+	for i in range(number):
+		store[str(i)] = [str(i)] + [str(id(i))] * 19
+	store.commitAppendToFile()
+	elapsed = time.perf_counter() - start
+	_, peak = tracemalloc.get_traced_memory()
+	print(f'Legacy TSVZed: {number} appended writes in {elapsed:.3f} seconds'
+		  f' ({number / elapsed if elapsed else 0:,.0f} entries/s, peak allocation {format_bytes(peak)}B)')
+	tracemalloc.reset_peak()
+	start = time.perf_counter()
+	store.hardMapToFile()
+	elapsed = time.perf_counter() - start
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	print(f'Legacy TSVZed: rewrite of {len(store)} rows in {elapsed:.3f} seconds (peak allocation {format_bytes(peak)}B)')
+	_print_usage(verbose)
+	store.stopAppendThread()
+	os.unlink(part)
+
+
 def _print_usage(verbose):
 	if verbose:
 		print(get_resource_usage())
@@ -255,6 +357,14 @@ if __name__ == '__main__':
 						help='Run snapshot_part after writes (§19 compaction)')
 	parser.add_argument('--flush-interval', type=float, default=0.01,
 						help='WalStore background flush interval in seconds')
+	parser.add_argument('--load', action='store_true',
+						help='Time reloading the part per line vs. batched read_store')
+	parser.add_argument('--fsync', type=int, metavar='N', default=0,
+						help='Also time N flushed writes under each durability policy')
+	parser.add_argument('--put-many', type=int, metavar='N', default=0,
+						help='Also time ingesting N rows per item vs. with put_many')
+	parser.add_argument('--legacy', type=int, metavar='N', default=0,
+						help='Also time N writes and a rewrite through the legacy TSVZed writer')
 	parser.add_argument('-v', '--verbose', action='store_true',
 						help='Print resource usage and extra detail')
 	parser.add_argument('-V', '--version', action='version', version=f'%(prog)s {version}')
@@ -287,3 +397,15 @@ if __name__ == '__main__':
 		TSVZ.snapshot_part(args.file_name)
 		print(f'Time to snapshot {args.number} entries: {time.perf_counter() - start:.3f} seconds')
 		_print_usage(args.verbose)
+
+	if args.load:
+		_bench_load(args.file_name, verbose=args.verbose)
+
+	if args.fsync:
+		_bench_fsync(args.file_name, args.fsync, verbose=args.verbose)
+
+	if args.put_many:
+		_bench_put_many(args.file_name, args.put_many, lite=args.lite, verbose=args.verbose)
+
+	if args.legacy:
+		_bench_legacy_commit(args.file_name, args.legacy, verbose=args.verbose)